@@ -19,6 +19,7 @@ from typing_extensions import NotRequired, TypedDict
 import NetUtils
 import Options
 import Utils
+from Profiler import profiled
 
 if TYPE_CHECKING:
     from entrance_rando import ERPlacementState
@@ -99,6 +100,15 @@ class MultiWorld():
 
     game: Dict[int, str]
 
+    prog_item_indices: Dict[int, Dict[str, int]]
+    """interned progression item names of worlds using World.indexed_prog_items"""
+
+    sphere_analysis: Optional[SphereAnalysis] = None
+    """logical spheres of the finished multiworld, set by analyze_spheres"""
+
+    stage_workers: int = 1
+    """amount of threads AutoWorld.call_all may use for worlds that declare World.parallel_stages"""
+
     random: random.Random
     per_slot_randoms: Utils.DeprecateDict[int, random.Random]
     """Deprecated. Please use `self.random` instead."""
@@ -169,6 +179,7 @@ class MultiWorld():
         self.indirect_connections = {}
         self.start_inventory_from_pool: Dict[int, Options.StartInventoryPool] = {}
         self.plando_item_blocks = {}
+        self.prog_item_indices = {}
 
         for player in range(1, players + 1):
             def set_player_attr(attr: str, val) -> None:
@@ -590,6 +601,14 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
+        if self.sphere_analysis:
+            for sphere in self.sphere_analysis.spheres:
+                yield set(sphere)
+            if self.sphere_analysis.unreachable:
+                yield set()
+                yield set(self.sphere_analysis.unreachable)
+            return
+
         state = CollectionState(self)
         locations = set(self.get_filled_locations())
 
@@ -619,7 +638,12 @@ class MultiWorld():
         state = CollectionState(self)
         locations: Set[Location] = set()
         events: Set[Location] = set()
+        # events are collected as soon as they are reachable here, which doesn't line up with the spheres of
+        # sphere_analysis, so only its unreachable locations are reused to skip checking them on every sphere
+        unreachable = self.sphere_analysis.unreachable if self.sphere_analysis else frozenset()
         for location in self.get_filled_locations():
+            if location in unreachable:
+                continue
             if type(location.item.code) is int and type(location.address) is int:
                 locations.add(location)
             else:
@@ -652,8 +676,25 @@ class MultiWorld():
                 state.collect(location.item, True, location)
             locations -= sphere
 
+        unreachable_sendable = {location for location in unreachable
+                                if type(location.item.code) is int and type(location.address) is int}
+        if unreachable_sendable:
+            yield set()
+            yield unreachable_sendable
+
+    @profiled("analyze_spheres")
+    def analyze_spheres(self) -> SphereAnalysis:
+        """
+        Computes the logical spheres of the finished multiworld and keeps them in sphere_analysis, from where
+        get_spheres, fulfills_accessibility and the spoiler playthrough read them instead of sweeping again.
+        Only call this once all items are placed and rules are final.
+        """
+        self.sphere_analysis = SphereAnalysis(self)
+        return self.sphere_analysis
+
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
+        use_analysis = state is None and self.sphere_analysis is not None
         if not state:
             state = CollectionState(self)
         players: Dict[str, Set[int]] = {
@@ -685,6 +726,18 @@ class MultiWorld():
 
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if use_analysis:
+            # the final state of the analysis is the same fixed point the sweep below would end up at
+            state = self.sphere_analysis.final_state.copy(copy_on_write=True)
+            reached = self.sphere_analysis.sphere_index
+            locations = [location for location in locations
+                         if location not in reached and not location.can_reach(state)]
+            beatable_fulfilled = self.has_beaten_game(state)
+            if all_done():
+                return True
+            if not locations:
+                return False
+
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -719,6 +772,282 @@ class MultiWorld():
 PathValue = Tuple[str, Optional["PathValue"]]
 
 
+class PerPlayerCopyOnWrite(dict):
+    """
+    Per-player mapping of a CollectionState, that can share its values with copies of that state.
+
+    Shared values are kept outside the dict itself, so that they get copied into it by `__missing__` the first time
+    their player is looked up. Lookups of values that are already owned stay as fast as those of a plain dict.
+    Shared values are never mutated, only copied, so neither side of a copy can see changes made by the other side.
+    """
+    __slots__ = ("_shared",)
+
+    _shared: Dict[int, Any]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._shared = {}
+
+    def __missing__(self, player: int) -> Any:
+        value = self._shared.pop(player).copy()
+        dict.__setitem__(self, player, value)
+        return value
+
+    def __setitem__(self, player: int, value: Any) -> None:
+        self._shared.pop(player, None)
+        super().__setitem__(player, value)
+
+    def __delitem__(self, player: int) -> None:
+        if self._shared.pop(player, None) is None:
+            super().__delitem__(player)
+
+    def __contains__(self, player: object) -> bool:
+        return dict.__contains__(self, player) or player in self._shared
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._shared)
+
+    def __iter__(self) -> Iterator[int]:
+        self.own_all()
+        return super().__iter__()
+
+    def __eq__(self, other: object) -> bool:
+        self.own_all()
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        self.own_all()
+        return super().__repr__()
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[int, Any]]]:
+        self.own_all()
+        return PerPlayerCopyOnWrite, (dict(dict.items(self)),)
+
+    def keys(self):  # type: ignore[override]
+        self.own_all()
+        return super().keys()
+
+    def values(self):  # type: ignore[override]
+        self.own_all()
+        return super().values()
+
+    def items(self):  # type: ignore[override]
+        self.own_all()
+        return super().items()
+
+    def get(self, player: int, default: Any = None) -> Any:
+        return self[player] if player in self else default
+
+    def pop(self, player: int, *default: Any) -> Any:
+        if player in self._shared:
+            self.__missing__(player)
+        return super().pop(player, *default)
+
+    def setdefault(self, player: int, default: Any = None) -> Any:
+        if player in self._shared:
+            return self.__missing__(player)
+        return super().setdefault(player, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for player, value in dict(*args, **kwargs).items():
+            self[player] = value
+
+    def clear(self) -> None:
+        self._shared = {}
+        super().clear()
+
+    def copy(self) -> PerPlayerCopyOnWrite:
+        self.own_all()
+        return PerPlayerCopyOnWrite(dict.items(self))
+
+    def own_all(self) -> None:
+        """Copy all values that are still shared into this mapping."""
+        if self._shared:
+            shared, self._shared = self._shared, {}
+            for player, value in shared.items():
+                dict.__setitem__(self, player, value.copy())
+
+    def share(self) -> PerPlayerCopyOnWrite:
+        """
+        Return a new mapping that shares all values with this one.
+        From then on, both mappings copy a player's value on its first lookup.
+        """
+        shared = self._shared
+        if dict.__len__(self):
+            shared.update(dict.items(self))
+            dict.clear(self)
+        ret = PerPlayerCopyOnWrite()
+        ret._shared = shared.copy()
+        return ret
+
+
+class IndexedCounter(Counter):
+    """
+    Counter of a player's item names, that additionally tracks the names interned in `indices`:
+    `counts` holds their counts by index and `mask` has the bit of each of them that is counted at least once.
+    Used for the prog_items of worlds with World.indexed_prog_items, see CollectionState.has_mask.
+    """
+    __slots__ = ("indices", "counts", "mask")
+
+    indices: Dict[str, int]
+    counts: List[int]
+    mask: int
+
+    def __init__(self, indices: Dict[str, int], items: Mapping[str, int] = {}) -> None:
+        self.indices = indices
+        self.counts = [0] * len(indices)
+        self.mask = 0
+        super().__init__()
+        for name, count in items.items():
+            self[name] = count
+
+    def _set_count(self, index: int, count: int) -> None:
+        counts = self.counts
+        if index >= len(counts):
+            # names interned after this counter was created
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] = count
+        if count > 0:
+            self.mask |= 1 << index
+        else:
+            self.mask &= ~(1 << index)
+
+    def __setitem__(self, name: str, count: int) -> None:
+        dict.__setitem__(self, name, count)
+        index = self.indices.get(name)
+        if index is not None:
+            self._set_count(index, count)
+
+    def __delitem__(self, name: str) -> None:
+        dict.__delitem__(self, name)
+        index = self.indices.get(name)
+        if index is not None:
+            self._set_count(index, 0)
+
+    def reindex(self) -> None:
+        """Rebuilds counts and mask, for after the dict was modified without going through __setitem__."""
+        self.counts = [0] * len(self.indices)
+        self.mask = 0
+        for name, count in self.items():
+            index = self.indices.get(name)
+            if index is not None:
+                self._set_count(index, count)
+
+    def update(self, iterable: Any = None, /, **kwargs: int) -> None:
+        # Counter.update writes into an empty Counter with dict.update
+        super().update(iterable, **kwargs)
+        self.reindex()
+
+    def pop(self, name: str, *default: int) -> int:
+        count = super().pop(name, *default)
+        index = self.indices.get(name)
+        if index is not None:
+            self._set_count(index, 0)
+        return count
+
+    def clear(self) -> None:
+        super().clear()
+        self.counts = [0] * len(self.indices)
+        self.mask = 0
+
+    def copy(self) -> IndexedCounter:
+        ret = IndexedCounter.__new__(IndexedCounter)
+        dict.update(ret, self)
+        ret.indices = self.indices
+        ret.counts = self.counts.copy()
+        ret.mask = self.mask
+        return ret
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return self.__class__, (self.indices, dict(self))
+
+
+class _SweepWaitList:
+    """
+    The unreached advancement locations of one player during a sweep, indexed by the item and region names their
+    reachability depends on, for worlds that know the dependencies of their location rules.
+    See CachedRuleBuilderWorld.get_location_dependencies.
+    """
+    __slots__ = ("player", "order", "dependencies", "by_item", "by_region", "always", "prog_items", "regions")
+
+    player: int
+    order: Dict[Location, int]
+    """the waiting locations, in the order they were given to the sweep"""
+    dependencies: Dict[Location, Tuple[AbstractSet[str], AbstractSet[str]]]
+    """the item and region names each waiting location with known dependencies is indexed by"""
+    by_item: Dict[str, Set[Location]]
+    by_region: Dict[str, Set[Location]]
+    always: Set[Location]
+    """waiting locations with unknown dependencies, which are always rechecked"""
+    prog_items: Optional[Dict[str, int]]
+    regions: Set[Region]
+    """prog_items and reachable regions of the player as of the last wake"""
+
+    def __init__(self, player: int, locations: List[Location], world: AutoWorld.World) -> None:
+        self.player = player
+        self.order = {location: index for index, location in enumerate(locations)}
+        self.dependencies = {}
+        self.by_item = defaultdict(set)
+        self.by_region = defaultdict(set)
+        self.always = set()
+        self.prog_items = None
+        self.regions = set()
+        for location in locations:
+            dependencies = world.get_location_dependencies(location)
+            if dependencies is None or location.parent_region is None:
+                self.always.add(location)
+                continue
+            item_names, region_names = dependencies
+            region_names = region_names | {location.parent_region.name}
+            self.dependencies[location] = item_names, region_names
+            for item_name in item_names:
+                self.by_item[item_name].add(location)
+            for region_name in region_names:
+                self.by_region[region_name].add(location)
+
+    def wake(self, state: CollectionState) -> List[Location]:
+        """Returns the waiting locations that could have become reachable since the last wake, in sweep order."""
+        player = self.player
+        if state.stale[player]:
+            state.update_reachable_regions(player)
+        current_items = state.prog_items[player]
+        current_regions = state.reachable_regions[player]
+        previous_items = self.prog_items
+        previous_regions = self.regions
+        self.prog_items = dict(current_items)
+        self.regions = current_regions.copy()
+        if previous_items is None:
+            return list(self.order)
+
+        woken = self.always.copy()
+        by_item = self.by_item
+        for item_name, count in current_items.items():
+            if previous_items.get(item_name, 0) != count and item_name in by_item:
+                woken |= by_item[item_name]
+        for item_name in previous_items.keys() - current_items.keys():
+            if item_name in by_item:
+                woken |= by_item[item_name]
+        by_region = self.by_region
+        for region in current_regions - previous_regions:
+            if region.name in by_region:
+                woken |= by_region[region.name]
+        return sorted(woken, key=self.order.__getitem__)
+
+    def remove(self, location: Location) -> None:
+        del self.order[location]
+        dependencies = self.dependencies.pop(location, None)
+        if dependencies is None:
+            self.always.discard(location)
+            return
+        item_names, region_names = dependencies
+        for item_name in item_names:
+            self.by_item[item_name].discard(location)
+        for region_name in region_names:
+            self.by_region[region_name].discard(location)
+
+
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
     multiworld: MultiWorld
@@ -729,20 +1058,27 @@ class CollectionState():
     locations_checked: Set[Location]
     """Internal cache for Advancement Locations already checked by this CollectionState. Not for use in logic."""
     stale: Dict[int, bool]
+    checked_prog_items: Dict[int, Mapping[str, int]]
+    """Internal cache of prog_items as of the last reachability update, for worlds that know their entrance
+    dependencies. Not for use in logic."""
     allow_partial_entrances: bool
     additional_init_functions: List[Callable[[CollectionState, MultiWorld], None]] = []
     additional_copy_functions: List[Callable[[CollectionState, CollectionState], CollectionState]] = []
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        indices = parent.prog_item_indices
+        self.prog_items = PerPlayerCopyOnWrite({
+            player: IndexedCounter(indices[player]) if player in indices else Counter()
+            for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = PerPlayerCopyOnWrite({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = PerPlayerCopyOnWrite({player: set() for player in parent.get_all_ids()})
         self.advancements = set()
         self.path = {}
         self.locations_checked = set()
         self.stale = {player: True for player in parent.get_all_ids()}
+        self.checked_prog_items = {}
         self.allow_partial_entrances = allow_partial_entrances
         for function in self.additional_init_functions:
             function(self, parent)
@@ -754,7 +1090,7 @@ class CollectionState():
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
         reachable_regions = self.reachable_regions[player]
-        queue = deque(self.blocked_connections[player])
+        queue = deque(self._get_connections_to_recheck(player, self.blocked_connections[player], frozenset()))
         start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
@@ -768,6 +1104,35 @@ class CollectionState():
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
 
+    def _get_connections_to_recheck(self, player: int, blocked_connections: Set[Entrance],
+                                    reached_regions: AbstractSet[str]) -> Collection[Entrance]:
+        """
+        Returns the blocked connections that could have become passable.
+
+        Worlds that know what the access rules of their entrances depend on, see
+        CachedRuleBuilderWorld.get_entrance_dependencies, only get the connections back that depend on an item that
+        changed since the last call or on one of reached_regions. For all others, every blocked connection is returned.
+        """
+        world = self.multiworld.worlds[player]
+        if not getattr(world, "rule_caching_enabled", False):
+            return blocked_connections.copy()
+
+        current = self.prog_items[player]
+        previous = self.checked_prog_items.get(player)
+        self.checked_prog_items[player] = current.copy()
+        if previous is None:
+            return blocked_connections.copy()
+        changed_items = {item for item, count in current.items() if previous.get(item, 0) != count}
+        changed_items.update(item for item in previous if item not in current)
+
+        connections: List[Entrance] = []
+        for connection in blocked_connections:
+            dependencies = world.get_entrance_dependencies(connection)
+            if dependencies is None or not dependencies[0].isdisjoint(changed_items) \
+                    or not dependencies[1].isdisjoint(reached_regions):
+                connections.append(connection)
+        return connections
+
     def _update_reachable_regions_explicit_indirect_conditions(self, player: int, queue: deque[Entrance]):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
@@ -801,7 +1166,7 @@ class CollectionState():
         new_connection: bool = True
         # run BFS on all connections, and keep track of those blocked by missing items
         while new_connection:
-            new_connection = False
+            new_regions: Set[str] = set()
             while queue:
                 connection = queue.popleft()
                 new_region = connection.connected_region
@@ -816,26 +1181,51 @@ class CollectionState():
                     blocked_connections.update(new_region.exits)
                     queue.extend(new_region.exits)
                     self.path[new_region] = (new_region.name, self.path.get(connection, None))
-                    new_connection = True
+                    new_regions.add(new_region.name)
                     self.multiworld.worlds[player].reached_region(self, new_region)
-            # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
-            queue.extend(blocked_connections)
+            new_connection = bool(new_regions)
+            if new_connection:
+                # sweep for indirect connections, mostly Entrance.can_reach(unrelated_Region)
+                queue.extend(self._get_connections_to_recheck(player, blocked_connections, new_regions))
+
+    def copy(self, copy_on_write: bool = False) -> CollectionState:
+        """
+        Create a copy of this state.
 
-    def copy(self) -> CollectionState:
+        :param copy_on_write: When True, the per-player `prog_items`, `reachable_regions` and `blocked_connections` are
+        shared between both states and each player's data is only copied once it is looked up in either state. This is
+        a lot cheaper for states that are only used to check a few players, such as the many copies made during fill.
+        References to per-player data obtained before the copy must not be mutated afterward.
+        """
         ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        if copy_on_write:
+            ret.prog_items = self._share_per_player("prog_items")
+            ret.reachable_regions = self._share_per_player("reachable_regions")
+            ret.blocked_connections = self._share_per_player("blocked_connections")
+        else:
+            ret.prog_items = PerPlayerCopyOnWrite({player: counter.copy()
+                                                   for player, counter in self.prog_items.items()})
+            ret.reachable_regions = PerPlayerCopyOnWrite({player: region_set.copy() for player, region_set in
+                                                          self.reachable_regions.items()})
+            ret.blocked_connections = PerPlayerCopyOnWrite({player: entrance_set.copy() for player, entrance_set in
+                                                            self.blocked_connections.items()})
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.checked_prog_items = self.checked_prog_items.copy()
         ret.allow_partial_entrances = self.allow_partial_entrances
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
 
+    def _share_per_player(self, attribute: str) -> PerPlayerCopyOnWrite:
+        per_player = getattr(self, attribute)
+        if not isinstance(per_player, PerPlayerCopyOnWrite):
+            # replaced by a plain dict, for example by a world or test
+            per_player = PerPlayerCopyOnWrite(per_player)
+            setattr(self, attribute, per_player)
+        return per_player.share()
+
     def can_reach(self,
                   spot: Union[Location, Entrance, Region, str],
                   resolution_hint: Optional[str] = None,
@@ -874,6 +1264,13 @@ class CollectionState():
         """
         all_players = {player for player, _ in advancements_per_player}
         players_to_check = all_players
+        # Worlds that know what their location rules depend on only get the locations rechecked that could have
+        # become reachable since their last check, instead of all of their remaining locations.
+        wait_lists: Dict[int, _SweepWaitList] = {}
+        for player, locations in advancements_per_player:
+            world = self.multiworld.worlds.get(player)
+            if getattr(world, "rule_caching_enabled", False):
+                wait_lists[player] = _SweepWaitList(player, locations, world)
         # As an optimization, it is assumed that each player's world only logically depends on itself. However, worlds
         # are allowed to logically depend on other worlds, so once there are no more players that should be checked
         # under this assumption, an extra sweep iteration is performed that checks every player, to confirm that the
@@ -892,7 +1289,8 @@ class CollectionState():
                 # stale whenever one of their own items is collected into the state.
                 reachable_locations: List[Location] = []
                 unreachable_locations: List[Location] = []
-                for location in locations:
+                wait_list = wait_lists.get(player)
+                for location in (locations if wait_list is None else wait_list.wake(self)):
                     if location.can_reach(self):
                         # Locations containing items that do not belong to `player` could be collected immediately
                         # because they won't stale `player`'s region accessibility cache, but, for simplicity, all the
@@ -900,7 +1298,13 @@ class CollectionState():
                         reachable_locations.append(location)
                     else:
                         unreachable_locations.append(location)
-                if unreachable_locations:
+                if wait_list is not None:
+                    for location in reachable_locations:
+                        wait_list.remove(location)
+                    if wait_list.order:
+                        # the wait list keeps track of the remaining locations itself
+                        next_advancements_per_player.append((player, locations))
+                elif unreachable_locations:
                     next_advancements_per_player.append((player, unreachable_locations))
 
                 # A previous player's locations processed in the current `while players_to_check` iteration could have
@@ -949,6 +1353,7 @@ class CollectionState():
                                yield_each_sweep: Literal[False] = False,
                                checked_locations: Optional[Set[Location]] = None) -> None: ...
 
+    @profiled("sweep_for_advancements")
     def sweep_for_advancements(self, locations: Optional[Iterable[Location]] = None, yield_each_sweep: bool = False,
                                checked_locations: Optional[Set[Location]] = None) -> Optional[Iterator[None]]:
         """
@@ -1036,6 +1441,20 @@ class CollectionState():
     def count(self, item: str, player: int) -> int:
         return self.prog_items[player][item]
 
+    # interned item related, only for players of worlds with World.indexed_prog_items
+    def has_mask(self, mask: int, player: int) -> bool:
+        """Returns True if each item of mask, from World.get_item_mask, is in state at least once."""
+        return (self.prog_items[player].mask & mask) == mask
+
+    def has_any_mask(self, mask: int, player: int) -> bool:
+        """Returns True if at least one item of mask, from World.get_item_mask, is in state at least once."""
+        return bool(self.prog_items[player].mask & mask)
+
+    def count_index(self, index: int, player: int) -> int:
+        """Returns the count of the item with index, from World.get_item_index."""
+        counts = self.prog_items[player].counts
+        return counts[index] if index < len(counts) else 0
+
     def has_from_list(self, items: Iterable[str], player: int, count: int) -> bool:
         """Returns True if the state contains at least `count` items matching any of the item names from a list."""
         found: int = 0
@@ -1675,6 +2094,48 @@ class EntranceInfo(TypedDict, total=False):
     direction: str
 
 
+class SphereAnalysis:
+    """
+    Logical spheres of a finished multiworld, swept once from a fresh CollectionState over all filled locations.
+    See MultiWorld.analyze_spheres.
+    """
+    spheres: List[Set[Location]]
+    """reachable filled locations, grouped by logical sphere"""
+    sphere_index: Dict[Location, int]
+    """index into spheres for each reachable filled location"""
+    states: List[CollectionState]
+    """state at each sphere boundary, states[n] has the items of the first n spheres collected"""
+    unreachable: Set[Location]
+    """filled locations that are not reachable"""
+
+    def __init__(self, multiworld: MultiWorld) -> None:
+        self.spheres = []
+        self.sphere_index = {}
+        state = CollectionState(multiworld)
+        self.states = [state]
+        locations = set(multiworld.get_filled_locations())
+
+        while locations:
+            sphere = {location for location in locations if location.can_reach(state)}
+            if not sphere:
+                break
+
+            state = state.copy(copy_on_write=True)
+            for location in sphere:
+                state.collect(location.item, True, location)
+                self.sphere_index[location] = len(self.spheres)
+            self.spheres.append(sphere)
+            self.states.append(state)
+            locations -= sphere
+
+        self.unreachable = locations
+
+    @property
+    def final_state(self) -> CollectionState:
+        """state with every reachable location collected"""
+        return self.states[-1]
+
+
 class Spoiler:
     multiworld: MultiWorld
     hashes: Dict[int, str]
@@ -1699,6 +2160,7 @@ class Spoiler:
             self.entrances[(entrance, direction, player)] = \
                 {"player": player, "entrance": entrance, "exit": exit_, "direction": direction}
 
+    @profiled("create_playthrough")
     def create_playthrough(self, create_paths: bool = True) -> None:
         """Destructive to the multiworld while it is run, damage gets repaired afterwards."""
         from itertools import chain
@@ -1710,6 +2172,30 @@ class Spoiler:
         state = CollectionState(multiworld)
         sphere_candidates = set(prog_locations)
         logging.debug('Building up collection spheres.')
+        if multiworld.sphere_analysis:
+            # non-progression items don't change the state, so the progression part of each analyzed sphere is
+            # the sphere the sweep below would find
+            analysis = multiworld.sphere_analysis
+            for sphere, state in zip(analysis.spheres, analysis.states[1:]):
+                sphere = sphere & sphere_candidates
+                if not sphere:
+                    break
+                sphere_candidates -= sphere
+                collection_spheres.append(sphere)
+                state_cache.append(state)
+                if not sphere_candidates:
+                    break
+            state = analysis.final_state
+            if sphere_candidates:
+                collection_spheres.append(set())
+                state_cache.append(state)
+                if not multiworld.has_beaten_game(state):
+                    raise RuntimeError("During playthrough generation, the game was determined to be unbeatable. "
+                                       "Something went terribly wrong here. "
+                                       f"Unreachable progression items: {sphere_candidates}")
+                self.unreachables = sphere_candidates
+            sphere_candidates = set()
+
         while sphere_candidates:
 
             # build up spheres of collection radius.
@@ -22,8 +22,9 @@ if __name__ == "__main__":
     Utils.init_logging("TextClient", exception_logger="Client")
 
 from MultiServer import CommandProcessor, mark_raw
-from NetUtils import (Endpoint, decode, NetworkItem, encode, JSONtoTextParser, ClientStatus, Permission, NetworkSlot,
-                      RawJSONtoTextParser, add_json_text, add_json_location, add_json_item, JSONTypes, HintStatus, SlotType)
+from NetUtils import (Endpoint, NetworkItem, encode, JSONtoTextParser, ClientStatus, Permission, NetworkSlot,
+                      RawJSONtoTextParser, add_json_text, add_json_location, add_json_item, JSONTypes, HintStatus, SlotType,
+                      binary_framing_available, binary_framing_tag, decode_frame, encode_binary)
 from Utils import gui_enabled, Version, stream_input, async_start
 from worlds import network_data_package, AutoWorldRegister
 import os
@@ -171,8 +172,7 @@ class ClientCommandProcessor(CommandProcessor):
         if not self.ctx.game:
             self.output(f"No game set, cannot determine existing {name} Groups.")
             return False
-        lookup = Utils.persistent_load().get("groups_by_checksum", {}).get(self.ctx.checksums[self.ctx.game], {})\
-            .get(self.ctx.game, {}).get(group_key, {})
+        lookup = Utils.load_data_package_groups(self.ctx.game, self.ctx.checksums[self.ctx.game]).get(group_key, {})
         if lookup is None:
             self.output("datapackage not yet loaded, try again")
             return False
@@ -234,6 +234,8 @@ class CommonContext:
     game: typing.Optional[str] = None
     items_handling: typing.Optional[int] = None
     want_slot_data: bool = True  # should slot_data be retrieved via Connect
+    # should messages be exchanged as MessagePack in binary frames instead of JSON if both ends have msgpack
+    want_binary_framing: bool = False
 
     class NameLookupDict:
         """A specialized dict, with helper methods, for id -> name item/location data package lookups by game."""
@@ -486,7 +488,7 @@ class CommonContext:
         """ `msgs` JSON serializable """
         if not self.server or not self.server.socket.open or self.server.socket.closed:
             return
-        await self.server.socket.send(encode(msgs))
+        await self.server.socket.send(encode_binary(msgs) if self.server.binary_framing else encode(msgs))
 
     def consume_players_package(self, package: typing.List[tuple]):
         self.player_names = {slot: name for team, slot, name, orig_name in package if self.team == team}
@@ -516,6 +518,9 @@ class CommonContext:
         Send a `Connect` packet to log in to the server,
         additional keyword args can override any value in the connection packet
         """
+        if self.want_binary_framing and binary_framing_available:
+            # kept in tags, so that a ConnectUpdate doesn't drop it
+            self.tags = self.tags | {binary_framing_tag}
         payload = {
             'cmd': 'Connect',
             'password': self.password, 'name': self.auth, 'version': Utils.version_tuple,
@@ -691,22 +696,12 @@ class CommonContext:
             Utils.store_data_package_for_checksum(game, game_data)
 
     def consume_network_item_groups(self):
-        data = {"item_name_groups": self.stored_data[f"_read_item_name_groups_{self.game}"]}
-        current_cache = Utils.persistent_load().get("groups_by_checksum", {}).get(self.checksums[self.game], {})
-        if self.game in current_cache:
-            current_cache[self.game].update(data)
-        else:
-            current_cache[self.game] = data
-        Utils.persistent_store("groups_by_checksum", self.checksums[self.game], current_cache)
+        Utils.store_data_package_groups(self.game, self.checksums[self.game], "item_name_groups",
+                                        self.stored_data[f"_read_item_name_groups_{self.game}"])
 
     def consume_network_location_groups(self):
-        data = {"location_name_groups": self.stored_data[f"_read_location_name_groups_{self.game}"]}
-        current_cache = Utils.persistent_load().get("groups_by_checksum", {}).get(self.checksums[self.game], {})
-        if self.game in current_cache:
-            current_cache[self.game].update(data)
-        else:
-            current_cache[self.game] = data
-        Utils.persistent_store("groups_by_checksum", self.checksums[self.game], current_cache)
+        Utils.store_data_package_groups(self.game, self.checksums[self.game], "location_name_groups",
+                                        self.stored_data[f"_read_location_name_groups_{self.game}"])
 
     # data storage
 
@@ -880,7 +875,10 @@ async def server_loop(ctx: CommonContext, address: typing.Optional[str] = None)
         ctx.current_reconnect_delay = ctx.starting_reconnect_delay
         ctx.disconnected_intentionally = False
         async for data in ctx.server.socket:
-            for msg in decode(data):
+            if isinstance(data, bytes):
+                # the server accepted binary framing, so answer in kind
+                ctx.server.binary_framing = True
+            for msg in decode_frame(data):
                 await process_server_cmd(ctx, msg)
         logger.warning(f"Disconnected from multiworld server{reconnect_hint()}")
     except websockets.InvalidMessage:
@@ -1,14 +1,16 @@
 import collections
 import itertools
 import logging
+import math
 import typing
 from collections import Counter, deque
 
 from BaseClasses import CollectionState, Item, Location, LocationProgressType, MultiWorld, PlandoItemBlock
 from Options import Accessibility
+from Profiler import profiled
 
 from worlds.AutoWorld import call_all
-from worlds.generic.Rules import add_item_rule
+from worlds.generic.Rules import add_item_rule, get_locality_blockers
 
 
 class FillError(RuntimeError):
@@ -26,13 +28,161 @@ def _log_fill_progress(name: str, placed: int, total_items: int) -> None:
 
 def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item] = tuple(),
                     locations: typing.Optional[typing.List[Location]] = None) -> CollectionState:
-    new_state = base_state.copy()
+    new_state = base_state.copy(copy_on_write=True)
     for item in itempool:
         new_state.collect(item, True)
     new_state.sweep_for_advancements(locations=locations)
     return new_state
 
 
+class _PoolStateCache:
+    """
+    Builds the states that `fill_restrictive` sweeps from, which are `base_state` with every item still in the pool
+    collected.
+
+    Collecting the whole pool again for every placement step costs O(pool size) per step. Instead, a checkpoint state
+    holds the items that will stay in the pool the longest, and each step only collects the remaining items on top of
+    a copy of it. Items are never removed from a state, because `World.remove` is not an exact inverse of
+    `World.collect` for every world, for example for progressive items past their limit.
+
+    Each player's items are collected in the same order as they appear in the pool.
+    """
+    base_state: CollectionState
+    item_pool: typing.List[Item]
+    reachable_items: typing.Dict[int, typing.Deque[Item]]
+    checkpoint: typing.Optional[CollectionState]
+    checkpoint_items: typing.Set[int]
+    """ids of the items collected into `checkpoint`"""
+    top_up: typing.List[Item]
+    """items in the pool that are not in `checkpoint`, in pool order"""
+
+    def __init__(self, base_state: CollectionState, item_pool: typing.List[Item],
+                 reachable_items: typing.Dict[int, typing.Deque[Item]]) -> None:
+        self.base_state = base_state
+        self.item_pool = item_pool
+        self.reachable_items = reachable_items
+        self.checkpoint = None
+        self.checkpoint_items = set()
+        self.top_up = []
+
+    def _build_checkpoint(self) -> None:
+        # Items are placed from the end of each deque in `reachable_items`, so the items towards the end of each deque
+        # leave the pool first. Keeping about the square root of the longest deque out of the checkpoint balances the
+        # cost of rebuilding the checkpoint against the cost of collecting the items kept out of it for each step.
+        steps = max(1, math.isqrt(max(map(len, self.reachable_items.values()), default=0)))
+        placed_soon = {id(item) for items in self.reachable_items.values()
+                       for item in itertools.islice(reversed(items), steps)}
+        checkpoint = self.base_state.copy(copy_on_write=True)
+        self.checkpoint_items = set()
+        self.top_up = []
+        # once an item of a player is kept out of the checkpoint, so are all of that player's later items
+        topped_up_players: typing.Set[int] = set()
+        for item in self.item_pool:
+            if item.player in topped_up_players or id(item) in placed_soon:
+                topped_up_players.add(item.player)
+                self.top_up.append(item)
+            else:
+                checkpoint.collect(item, True)
+                self.checkpoint_items.add(id(item))
+        self.checkpoint = checkpoint
+
+    def remove(self, items: typing.Iterable[Item]) -> None:
+        """Forget items that left the pool."""
+        if self.checkpoint is None:
+            return
+        for item in items:
+            if id(item) in self.checkpoint_items:
+                self.checkpoint = None
+                return
+            for i, top_up_item in enumerate(self.top_up):
+                if top_up_item is item:
+                    del self.top_up[i]
+                    break
+
+    def add(self, item: Item) -> None:
+        """Add an item that was appended to the pool."""
+        if self.checkpoint is not None:
+            self.top_up.append(item)
+
+    def get_state(self, extra_items: typing.Iterable[Item] = ()) -> CollectionState:
+        """Return a new state with every item of the pool and then extra_items collected, without sweeping."""
+        if self.checkpoint is None:
+            self._build_checkpoint()
+            assert self.checkpoint is not None
+        state = self.checkpoint.copy(copy_on_write=True)
+        for item in itertools.chain(self.top_up, extra_items):
+            state.collect(item, True)
+        return state
+
+
+class _SpotCandidates:
+    """
+    Index of the locations that `fill_restrictive` searches for a spot to place an item on.
+
+    Locations that can never be filled with an item, no matter the state, are filtered out once for each group of items
+    that share the same constraints, so that the search only has to call `Location.can_fill` on the remaining
+    candidates. Candidates are kept in the order of `locations`, so the same spot is found as with a search through all
+    of `locations`.
+    """
+    locations: typing.Dict[Location, None]
+    """the remaining unfilled locations in order, as a dict so that filled ones are removed in constant time"""
+    single_player_placement: bool
+    by_constraints: typing.Dict[typing.Tuple[typing.Optional[int], bool, typing.Optional[typing.Tuple[int, str]]],
+                                typing.Dict[Location, None]]
+    locality_names: typing.Optional[typing.Dict[int, typing.Set[str]]]
+    """item names per item player that are rejected by the locality rules of some location"""
+
+    def __init__(self, locations: typing.List[Location], single_player_placement: bool) -> None:
+        self.locations = dict.fromkeys(locations)
+        self.single_player_placement = single_player_placement
+        self.by_constraints = {}
+        self.locality_names = None
+
+    @staticmethod
+    def can_never_fill(location: Location, item: Item) -> bool:
+        """Returns True if `location.can_fill` is False for `item` regardless of the state."""
+        if location.always_allow is not Location.always_allow:
+            return False
+        if location.progress_type == LocationProgressType.EXCLUDED and (item.advancement or item.useful):
+            return True
+        blockers = get_locality_blockers(location.item_rule)
+        return blockers is not None and item.name in blockers.get(item.player, ())
+
+    def _get_locality_names(self) -> typing.Dict[int, typing.Set[str]]:
+        if self.locality_names is None:
+            self.locality_names = collections.defaultdict(set)
+            all_blockers = {id(blockers): blockers for blockers in map(get_locality_blockers,
+                                                                       {location.item_rule for location in self.locations})
+                            if blockers is not None}
+            for blockers in all_blockers.values():
+                for player, names in blockers.items():
+                    self.locality_names[player] |= names
+        return self.locality_names
+
+    def get(self, item: Item) -> typing.Iterable[Location]:
+        """Returns the locations `item` could be placed on, in order."""
+        key = (item.player if self.single_player_placement else None,
+               item.advancement or item.useful,
+               (item.player, item.name) if item.name in self._get_locality_names().get(item.player, ()) else None)
+        candidates = self.by_constraints.get(key)
+        if candidates is None:
+            candidates = self.by_constraints[key] = dict.fromkeys(
+                location for location in self.locations
+                if (not self.single_player_placement or location.player == item.player)
+                and not self.can_never_fill(location, item))
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def take(self, location: Location) -> None:
+        """Removes a location that got filled."""
+        del self.locations[location]
+        for candidates in self.by_constraints.values():
+            candidates.pop(location, None)
+
+
+@profiled("fill_restrictive")
 def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locations: typing.List[Location],
                      item_pool: typing.List[Item], single_player_placement: bool = False, lock: bool = False,
                      swap: bool = True, on_place: typing.Optional[typing.Callable[[Location], None]] = None,
@@ -59,11 +209,14 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     for item in item_pool:
         reachable_items.setdefault(item.player, deque()).append(item)
 
+    pool_states = _PoolStateCache(base_state, item_pool, reachable_items)
+    spot_candidates = _SpotCandidates(locations, single_player_placement)
+
     # for progress logging
     total = min(len(item_pool), len(locations))
     placed = 0
 
-    while any(reachable_items.values()) and locations:
+    while any(reachable_items.values()) and spot_candidates:
         if one_item_per_player:
             # grab one item per player
             items_to_place = [items.pop()
@@ -81,16 +234,17 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                 if pool_item is item:
                     del item_pool[-p]
                     break
+        pool_states.remove(items_to_place)
 
-        maximum_exploration_state = sweep_from_pool(
-            base_state, item_pool + unplaced_items, multiworld.get_filled_locations(item.player)
-            if single_player_placement else None)
+        maximum_exploration_state = pool_states.get_state(unplaced_items)
+        maximum_exploration_state.sweep_for_advancements(
+            locations=multiworld.get_filled_locations(item.player) if single_player_placement else None)
 
         has_beaten_game = multiworld.has_beaten_game(maximum_exploration_state)
 
         while items_to_place:
             # if we have run out of locations to fill,break out of this loop
-            if not locations:
+            if not spot_candidates:
                 unplaced_items += items_to_place
                 break
             item_to_place = items_to_place.pop(0)
@@ -105,12 +259,10 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             else:
                 perform_access_check = True
 
-            for i, location in enumerate(locations):
-                if (not single_player_placement or location.player == item_to_place.player) \
-                        and location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
-                    # popping by index is faster than removing by content,
-                    spot_to_fill = locations.pop(i)
-                    # skipping a scan for the element
+            for location in spot_candidates.get(item_to_place):
+                if location.can_fill(maximum_exploration_state, item_to_place, perform_access_check):
+                    spot_to_fill = location
+                    spot_candidates.take(location)
                     break
 
             else:
@@ -180,6 +332,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
                             reachable_items[placed_item.player].appendleft(
                                 placed_item)
                             item_pool.append(placed_item)
+                            pool_states.add(placed_item)
 
                             # cleanup at the end to hopefully get better errors
                             cleanup_required = True
@@ -206,6 +359,8 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             if on_place:
                 on_place(spot_to_fill)
 
+    locations[:] = spot_candidates.locations
+
     if total > 1000:
         _log_fill_progress(name, placed, total)
 
@@ -254,6 +409,7 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
     item_pool.extend(unplaced_items)
 
 
+@profiled("remaining_fill")
 def remaining_fill(multiworld: MultiWorld,
                    locations: typing.List[Location],
                    itempool: typing.List[Item],
@@ -363,6 +519,7 @@ def fast_fill(multiworld: MultiWorld,
     return item_pool[placing:], fill_locations[placing:]
 
 
+@profiled("accessibility_corrections")
 def accessibility_corrections(multiworld: MultiWorld,
                               state: CollectionState,
                               locations: list[Location],
@@ -486,6 +643,7 @@ def distribute_early_items(multiworld: MultiWorld,
     return fill_locations, itempool
 
 
+@profiled("distribute_items_restrictive")
 def distribute_items_restrictive(multiworld: MultiWorld,
                                  panic_method: typing.Literal["swap", "raise", "start_inventory"] = "swap") -> None:
     assert all(item.location is None for item in multiworld.itempool), (
@@ -731,6 +889,7 @@ def flood_items(multiworld: MultiWorld) -> None:
                 break
 
 
+@profiled("balance_multiworld_progression")
 def balance_multiworld_progression(multiworld: MultiWorld) -> None:
     # A system to reduce situations where players have no checks remaining, popularly known as "BK mode."
     # Overall progression balancing algorithm:
@@ -815,7 +974,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         and item_percentage(player, reachables) < threshold_percentages[player])
                 }
                 if balancing_players:
-                    balancing_state = state.copy()
+                    balancing_state = state.copy(copy_on_write=True)
                     balancing_unchecked_locations = unchecked_locations.copy()
                     balancing_reachables = reachable_locations_count.copy()
                     balancing_sphere = sphere_locations.copy()
@@ -858,7 +1017,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         multiworld.random.shuffle(items_to_test)
                         while items_to_test:
                             testing = items_to_test.pop()
-                            reducing_state = state.copy()
+                            reducing_state = state.copy(copy_on_write=True)
                             for location in itertools.chain((
                                     l for l in items_to_replace
                                     if l.item.player == player
@@ -15,6 +15,7 @@ from Fill import FillError, balance_multiworld_progression, distribute_items_res
     parse_planned_blocks, distribute_planned_blocks, resolve_early_locations_for_planned
 from NetUtils import convert_to_base_types
 from Options import StartInventoryPool
+import Profiler
 from Utils import __version__, output_path, restricted_dumps, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
@@ -24,6 +25,16 @@ __all__ = ["main"]
 
 
 def main(args, seed=None, baked_server_options: dict[str, object] | None = None):
+    if not getattr(args, "profile", False):
+        return generate(args, seed, baked_server_options)
+
+    with Profiler.GenerationProfiler() as profiler:
+        multiworld = generate(args, seed, baked_server_options)
+    profiler.write(output_path(f"AP_{multiworld.seed_name}_profile"))
+    return multiworld
+
+
+def generate(args, seed=None, baked_server_options: dict[str, object] | None = None):
     if not baked_server_options:
         baked_server_options = get_settings().server_options.as_dict()
     assert isinstance(baked_server_options, dict)
@@ -38,6 +49,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
     multiworld.plando_options = args.plando
+    multiworld.stage_workers = get_settings().generator.stage_workers
     multiworld.game = args.game.copy()
     multiworld.player_name = args.name.copy()
     multiworld.sprite = args.sprite.copy()
@@ -139,6 +151,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     if multiworld.players > 1:
         locality_rules(multiworld)
 
+    Profiler.instrument_rules(multiworld)
     multiworld.plando_item_blocks = parse_planned_blocks(multiworld)
 
     AutoWorld.call_all(multiworld, "connect_entrances")
@@ -192,6 +205,8 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     logger.info('Running Pre Main Fill.')
 
     AutoWorld.call_all(multiworld, "pre_fill")
+    # worlds may have replaced or extended their rules since
+    Profiler.instrument_rules(multiworld)
 
     logger.info(f'Filling the multiworld with {len(multiworld.itempool)} items.')
 
@@ -229,6 +244,9 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         logger.info('Done. Skipped multidata modification. Total time: %s', time.perf_counter() - start)
         return multiworld
 
+    # the accessibility check, the spoiler playthrough and worlds calling get_spheres all share one sphere sweep
+    multiworld.analyze_spheres()
+
     output = tempfile.TemporaryDirectory()
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
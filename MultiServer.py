@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 import collections
+import collections.abc
 import contextlib
 import copy
 import datetime
@@ -15,6 +16,7 @@ import math
 import operator
 import pickle
 import random
+import secrets
 import shlex
 import threading
 import time
@@ -43,8 +45,8 @@ except ImportError:
 import NetUtils
 import Utils
 from Utils import version_tuple, restricted_loads, Version, async_start, get_intended_text
-from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, encode, NetworkPlayer, Permission, NetworkSlot, \
-    SlotType, LocationStore, MultiData, Hint, HintStatus
+from NetUtils import Endpoint, ClientStatus, NetworkItem, decode, decode_frame, encode, encode_binary, \
+    NetworkPlayer, Permission, NetworkSlot, SlotType, LocationStore, MultiData, Hint, HintStatus
 from BaseClasses import ItemClassification
 
 
@@ -92,6 +94,249 @@ def update_container_unique(container, entries):
     return container
 
 
+class SaveJournal:
+    """
+    Tracks what changed in the save data of a Context since it was last persisted, so that a save only has to append
+    those changes to a journal instead of rewriting the whole save data. See Context.get_save for the save format.
+
+    A journal entry is a list of records, tagged with the generation of the snapshot it applies to. Once the journal
+    grows large compared to the snapshot, it is compacted by writing a new snapshot, which starts a new, random
+    generation, so that leftover entries of an older snapshot can never be replayed onto a newer one or vice versa.
+    """
+    compaction_ratio: float = 0.5
+    """compact once the journal is larger than this fraction of the snapshot"""
+    compaction_minimum: int = 64 * 1024
+    """compact once the journal is larger than this many bytes, regardless of the size of the snapshot"""
+    # fields of the save data which are stored as tuples of (key, value) pairs
+    pair_fields: typing.ClassVar[typing.FrozenSet[str]] = frozenset(("client_activity_timers",
+                                                                      "client_connection_timers"))
+    # fields of the save data whose values per key only ever grow
+    extend_fields: typing.ClassVar[typing.FrozenSet[str]] = frozenset(("received_items",))
+    union_fields: typing.ClassVar[typing.FrozenSet[str]] = frozenset(("location_checks",))
+    # fields of the save data that are mappings, tracked per key
+    mapping_fields: typing.ClassVar[typing.FrozenSet[str]] = frozenset((
+        "hints", "hints_used", "name_aliases", "client_game_state", "group_collected", *pair_fields))
+
+    generation: int
+    journal_size: int
+    snapshot_size: int
+    dirty_stored_data: typing.Set[str]
+    """keys of stored_data set since the last save, as their values may be modified in place"""
+    stored_data_lock: threading.Lock
+    """held while stored_data is set and marked dirty, and while it is captured for a save"""
+    _view: typing.Optional[typing.Dict[str, typing.Any]]
+    """what the snapshot and journal contain so far, or None if the next save has to be a snapshot"""
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.journal_size = 0
+        self.snapshot_size = 0
+        self.dirty_stored_data = set()
+        self.stored_data_lock = threading.Lock()
+        self._view = None
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self._view is None or \
+            self.journal_size > max(self.compaction_minimum, self.snapshot_size * self.compaction_ratio)
+
+    def invalidate(self) -> None:
+        """Makes the next save a snapshot, for when the persisted state is unknown."""
+        self._view = None
+
+    def start_snapshot(self, save: typing.Dict[str, typing.Any]) -> None:
+        """Starts a new generation with save, before it is persisted as snapshot."""
+        self.generation = secrets.randbits(64)
+        save["journal_generation"] = self.generation
+
+    def capture_stored_data(self, save: typing.Dict[str, typing.Any], snapshot: bool) -> typing.Set[str]:
+        """
+        Replaces the live stored_data of save with a copy, of all of it for a snapshot or else of its dirty keys,
+        taken together with the dirty keys, so that keys set while the save is encoded stay dirty for the next save.
+        Returns the captured keys, which are no longer dirty, to be passed to diff or to restore_stored_data.
+        """
+        with self.stored_data_lock:
+            keys = set(self.dirty_stored_data)
+            self.dirty_stored_data -= keys
+            if "stored_data" in save:
+                stored_data = save["stored_data"]
+                save["stored_data"] = copy.deepcopy(
+                    stored_data if snapshot else {key: stored_data[key] for key in keys if key in stored_data})
+        return keys
+
+    def restore_stored_data(self, keys: typing.AbstractSet[str]) -> None:
+        """Marks captured keys dirty again, for when their save failed."""
+        with self.stored_data_lock:
+            self.dirty_stored_data |= keys
+
+    def reset(self, save: typing.Dict[str, typing.Any], snapshot_size: int) -> None:
+        """Marks save as persisted in full, with an empty journal."""
+        self.generation = save.get("journal_generation", self.generation)
+        self.snapshot_size = snapshot_size
+        self.journal_size = 0
+        view: typing.Dict[str, typing.Any] = {}
+        for field, value in save.items():
+            if field in self.extend_fields:
+                view[field] = {key: len(values) for key, values in value.items()}
+            elif field in self.union_fields:
+                view[field] = {key: set(values) for key, values in value.items()}
+            elif field in self.mapping_fields:
+                view[field] = {key: copy.copy(item) for key, item in dict(value).items()}
+            elif field != "stored_data":
+                view[field] = copy.deepcopy(value)
+        self._view = view
+
+    def diff(self, save: typing.Dict[str, typing.Any], stored_data_keys: typing.AbstractSet[str]
+             ) -> typing.List[typing.Tuple[str, str, typing.Any, typing.Any]]:
+        """Returns the records of the changes from the persisted state to save, and considers them persisted.
+        stored_data_keys are the keys of stored_data captured by capture_stored_data."""
+        view = self._view
+        assert view is not None, "diffing save data without a persisted state"
+        records: typing.List[typing.Tuple[str, str, typing.Any, typing.Any]] = []
+        for field, value in save.items():
+            if field == "stored_data":
+                records.extend(("set", field, key, value[key]) for key in sorted(stored_data_keys) if key in value)
+            elif field in self.extend_fields:
+                lengths = view.setdefault(field, {})
+                for key, values in value.items():
+                    length = lengths.get(key, 0)
+                    if len(values) != length:
+                        records.append(("extend", field, key, values[length:]))
+                        lengths[key] = len(values)
+            elif field in self.union_fields:
+                persisted = view.setdefault(field, {})
+                for key, values in value.items():
+                    persisted_values = persisted.setdefault(key, set())
+                    if len(values) != len(persisted_values):
+                        new_values = values - persisted_values
+                        records.append(("union", field, key, new_values))
+                        persisted_values |= new_values
+            elif field in self.mapping_fields:
+                persisted = view.setdefault(field, {})
+                value = dict(value)
+                for key, item in value.items():
+                    if key not in persisted or persisted[key] != item:
+                        records.append(("set", field, key, item))
+                        persisted[key] = copy.copy(item)
+                for key in persisted.keys() - value.keys():
+                    records.append(("delete", field, key, None))
+                    del persisted[key]
+            elif field not in view or view[field] != value:
+                records.append(("replace", field, None, value))
+                view[field] = copy.deepcopy(value)
+        return records
+
+    @classmethod
+    def apply(cls, save: typing.Dict[str, typing.Any],
+              entries: typing.Iterable[typing.Tuple[int, typing.List[typing.Tuple[str, str, typing.Any, typing.Any]]]]
+              ) -> int:
+        """Replays the journal entries of the generation of save onto it, skipping any of other generations.
+        Returns the number of entries applied."""
+        generation = save.get("journal_generation")
+        pairs = {field: dict(save[field]) for field in cls.pair_fields if field in save}
+        applied = 0
+        for entry_generation, records in entries:
+            if entry_generation != generation:
+                continue
+            applied += 1
+            for operation, field, key, value in records:
+                if operation == "replace":
+                    save[field] = value
+                    continue
+                if field in cls.pair_fields:
+                    container = pairs.setdefault(field, {})
+                else:
+                    container = save.setdefault(field, {})
+                if operation == "extend":
+                    container.setdefault(key, []).extend(value)
+                elif operation == "union":
+                    container.setdefault(key, set()).update(value)
+                elif operation == "set":
+                    container[key] = value
+                elif operation == "delete":
+                    container.pop(key, None)
+        for field, mapping in pairs.items():
+            save[field] = tuple(mapping.items())
+        return applied
+
+    @staticmethod
+    def encode_entry(generation: int, records: typing.List[typing.Tuple[str, str, typing.Any, typing.Any]]) -> bytes:
+        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+        return zlib.compress(pickle.dumps((generation, records)))
+
+    @staticmethod
+    def decode_entry(data: bytes) -> typing.Tuple[int, typing.List[typing.Tuple[str, str, typing.Any, typing.Any]]]:
+        return restricted_loads(zlib.decompress(data))
+
+    @classmethod
+    def read_file(cls, path: str) -> typing.List[typing.Tuple[int, typing.List[typing.Any]]]:
+        """Reads the entries of a journal file, ignoring a partially written last entry."""
+        entries = []
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return entries
+        position = 0
+        while position + 4 <= len(data):
+            length = int.from_bytes(data[position:position + 4], "big")
+            end = position + 4 + length
+            if end > len(data):
+                break
+            entries.append(cls.decode_entry(data[position + 4:end]))
+            position = end
+        return entries
+
+    @staticmethod
+    def append_file(path: str, entry: bytes) -> None:
+        with open(path, "ab") as f:
+            f.write(len(entry).to_bytes(4, "big"))
+            f.write(entry)
+
+
+# game data packages encoded for DataPackage by checksum and framing, least recently used first,
+# shared by every Context of the process, such as all rooms of a WebHost server process
+encoded_game_packages: typing.Dict[typing.Tuple[str, bool], typing.Union[str, bytes]] = {}
+encoded_game_packages_limit: int = 512
+
+
+def encode_game_package(game_package: typing.Mapping[str, typing.Any],
+                        binary: bool = False) -> typing.Union[str, bytes]:
+    """Returns the JSON, or MessagePack if binary, of a game data package, encoded once per checksum."""
+    encoder = encode_binary if binary else encode
+    checksum = game_package.get("checksum")
+    if checksum is None:
+        return encoder(game_package)
+    encoded = encoded_game_packages.pop((checksum, binary), None)
+    if encoded is None:
+        if not isinstance(game_package, dict):
+            # data packages looked up as needed, like the memory mapped ones of WebHost
+            game_package = {key: dict(value) if isinstance(value, collections.abc.Mapping) else value
+                            for key, value in game_package.items()}
+        encoded = encoder(game_package)
+        if len(encoded_game_packages) >= encoded_game_packages_limit:
+            del encoded_game_packages[next(iter(encoded_game_packages))]
+    encoded_game_packages[checksum, binary] = encoded
+    return encoded
+
+
+def encode_data_package(games: typing.Iterable[typing.Tuple[str, typing.Dict[str, typing.Any]]],
+                        binary: bool = False) -> typing.Union[str, bytes]:
+    """Returns the encoded DataPackage command for games, the same as encoding it whole would,
+    joined from the cached encodings of each game data package."""
+    if binary:
+        games = list(games)
+        packer = NetUtils.msgpack.Packer()
+        return b"".join((packer.pack_array_header(1), packer.pack_map_header(2),
+                         packer.pack("cmd"), packer.pack("DataPackage"), packer.pack("data"),
+                         packer.pack_map_header(1), packer.pack("games"), packer.pack_map_header(len(games)),
+                         *(packer.pack(name) + encode_game_package(game_package, True)
+                           for name, game_package in games)))
+    return '[{"cmd":"DataPackage","data":{"games":{' + \
+        ",".join(f"{encode(name)}:{encode_game_package(game_package)}" for name, game_package in games) + \
+        "}}}]"
+
+
 def queue_gc():
     import gc
     from threading import Thread
@@ -215,6 +460,7 @@ team_slot = typing.Tuple[int, int]
 
 class Context:
     dumper = staticmethod(encode)
+    binary_dumper = staticmethod(encode_binary)
     loader = staticmethod(decode)
 
     simple_options = {"hint_cost": int,
@@ -285,6 +531,8 @@ class Context:
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # (team, finding_player, location) -> the hint for that location, as it is in self.hints
+        self.hint_index: typing.Dict[typing.Tuple[int, int, int], Hint] = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -304,6 +552,10 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        self.save_journal = SaveJournal()
+        # (team, slot) whose received items grew since they were last sent to its clients
+        self.pending_item_slots: typing.Set[team_slot] = set()
+        self.pending_item_send: typing.Optional[asyncio.Handle] = None
         self.tags = ['AP']
         self.games: typing.Dict[int, str] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
@@ -378,7 +630,7 @@ class Context:
     async def send_msgs(self, endpoint: Endpoint, msgs: typing.Iterable[dict]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
-        msg = self.dumper(msgs)
+        msg = self.binary_dumper(msgs) if endpoint.binary_framing else self.dumper(msgs)
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -390,7 +642,7 @@ class Context:
                 self.logger.info(f"Outgoing message: {msg}")
             return True
 
-    async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
+    async def send_encoded_msgs(self, endpoint: Endpoint, msg: typing.Union[str, bytes]) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
         try:
@@ -404,7 +656,8 @@ class Context:
                 self.logger.info(f"Outgoing message: {msg}")
             return True
 
-    async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint], msg: str) -> bool:
+    async def broadcast_send_encoded_msgs(self, endpoints: typing.Iterable[Endpoint],
+                                          msg: typing.Union[str, bytes]) -> bool:
         sockets = []
         for endpoint in endpoints:
             if endpoint.socket and endpoint.socket.open:
@@ -419,15 +672,25 @@ class Context:
                 self.logger.info(f"Outgoing broadcast: {msg}")
             return True
 
+    def broadcast_msgs(self, endpoints: typing.Iterable[Endpoint], msgs: typing.List[dict]):
+        """Broadcasts msgs to endpoints, encoding them once for each framing in use by endpoints."""
+        text_endpoints: typing.List[Endpoint] = []
+        binary_endpoints: typing.List[Endpoint] = []
+        for endpoint in endpoints:
+            (binary_endpoints if endpoint.binary_framing else text_endpoints).append(endpoint)
+        if binary_endpoints:
+            async_start(self.broadcast_send_encoded_msgs(binary_endpoints, self.binary_dumper(msgs)))
+        if text_endpoints:
+            async_start(self.broadcast_send_encoded_msgs(text_endpoints, self.dumper(msgs)))
+
     def broadcast_all(self, msgs: typing.List[dict]):
         msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
-        data = self.dumper(msgs)
         endpoints = (
             endpoint
             for endpoint in self.endpoints
             if endpoint.auth and not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.broadcast_msgs(endpoints, msgs)
 
     def broadcast_text_all(self, text: str, additional_arguments: dict = {}):
         self.logger.info("Notice (all): %s" % text)
@@ -435,17 +698,15 @@ class Context:
 
     def broadcast_team(self, team: int, msgs: typing.List[dict]):
         msg_is_text = all(msg["cmd"] == "PrintJSON" for msg in msgs)
-        data = self.dumper(msgs)
         endpoints = (
             endpoint
             for endpoint in itertools.chain.from_iterable(self.clients[team].values())
             if not (msg_is_text and endpoint.no_text)
         )
-        async_start(self.broadcast_send_encoded_msgs(endpoints, data))
+        self.broadcast_msgs(endpoints, msgs)
 
     def broadcast(self, endpoints: typing.Iterable[Client], msgs: typing.List[dict]):
-        msgs = self.dumper(msgs)
-        async_start(self.broadcast_send_encoded_msgs(endpoints, msgs))
+        self.broadcast_msgs(endpoints, msgs)
 
     async def disconnect(self, endpoint: Client):
         if endpoint in self.endpoints:
@@ -548,6 +809,7 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+            self.index_hints(0, hints)
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -571,6 +833,10 @@ class Context:
                 del data["location_name_groups"]
             del data["item_name_groups"]  # remove from data package, but keep in self.item_name_groups
         self._init_game_data()
+        # encode the data packages clients of this multiworld will ask for ahead of time
+        for game_name in {"Archipelago", *self.games.values()}:
+            if game_name in self.gamespackage:
+                encode_game_package(self.gamespackage[game_name])
         for game_name, data in self.item_name_groups.items():
             self.read_data[f"item_name_groups_{game_name}"] = lambda lgame=game_name: self.item_name_groups[lgame]
         for game_name, data in self.location_name_groups.items():
@@ -592,13 +858,35 @@ class Context:
 
         return False
 
+    @property
+    def journal_filename(self) -> str:
+        return self.save_filename + ".journal"
+
     def _save(self, exit_save: bool = False) -> bool:
+        journal = self.save_journal
+        stored_data_keys: typing.Set[str] = set()
         try:
-            # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
-            with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+            save = self.get_save()
+            snapshot = exit_save or journal.needs_snapshot
+            stored_data_keys = journal.capture_stored_data(save, snapshot)
+            if snapshot:
+                journal.start_snapshot(save)
+                # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                encoded_save = zlib.compress(pickle.dumps(save))
+                with open(self.save_filename, "wb") as f:
+                    f.write(encoded_save)
+                # entries of older generations are skipped on load, so this only saves space
+                open(self.journal_filename, "wb").close()
+                journal.reset(save, len(encoded_save))
+            else:
+                records = journal.diff(save, stored_data_keys)
+                if records:
+                    entry = journal.encode_entry(journal.generation, records)
+                    journal.append_file(self.journal_filename, entry)
+                    journal.journal_size += len(entry)
         except Exception as e:
+            journal.invalidate()
+            journal.restore_stored_data(stored_data_keys)
             self.logger.exception(e)
             return False
         else:
@@ -615,7 +903,8 @@ class Context:
             try:
                 with open(self.save_filename, 'rb') as f:
                     save_data = restricted_loads(zlib.decompress(f.read()))
-                    self.set_save(save_data)
+                SaveJournal.apply(save_data, SaveJournal.read_file(self.journal_filename))
+                self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
@@ -654,7 +943,6 @@ class Context:
                 atexit.register(self._save, True)  # make sure we save on exit too
 
     def get_save(self) -> dict:
-        self.recheck_hints()
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
@@ -700,6 +988,9 @@ class Context:
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
+        # checks only update the hints of their locations from here on, so bring all loaded hints up to date once
+        self.hint_index.clear()
+        self.recheck_hints()
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -719,6 +1010,9 @@ class Context:
 
         if "stored_data" in savedata:
             self.stored_data = savedata["stored_data"]
+        # the next save compacts the replayed journal into a new snapshot
+        self.save_journal.generation = savedata.get("journal_generation", 0)
+        self.save_journal.invalidate()
         # count items and slots from lists for items_handling = remote
         self.logger.info(
             f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
@@ -754,9 +1048,31 @@ class Context:
                     if slot is not None and slot != player:
                         self.replace_hint(hint_team, player, hint, new_hint)
             self.hints[hint_team, hint_slot] = new_hints
+            self.index_hints(hint_team, new_hints)
+
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes only the hints for the specified locations of team/slot, as when they were just checked.
+        If a set is passed for 'changed', each (team,slot) pair that has a hint modified will be added to the set.
+        """
+        for location in locations:
+            hint = self.hint_index.get((team, slot, location))
+            if hint is None:
+                continue
+            new_hint = hint.re_check(self, team)
+            if hint == new_hint:
+                continue
+            for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
+                if changed is not None:
+                    changed.add((team, player))
+                self.replace_hint(team, player, hint, new_hint)
+
+    def index_hints(self, team: int, hints: typing.Iterable[Hint]) -> None:
+        for hint in hints:
+            self.hint_index[team, hint.finding_player, hint.location] = hint
 
     def get_rechecked_hints(self, team: int, slot: int):
-        self.recheck_hints(team, slot)
+        # hints are kept up to date as locations get checked
         return self.hints[team, slot]
 
     def get_sphere(self, player: int, location_id: int) -> int:
@@ -825,6 +1141,7 @@ class Context:
                 # we can check once if hint already exists
                 if hint not in self.hints[team, hint.finding_player]:
                     self.hints[team, hint.finding_player].add(hint)
+                    self.index_hints(team, (hint,))
                     new_hint_events.add(hint.finding_player)
                     for player in self.slot_set(hint.receiving_player):
                         self.hints[team, player].add(hint)
@@ -843,15 +1160,13 @@ class Context:
                     async_start(self.send_msgs(client, client_hints))
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location and hint.finding_player == finding_player:
-                return hint
-        return None
+        return self.hint_index.get((team, finding_player, seeked_location), None)
     
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+            self.index_hints(team, (new_hint,))
     
     # "events"
 
@@ -886,12 +1201,8 @@ class Context:
 
 
 def update_aliases(ctx: Context, team: int):
-    cmd = ctx.dumper([{"cmd": "RoomUpdate",
-                       "players": ctx.get_players_package()}])
-
-    for clients in ctx.clients[team].values():
-        for client in clients:
-            async_start(ctx.send_encoded_msgs(client, cmd))
+    ctx.broadcast_team(team, [{"cmd": "RoomUpdate",
+                               "players": ctx.get_players_package()}])
 
 
 async def server(websocket: "ServerConnection", path: str = "/", ctx: Context = None) -> None:
@@ -907,7 +1218,7 @@ async def server(websocket: "ServerConnection", path: str = "/", ctx: Context =
         async for data in websocket:
             if ctx.log_network:
                 ctx.logger.info(f"Incoming message: {data}")
-            for msg in decode(data):
+            for msg in decode_frame(data):
                 await process_client_cmd(ctx, client, msg)
     except Exception as e:
         if not isinstance(e, websockets.WebSocketException):
@@ -1068,20 +1379,34 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
 
 
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
-                    client.send_index = len(start_inventory) + len(items)
+    """Sends the new items of the slots in ctx.pending_item_slots to their clients. Within an event loop, this is
+    deferred to the end of the current iteration, so that all sends of it become one ReceivedItems per client."""
+    if ctx.pending_item_send:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_new_items(ctx)
+    else:
+        ctx.pending_item_send = loop.call_soon(flush_new_items, ctx)
+
+
+def flush_new_items(ctx: Context):
+    ctx.pending_item_send = None
+    pending_slots, ctx.pending_item_slots = ctx.pending_item_slots, set()
+    for team, slot in pending_slots:
+        for client in ctx.clients.get(team, {}).get(slot, ()):
+            if client.no_items:
+                continue
+            start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
+            items = get_received_items(ctx, team, slot, client.remote_items)
+            if len(start_inventory) + len(items) > client.send_index:
+                first_new_item = max(0, client.send_index - len(start_inventory))
+                async_start(ctx.send_msgs(client, [{
+                    "cmd": "ReceivedItems",
+                    "index": client.send_index,
+                    "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+                client.send_index = len(start_inventory) + len(items)
 
 
 def update_checked_locations(ctx: Context, team: int, slot: int):
@@ -1129,6 +1454,7 @@ def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
             get_received_items(ctx, team, target, True).append(item)
+        ctx.pending_item_slots.add((team, target))
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1173,7 +1499,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             "checked_locations": new_locations,  # send back new checks only
         }])
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1675,6 +2001,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
                 get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
                 get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                self.ctx.pending_item_slots.add((self.client.team, self.client.slot))
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1695,6 +2022,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
             hints = {hint.re_check(self.ctx, self.client.team) for hint in
                      self.ctx.hints[self.client.team, self.client.slot]}
             self.ctx.hints[self.client.team, self.client.slot] = hints
+            self.ctx.index_hints(self.client.team, hints)
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1914,6 +2242,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             ctx.clients[team][slot].append(client)
             client.version = args['version']
             client.tags = args['tags']
+            client.binary_framing = NetUtils.binary_framing_available and NetUtils.binary_framing_tag in client.tags
             client.no_locations = bool(client.tags & _non_game_messages.keys())
             # set NoText for old PopTracker clients that predate the tag to save traffic
             client.no_text = "NoText" in client.tags or ("PopTracker" in client.tags and client.version < (0, 5, 1))
@@ -1942,23 +2271,17 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested_games = set(args.get("games", []))
+            games = [(name, game_data) for name, game_data in ctx.gamespackage.items() if name in requested_games]
+            await ctx.send_encoded_msgs(client, encode_data_package(games, client.binary_framing))
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
+            games = [(name, game_data) for name, game_data in ctx.gamespackage.items() if name not in exclusions]
+            await ctx.send_encoded_msgs(client, encode_data_package(games, client.binary_framing))
 
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            await ctx.send_encoded_msgs(client, encode_data_package(ctx.gamespackage.items(), client.binary_framing))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1987,6 +2310,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if "tags" in args:
                 old_tags = client.tags
                 client.tags = args["tags"]
+                client.binary_framing = NetUtils.binary_framing_available and NetUtils.binary_framing_tag in client.tags
                 if set(old_tags) != set(client.tags):
                     client.no_locations = bool(client.tags & _non_game_messages.keys())
                     client.no_text = "NoText" in client.tags or (
@@ -2183,10 +2507,13 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             value = ctx.stored_data.get(args["key"], args.get("default", 0))
             args["original_value"] = copy.copy(value)
             args["slot"] = client.slot
-            for operation in args["operations"]:
-                func = modify_functions[operation["operation"]]
-                value = func(value, operation["value"])
-            ctx.stored_data[args["key"]] = args["value"] = value
+            # operations may modify the value in place, so a save must not capture it midway
+            with ctx.save_journal.stored_data_lock:
+                for operation in args["operations"]:
+                    func = modify_functions[operation["operation"]]
+                    value = func(value, operation["value"])
+                ctx.stored_data[args["key"]] = args["value"] = value
+                ctx.save_journal.dirty_stored_data.add(args["key"])
             targets = set(ctx.stored_data_notification_clients[args["key"]])
             if args.get("want_reply", False):
                 targets.add(client)
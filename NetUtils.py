@@ -3,8 +3,10 @@ from __future__ import annotations
 from collections.abc import Mapping, Sequence
 import typing
 import enum
+import itertools
 import warnings
 from json import JSONEncoder, JSONDecoder
+from json.encoder import encode_basestring
 
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
@@ -134,11 +136,89 @@ _encode = JSONEncoder(
     separators=(',', ':'),
 ).encode
 
+# types that _scan_for_TypedTuples leaves as they are, so JSONEncoder can encode them without scanning
+_plain_types: typing.FrozenSet[type] = frozenset((str, int, float, bool, type(None)))
 
-def encode(obj: typing.Any) -> str:
+
+class _TypedTupleTemplate(typing.NamedTuple):
+    fields: typing.Tuple[str, ...]
+    name: str
+    int_format: str
+    """%-format of the JSON, for when all fields are int"""
+
+
+_typed_tuple_templates: typing.Dict[type, _TypedTupleTemplate] = {}
+
+
+def _get_typed_tuple_template(typed_tuple_type: type) -> _TypedTupleTemplate:
+    template = _typed_tuple_templates.get(typed_tuple_type)
+    if template is None:
+        fields = typed_tuple_type._fields
+        items = [encode_basestring(field).replace("%", "%%") + ":%d" for field in fields]
+        items.append(_encode("class") + ":" + encode_basestring(typed_tuple_type.__name__).replace("%", "%%"))
+        template = _TypedTupleTemplate(fields, typed_tuple_type.__name__, "{" + ",".join(items) + "}")
+        _typed_tuple_templates[typed_tuple_type] = template
+    return template
+
+
+def _is_typed_tuple_type(obj_type: type) -> bool:
+    return obj_type in _typed_tuple_templates or (issubclass(obj_type, tuple) and hasattr(obj_type, "_fields"))
+
+
+def _typed_tuple_as_dict(obj: typing.Any) -> typing.Any:
+    """Converts a NamedTuple to a dict like _scan_for_TypedTuples does, passing anything else through."""
+    if type(obj) in _plain_types:
+        return obj
+    template = _get_typed_tuple_template(type(obj))
+    data = dict(zip(template.fields, obj))
+    data["class"] = template.name
+    return data
+
+
+def _encode_value(obj: typing.Any) -> str:
+    """Encodes obj in a single pass, giving the same JSON as _encode(_scan_for_TypedTuples(obj)).
+    Containers of plain values and NamedTuples are handed to JSONEncoder as a whole, anything else is recursed into."""
+    obj_type = type(obj)
+    if obj_type is list or obj_type is tuple or obj_type is set or obj_type is frozenset:
+        element_types = set(map(type, obj))
+        if element_types <= _plain_types:
+            return _encode(obj if obj_type is list or obj_type is tuple else tuple(obj))
+        if all(element_type in _plain_types or _is_typed_tuple_type(element_type) for element_type in element_types):
+            if len(element_types) == 1 and set(map(type, itertools.chain.from_iterable(obj))) <= {int}:
+                # such as ReceivedItems, a list of NetworkItem
+                int_format = _get_typed_tuple_template(element_types.pop()).int_format
+                return "[" + ",".join(map(int_format.__mod__, obj)) + "]"
+            return _encode(list(map(_typed_tuple_as_dict, obj)))
+        return "[" + ",".join(map(_encode_value, obj)) + "]"
+    if obj_type is dict:
+        value_types = set(map(type, obj.values()))
+        if value_types <= _plain_types:
+            return _encode(obj)
+        if all(value_type in _plain_types or _is_typed_tuple_type(value_type) for value_type in value_types):
+            return _encode({key: _typed_tuple_as_dict(value) for key, value in obj.items()})
+        items = []
+        for key, value in obj.items():
+            key_type = type(key)
+            if key_type is str:
+                key = encode_basestring(key)
+            elif key_type is int:
+                key = '"' + int.__repr__(key) + '"'
+            else:
+                # leave conversion of other keys, and raising for unsupported ones, to JSONEncoder
+                return _encode(_scan_for_TypedTuples(obj))
+            items.append(key + ":" + _encode_value(value))
+        return "{" + ",".join(items) + "}"
+    if obj_type in _plain_types:
+        return _encode(obj)
+    if _is_typed_tuple_type(obj_type):
+        return _encode(_typed_tuple_as_dict(obj))
     return _encode(_scan_for_TypedTuples(obj))
 
 
+def encode(obj: typing.Any) -> str:
+    return _encode_value(obj)
+
+
 def get_any_version(data: dict) -> Version:
     data = {key.lower(): value for key, value in data.items()}  # .NET version classes have capitalized keys
     return Version(int(data["major"]), int(data["minor"]), int(data["build"]))
@@ -172,14 +252,74 @@ def _object_hook(o: typing.Any) -> typing.Any:
 
 decode = JSONDecoder(object_hook=_object_hook).decode
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+binary_framing_tag = "MessagePack"
+"""Connect tag of clients that want to receive messages as MessagePack in binary frames instead of JSON in text frames.
+Either end decodes messages by frame type, so text frames stay valid both ways.
+A server that has msgpack answers a Connect with this tag in binary, after which the client sends binary as well."""
+binary_framing_available: bool = msgpack is not None
+
+
+def _scan_for_binary(obj: typing.Any) -> typing.Any:
+    """Converts obj to what MessagePack packs to the same data that decode returns for encode(obj)."""
+    obj_type = type(obj)
+    if obj_type is list or obj_type is tuple:
+        if set(map(type, obj)) <= _plain_types:
+            return obj
+        return list(map(_scan_for_binary, obj))
+    if obj_type is dict and set(map(type, obj)) <= {str} and set(map(type, obj.values())) <= _plain_types:
+        return obj
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        # like _asdict for JSON, the fields themselves are not scanned
+        return _typed_tuple_as_dict(obj)
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        return list(map(_scan_for_binary, obj))
+    if isinstance(obj, dict):
+        data = {}
+        for key, value in obj.items():
+            # JSON object keys are always strings
+            if not isinstance(key, str):
+                if key is not None and not isinstance(key, (int, float)):
+                    raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+                key = _encode(key)
+            data[key] = _scan_for_binary(value)
+        return data
+    return obj
+
+
+def encode_binary(obj: typing.Any) -> bytes:
+    """Encodes obj as MessagePack, to the same data as encode would. Requires msgpack."""
+    return msgpack.packb(_scan_for_binary(obj))
+
+
+def decode_binary(data: bytes) -> typing.Any:
+    """Decodes MessagePack, like decode does JSON. Requires msgpack."""
+    return msgpack.unpackb(data, object_hook=_object_hook)
+
+
+def decode_frame(data: typing.Union[str, bytes]) -> typing.Any:
+    """Decodes the data of a text frame as JSON and of a binary frame as MessagePack."""
+    if isinstance(data, bytes):
+        if msgpack is None:
+            raise ValueError("Received a binary frame, but msgpack is not installed.")
+        return decode_binary(data)
+    return decode(data)
+
 
 class Endpoint:
-    __slots__ = ("socket",)
+    __slots__ = ("socket", "binary_framing")
 
     socket: "ServerConnection"
+    binary_framing: bool
+    """whether to send messages to this endpoint as MessagePack in binary frames"""
 
     def __init__(self, socket):
         self.socket = socket
+        self.binary_framing = False
 
 
 class HandlerMeta(type):
@@ -0,0 +1,364 @@
+"""
+Opt-in generation profiler, enabled by ``Generate.py --profile``.
+
+While a :class:`GenerationProfiler` is active it attributes wall time and call counts to the generation stages, to each
+world's stage methods and to the expensive core algorithms marked with :func:`profiled`, and it counts and times every
+Location and Entrance access_rule evaluation. When generation is done it writes a JSON report and a collapsed-stack
+file that can be fed to flamegraph.pl, speedscope or inferno. When no profiler is active all hooks are a cheap no-op.
+"""
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from types import GeneratorType
+from typing import Any, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from BaseClasses import CollectionRule, CollectionState, Entrance, Location, MultiWorld
+
+__all__ = ["GenerationProfiler", "get_active_profiler", "instrument_rules", "profiled", "section"]
+
+logger = logging.getLogger("performance")
+
+_active_profiler: GenerationProfiler | None = None
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def get_active_profiler() -> GenerationProfiler | None:
+    return _active_profiler
+
+
+def section(name: str) -> contextlib.AbstractContextManager[None]:
+    """Times the code within the context as name, if a profiler is active."""
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.section(name)
+
+
+def instrument_rules(multiworld: MultiWorld) -> None:
+    """Wraps the access rules of multiworld to be counted and timed, if a profiler is active."""
+    if _active_profiler is not None:
+        _active_profiler.instrument_rules(multiworld)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Decorator that times calls of the decorated function as name, if a profiler is active.
+    Returned generators are timed for each step they are advanced."""
+    def decorator(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _active_profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            with profiler.section(name):
+                result = function(*args, **kwargs)
+            if isinstance(result, GeneratorType):
+                return profiler.profile_generator(name, result)
+            return result
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+class _Frame:
+    __slots__ = ("name", "start", "child_time", "rule_time")
+
+    name: str
+    start: float
+    child_time: float
+    rule_time: dict[int, float]
+    """own time of the access rules evaluated directly within this frame, per player"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.rule_time = {}
+
+
+class _ThreadState:
+    __slots__ = ("frames", "nested_time")
+
+    frames: list[_Frame]
+    nested_time: float
+    """time spent in access rules and sections nested in the access rule that is currently being evaluated"""
+
+    def __init__(self, frames: list[_Frame]) -> None:
+        self.frames = frames
+        self.nested_time = 0.0
+
+
+class RuleStats:
+    __slots__ = ("player", "name", "calls", "time", "own_time", "active")
+
+    player: int
+    name: str
+    calls: int
+    time: float
+    own_time: float
+    """time excluding the access rules that were evaluated while evaluating this one"""
+    active: bool
+
+    def __init__(self, player: int, name: str) -> None:
+        self.player = player
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.own_time = 0.0
+        self.active = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"player": self.player, "name": self.name, "calls": self.calls,
+                "time": self.time, "own_time": self.own_time}
+
+
+class ProfiledRule:
+    """Callable stand-in for an access rule, that counts and times evaluations of the wrapped rule."""
+    __slots__ = ("rule", "stats", "profiler")
+
+    rule: CollectionRule
+    stats: RuleStats
+    profiler: GenerationProfiler
+
+    def __init__(self, rule: CollectionRule, stats: RuleStats, profiler: GenerationProfiler) -> None:
+        self.rule = rule
+        self.stats = stats
+        self.profiler = profiler
+
+    def __call__(self, state: CollectionState) -> bool:
+        stats = self.stats
+        if stats.active:
+            # a rule wrapped again after a world extended it, only count the outermost evaluation
+            return self.rule(state)
+        thread = self.profiler.thread_state()
+        outer_nested_time = thread.nested_time
+        thread.nested_time = 0.0
+        stats.active = True
+        start = time.perf_counter()
+        try:
+            return self.rule(state)
+        finally:
+            taken = time.perf_counter() - start
+            own_time = taken - thread.nested_time
+            thread.nested_time = outer_nested_time + taken
+            stats.active = False
+            stats.calls += 1
+            stats.time += taken
+            stats.own_time += own_time
+            if thread.frames:
+                rule_time = thread.frames[-1].rule_time
+                rule_time[stats.player] = rule_time.get(stats.player, 0.0) + own_time
+
+
+class GenerationProfiler:
+    """
+    Collects timings while active. Use as a context manager around generation, then call :meth:`write`.
+
+    Counts are only approximate for access rules evaluated from several threads at the same time.
+    """
+    multiworld: MultiWorld | None
+    sections: dict[str, list[float]]
+    """inclusive [calls, time] of each section name"""
+    world_calls: dict[int, dict[str, list[float]]]
+    """[calls, time] of each world method, per player"""
+    collapsed: Counter[str]
+    """own time of each stack of sections"""
+    rule_stats: dict[str, dict[int, dict[str, RuleStats]]]
+    """statistics per kind of spot, player and spot name"""
+    total_time: float
+
+    _local: threading.local
+    _lock: threading.Lock
+    _wrapped: list[tuple[Location | Entrance, ProfiledRule, CollectionRule]]
+
+    def __init__(self) -> None:
+        self.multiworld = None
+        self.sections = {}
+        self.world_calls = {}
+        self.collapsed = Counter()
+        self.rule_stats = {"locations": {}, "entrances": {}}
+        self.total_time = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wrapped = []
+
+    def __enter__(self) -> GenerationProfiler:
+        global _active_profiler
+        assert _active_profiler is None, "Only one generation can be profiled at a time."
+        _active_profiler = self
+        self.thread_state().frames.append(_Frame("generation"))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active_profiler
+        frames = self.thread_state().frames
+        while frames:
+            self.total_time = self._exit_frame(frames)
+        self.restore_rules()
+        _active_profiler = None
+
+    def thread_state(self) -> _ThreadState:
+        try:
+            return self._local.state
+        except AttributeError:
+            # sections on worker threads are grouped under the name of their thread
+            thread = threading.current_thread()
+            frames = [] if thread is threading.main_thread() else [_Frame(thread.name)]
+            state = self._local.state = _ThreadState(frames)
+            return state
+
+    @contextlib.contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        thread = self.thread_state()
+        frames = thread.frames
+        frames.append(_Frame(name.replace(";", ",")))
+        try:
+            yield
+        finally:
+            taken = self._exit_frame(frames)
+            # lets an access rule that caused this section exclude it from its own time
+            thread.nested_time += taken
+
+    def profile_generator(self, name: str, generator: Iterator[Any]) -> Iterator[Any]:
+        while True:
+            with self.section(name):
+                try:
+                    value = next(generator)
+                except StopIteration:
+                    return
+            yield value
+
+    def _exit_frame(self, frames: list[_Frame]) -> float:
+        frame = frames[-1]
+        taken = time.perf_counter() - frame.start
+        stack = ";".join(frame.name for frame in frames)
+        names = [frame.name for frame in frames[:-1]]
+        frames.pop()
+        own_time = taken - frame.child_time
+        with self._lock:
+            for player, rule_time in frame.rule_time.items():
+                self.collapsed[f"{stack};{self._rule_frame_name(player)}"] += rule_time
+                own_time -= rule_time
+            self.collapsed[stack] += max(own_time, 0.0)
+            if frame.name not in names:  # don't count recursion twice
+                stats = self.sections.setdefault(frame.name, [0, 0.0])
+                stats[0] += 1
+                stats[1] += taken
+        if frames:
+            frames[-1].child_time += taken
+        return taken
+
+    def _rule_frame_name(self, player: int) -> str:
+        if self.multiworld is None:
+            return f"access rules of player {player}"
+        return f"access rules of {self.multiworld.get_player_name(player)} ({self.multiworld.game[player]})"
+
+    @contextlib.contextmanager
+    def world_call(self, method: Callable[..., Any], multiworld: MultiWorld | None,
+                   player: int | None) -> Iterator[None]:
+        """Times a world method, attributing it to player if given."""
+        if multiworld is not None:
+            self.multiworld = multiworld
+        if player and multiworld:
+            name = f"{multiworld.get_player_name(player)} ({multiworld.game[player]})"
+        else:
+            name = method.__qualname__
+        start = time.perf_counter()
+        try:
+            with self.section(name):
+                yield
+        finally:
+            taken = time.perf_counter() - start
+            with self._lock:
+                stats = self.world_calls.setdefault(player or 0, {}).setdefault(method.__name__, [0, 0.0])
+                stats[0] += 1
+                stats[1] += taken
+
+    def instrument_rules(self, multiworld: MultiWorld) -> None:
+        """Wraps all access rules that aren't wrapped yet. Can be called again after worlds changed their rules."""
+        self.multiworld = multiworld
+        spots: list[tuple[str, Location | Entrance]] = [("locations", location)
+                                                        for location in multiworld.get_locations()]
+        spots += [("entrances", entrance) for entrance in multiworld.get_entrances()]
+        for kind, spot in spots:
+            rule = spot.access_rule
+            if isinstance(rule, ProfiledRule):
+                continue
+            player_stats = self.rule_stats[kind].setdefault(spot.player, {})
+            stats = player_stats.get(spot.name)
+            if stats is None:
+                stats = player_stats[spot.name] = RuleStats(spot.player, spot.name)
+            wrapped = ProfiledRule(rule, stats, self)
+            spot.access_rule = wrapped
+            self._wrapped.append((spot, wrapped, rule))
+
+    def restore_rules(self) -> None:
+        """Unwraps the access rules, unless a world replaced them since."""
+        for spot, wrapped, rule in reversed(self._wrapped):
+            if spot.access_rule is wrapped:
+                spot.access_rule = rule
+        self._wrapped.clear()
+
+    def report(self) -> dict[str, Any]:
+        worlds: dict[str, Any] = {}
+        for player, calls in sorted(self.world_calls.items()):
+            world: dict[str, Any] = {
+                "stages": {method_name: {"calls": stats[0], "time": stats[1]}
+                           for method_name, stats in calls.items()},
+            }
+            if player and self.multiworld:
+                world["name"] = self.multiworld.get_player_name(player)
+                world["game"] = self.multiworld.game[player]
+            worlds[str(player)] = world
+        for kind, stats_per_player in self.rule_stats.items():
+            for player, player_stats in sorted(stats_per_player.items()):
+                world = worlds.setdefault(str(player), {"stages": {}})
+                world[f"{kind[:-1]}_rules"] = {
+                    "count": len(player_stats),
+                    "calls": sum(stats.calls for stats in player_stats.values()),
+                    "time": sum(stats.time for stats in player_stats.values()),
+                    "own_time": sum(stats.own_time for stats in player_stats.values()),
+                }
+
+        def spot_report(kind: str) -> list[dict[str, Any]]:
+            spots = [stats for player_stats in self.rule_stats[kind].values() for stats in player_stats.values()
+                     if stats.calls]
+            spots.sort(key=lambda stats: (-stats.own_time, stats.player, stats.name))
+            return [stats.as_dict() for stats in spots]
+
+        return {
+            "seed_name": self.multiworld.seed_name if self.multiworld else None,
+            "total_time": self.total_time,
+            "sections": {name: {"calls": stats[0], "time": stats[1]}
+                         for name, stats in sorted(self.sections.items(), key=lambda item: -item[1][1])},
+            "worlds": worlds,
+            "locations": spot_report("locations"),
+            "entrances": spot_report("entrances"),
+        }
+
+    def collapsed_stacks(self) -> list[str]:
+        """Lines of the collapsed-stack format, weighted in microseconds."""
+        lines = []
+        for stack, taken in sorted(self.collapsed.items()):
+            microseconds = round(taken * 1_000_000)
+            if microseconds > 0:
+                lines.append(f"{stack} {microseconds}")
+        return lines
+
+    def write(self, base_path: str) -> tuple[str, str]:
+        """Writes base_path.json and base_path.collapsed and returns their paths."""
+        report_path = f"{base_path}.json"
+        collapsed_path = f"{base_path}.collapsed"
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed_stacks()))
+            f.write("\n")
+        logger.info(f"Wrote generation profile to {report_path} and {collapsed_path}.")
+        return report_path, collapsed_path
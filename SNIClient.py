@@ -118,6 +118,7 @@ class SNIContext(CommonContext):
     command_processor: typing.Type[SNIClientCommandProcessor] = SNIClientCommandProcessor
     game: typing.Optional[str] = None  # set in validate_rom
     items_handling: typing.Optional[int] = None  # set in game_watcher
+    want_binary_framing = True
     snes_connect_task: "typing.Optional[asyncio.Task[None]]" = None
     snes_autoreconnect_task: typing.Optional["asyncio.Task[None]"] = None
 
@@ -515,7 +516,43 @@ async def snes_recv_loop(ctx: SNIContext) -> None:
             ctx.snes_autoreconnect_task = asyncio.create_task(snes_autoreconnect(ctx), name="snes auto-reconnect")
 
 
+SNES_READ_RANGES_PER_REQUEST = 8
+"""operand pairs per GetAddress request, as devices like the SD2SNES read at most 8 ranges in one command"""
+
+
 async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional[bytes]:
+    data = await snes_read_ranges(ctx, [(address, size)])
+    return None if data is None else data[0].tobytes()
+
+
+async def snes_read_ranges(ctx: SNIContext, ranges: typing.Sequence[typing.Tuple[int, int]]) \
+        -> typing.Optional[typing.List[memoryview]]:
+    """
+    Reads (address, size) ranges of SNES memory with as few GetAddress requests as possible,
+    reading overlapping and adjacent ranges once and sending all requests before receiving any data.
+    Returns None if reading fails, otherwise read-only views of the data of each range, in the order of ranges.
+    """
+    from worlds.AutoSNIClient import SNES_READ_CHUNK_SIZE
+
+    # merge ranges in order of their address, and remember where in the merged ranges each range is
+    merged: typing.List[typing.List[int]] = []  # address, size, offset of the data in the buffer
+    parts: typing.List[typing.Tuple[int, int]] = [(0, 0)] * len(ranges)  # offset of the data in the buffer, size
+    for index in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+        address, size = ranges[index]
+        if merged and address <= merged[-1][0] + merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], address + size - merged[-1][0])
+        else:
+            merged.append([address, size, merged[-1][2] + merged[-1][1] if merged else 0])
+        parts[index] = (merged[-1][2] + address - merged[-1][0], size)
+
+    # chunk big ranges, as SNI has problems with big reads from some devices, see SNES_READ_CHUNK_SIZE
+    operands: typing.List[str] = []
+    for address, size, _ in merged:
+        for chunk_address in range(address, address + size, SNES_READ_CHUNK_SIZE):
+            chunk_size = min(SNES_READ_CHUNK_SIZE, address + size - chunk_address)
+            operands += (hex(chunk_address)[2:], hex(chunk_size)[2:])
+    data_size = merged[-1][2] + merged[-1][1] if merged else 0
+
     try:
         await ctx.snes_request_lock.acquire()
 
@@ -527,33 +564,40 @@ async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional
         ):
             return None
 
-        GetAddress_Request: SNESRequest = {
-            "Opcode": "GetAddress",
-            "Space": "SNES",
-            "Operands": [hex(address)[2:], hex(size)[2:]]
-        }
         try:
-            await ctx.snes_socket.send(dumps(GetAddress_Request))
+            for start in range(0, len(operands), 2 * SNES_READ_RANGES_PER_REQUEST):
+                GetAddress_Request: SNESRequest = {
+                    "Opcode": "GetAddress",
+                    "Space": "SNES",
+                    "Operands": operands[start:start + 2 * SNES_READ_RANGES_PER_REQUEST]
+                }
+                await ctx.snes_socket.send(dumps(GetAddress_Request))
         except ConnectionClosed:
             return None
 
-        data: bytes = bytes()
-        while len(data) < size:
+        # the data of all requests arrives in the order of their operands, possibly split over several messages
+        data = bytearray(data_size)
+        received = 0
+        while received < data_size:
             try:
-                data += await asyncio.wait_for(ctx.snes_recv_queue.get(), 5)
+                message = await asyncio.wait_for(ctx.snes_recv_queue.get(), 5)
             except asyncio.TimeoutError:
                 break
-
-        if len(data) != size:
-            snes_logger.error('Error reading %s, requested %d bytes, received %d' % (hex(address), size, len(data)))
-            if len(data):
-                snes_logger.error(str(data))
+            data[received:received + len(message)] = message
+            received += len(message)
+
+        if received != data_size:
+            snes_logger.error('Error reading %s, requested %d bytes, received %d' %
+                              (hex(merged[0][0]), data_size, received))
+            if received:
+                snes_logger.error(str(bytes(data)))
                 snes_logger.warning('Communication Failure with SNI')
             if ctx.snes_socket is not None and not ctx.snes_socket.closed:
                 await ctx.snes_socket.close()
             return None
 
-        return data
+        view = memoryview(data).toreadonly()
+        return [view[offset:offset + size] for offset, size in parts]
     finally:
         ctx.snes_request_lock.release()
 
@@ -661,6 +705,7 @@ async def game_watcher(ctx: SNIContext) -> None:
 
         try:
             await ctx.client_handler.game_watcher(ctx)
+            await snes_flush_writes(ctx)
         except Exception as e:
             snes_logger.error(f"An error occurred, see logs for details: {e}")
             text_file_logger = logging.getLogger()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import concurrent.futures
+import contextlib
 import json
 import typing
 import builtins
@@ -15,6 +16,7 @@ import io
 import collections
 import importlib
 import logging
+import threading
 import warnings
 
 from argparse import Namespace
@@ -35,6 +37,7 @@ except ImportError:
 if typing.TYPE_CHECKING:
     import tkinter
     import pathlib
+    import sqlite3
     from BaseClasses import Region
     import multiprocessing
 
@@ -331,8 +334,10 @@ def persistent_store(category: str, key: str, value: typing.Any, force_store: bo
     category_dict = storage.setdefault(category, {})
     category_dict[key] = value
     path = user_path("_persistent_storage.yaml")
-    with open(path, "wt") as f:
+    # write a temporary file first, so the store is never left half written
+    with open(f"{path}.tmp", "wt") as f:
         f.write(dump(storage, Dumper=Dumper))
+    os.replace(f"{path}.tmp", path)
 
 
 def persistent_load() -> Dict[str, Dict[str, Any]]:
@@ -357,22 +362,92 @@ def get_file_safe_name(name: str) -> str:
     return "".join(c for c in name if c not in '<>:"/\\|?*')
 
 
+_data_package_cache_lock = threading.Lock()
+
+
+def _get_data_package_cache() -> "sqlite3.Connection":
+    """
+    Returns the cache of data packages and their groups, which holds a row per game and checksum,
+    so games are loaded as they are needed, and every store is a transaction of just the changed game.
+    It is opened once per process, and used with _data_package_cache_lock held.
+    """
+    import sqlite3
+    folder = cache_path("datapackage")
+    path = os.path.join(folder, "datapackage.sqlite3")
+    cached: typing.Optional[typing.Tuple[str, sqlite3.Connection]] = getattr(_get_data_package_cache, "cached", None)
+    if cached and cached[0] == path:
+        return cached[1]
+
+    os.makedirs(folder, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    try:
+        # data packages are big, so they are read from big pages of the memory mapped file
+        connection.execute("PRAGMA page_size = 65536")  # only changes the page size of a new file
+        connection.execute(f"PRAGMA mmap_size = {1 << 28}")
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS data_packages (game TEXT NOT NULL, checksum TEXT NOT NULL, "
+                               "data BLOB NOT NULL, PRIMARY KEY (game, checksum))")
+            connection.execute("CREATE TABLE IF NOT EXISTS data_package_groups (game TEXT NOT NULL, "
+                               "checksum TEXT NOT NULL, kind TEXT NOT NULL, data BLOB NOT NULL, "
+                               "PRIMARY KEY (game, checksum, kind))")
+    except BaseException:
+        connection.close()
+        raise
+    if cached:
+        cached[1].close()
+    setattr(_get_data_package_cache, "cached", (path, connection))
+    return connection
+
+
+def _pack_cached(data: typing.Any) -> bytes:
+    import orjson
+    return orjson.dumps(data)
+
+
+def _unpack_cached(data: bytes) -> typing.Any:
+    import orjson
+    return orjson.loads(data)
+
+
+def _store_data_package(game: str, checksum: str, data: typing.Dict[str, Any]) -> None:
+    with _data_package_cache_lock:
+        connection = _get_data_package_cache()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO data_packages (game, checksum, data) VALUES (?, ?, ?)",
+                               (game, checksum, _pack_cached(data)))
+
+
 def load_data_package_for_checksum(game: str, checksum: typing.Optional[str]) -> Dict[str, Any]:
     if checksum and game:
         if checksum != get_file_safe_name(checksum):
             raise ValueError(f"Bad symbols in checksum: {checksum}")
-        path = cache_path("datapackage", get_file_safe_name(game), f"{checksum}.json")
+        try:
+            with _data_package_cache_lock:
+                row = _get_data_package_cache().execute(
+                    "SELECT data FROM data_packages WHERE game = ? AND checksum = ?", (game, checksum)).fetchone()
+            if row:
+                return _unpack_cached(row[0])
+        except Exception as e:
+            logging.debug(f"Could not load data package: {e}")
+
+        # fall back to the file per data package of older versions, and move it into the cache
+        folder = cache_path("datapackage", get_file_safe_name(game))
+        path = os.path.join(folder, f"{checksum}.json")
         if os.path.exists(path):
             try:
                 with open(path, "r", encoding="utf-8-sig") as f:
-                    return json.load(f)
+                    data = json.load(f)
             except Exception as e:
                 logging.debug(f"Could not load data package: {e}")
-
-    # fall back to old cache
-    cache = persistent_load().get("datapackage", {}).get("games", {}).get(game, {})
-    if cache.get("checksum") == checksum:
-        return cache
+            else:
+                try:
+                    _store_data_package(game, checksum, data)
+                    os.remove(path)
+                    with contextlib.suppress(OSError):
+                        os.rmdir(folder)  # only removed once no other data package of the game is left in it
+                except Exception as e:
+                    logging.debug(f"Could not move data package into the cache: {e}")
+                return data
 
     # cache does not match
     return {}
@@ -383,15 +458,39 @@ def store_data_package_for_checksum(game: str, data: typing.Dict[str, Any]) -> N
     if checksum and game:
         if checksum != get_file_safe_name(checksum):
             raise ValueError(f"Bad symbols in checksum: {checksum}")
-        game_folder = cache_path("datapackage", get_file_safe_name(game))
-        os.makedirs(game_folder, exist_ok=True)
         try:
-            with open(os.path.join(game_folder, f"{checksum}.json"), "w", encoding="utf-8-sig") as f:
-                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            _store_data_package(game, checksum, data)
         except Exception as e:
             logging.debug(f"Could not store data package: {e}")
 
 
+def load_data_package_groups(game: str, checksum: typing.Optional[str]) -> Dict[str, Dict[str, typing.List[str]]]:
+    """Returns the cached item_name_groups and location_name_groups of game with checksum, of those that are cached."""
+    try:
+        with _data_package_cache_lock:
+            rows = _get_data_package_cache().execute(
+                "SELECT kind, data FROM data_package_groups WHERE game = ? AND checksum = ?",
+                (game, checksum or "")).fetchall()
+    except Exception as e:
+        logging.debug(f"Could not load data package groups: {e}")
+        return {}
+    return {kind: _unpack_cached(data) for kind, data in rows}
+
+
+def store_data_package_groups(game: str, checksum: typing.Optional[str],
+                              kind: typing.Literal["item_name_groups", "location_name_groups"],
+                              groups: Dict[str, typing.List[str]]) -> None:
+    """Caches the item_name_groups or location_name_groups of game with checksum."""
+    try:
+        with _data_package_cache_lock:
+            connection = _get_data_package_cache()
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO data_package_groups (game, checksum, kind, data) "
+                                   "VALUES (?, ?, ?, ?)", (game, checksum or "", kind, _pack_cached(groups)))
+    except Exception as e:
+        logging.debug(f"Could not store data package groups: {e}")
+
+
 def read_apignore(filename: str | pathlib.Path) -> PathSpec | None:
     try:
         with open(filename) as ignore_file:
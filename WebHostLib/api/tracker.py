@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from typing import Any, TypedDict
 from uuid import UUID
 
-from flask import abort
+from flask import Response, abort, make_response, request
 
 from NetUtils import ClientStatus, Hint, NetworkItem, SlotType
 from WebHostLib import cache
@@ -65,10 +65,11 @@ class PlayerGame(TypedDict):
 
 
 @api_endpoints.route("/tracker/<suuid:tracker>")
-@cache.memoize(timeout=60)
-def tracker_data(tracker: UUID) -> dict[str, Any]:
+def tracker_data(tracker: UUID) -> Response:
     """
     Outputs json data to <root_path>/api/tracker/<id of current session tracker>.
+    Once the room server published the state of the room, the response has an ETag of its version,
+    and requests with If-None-Match of the current version get a 304 Not Modified response.
 
     :param tracker: UUID of current session tracker.
 
@@ -78,6 +79,22 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
     if not room:
         abort(404)
 
+    version: int | None = room.tracker_snapshot.version if room.tracker_snapshot else None
+    if version is None:
+        return make_response(_tracker_data(tracker, version))
+    etag = str(version)
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(_tracker_data(tracker, version))
+    response.set_etag(etag)
+    return response
+
+
+@cache.memoize(timeout=60)
+def _tracker_data(tracker: UUID, version: int | None) -> dict[str, Any]:
+    """Tracking data for all players in the room, cached per published version of the state of the room."""
+    room: Room = Room.get(tracker=tracker)
     tracker_data = TrackerData(room)
 
     all_players: dict[int, list[int]] = tracker_data.get_all_players()
@@ -24,8 +24,9 @@ from MultiServer import (
     server_per_message_deflate_factory,
 )
 from Utils import restricted_loads, cache_argsless
+from .gamedata import GameNamesLookup, IdNameLookup, MappedGameData, get_game_data_store
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from .models import Command, GameDataPackage, Room, SaveJournalEntry, TrackerSnapshot, db
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -60,6 +61,70 @@ class DBCommandProcessor(ServerCommandProcessor):
         self.ctx.logger.info(text)
 
 
+class DBCommandPoller:
+    """Fetches the commands of all rooms of a room server process in one query, and runs them in their room."""
+    interval: typing.ClassVar[float] = 5
+    batch_size: typing.ClassVar[int] = 500  # room ids per query, to stay within the parameter limits of databases
+
+    rooms: typing.Dict[typing.Any, DBCommandProcessor]
+    task: typing.Optional[asyncio.Task]
+
+    def __init__(self):
+        self.rooms = {}
+        self.task = None
+        self.wakeup = asyncio.Event()
+
+    def add(self, ctx: WebHostContext):
+        self.rooms[ctx.room_id] = DBCommandProcessor(ctx)
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        self.wakeup.set()  # run commands that were sent before the room started right away
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            for room_id in [room_id for room_id, cmdprocessor in self.rooms.items()
+                            if cmdprocessor.ctx.exit_event.is_set()]:
+                del self.rooms[room_id]
+            self.wakeup.clear()
+            if self.rooms:
+                try:
+                    commands = await loop.run_in_executor(None, self.fetch_commands, list(self.rooms))
+                except Exception as e:
+                    logging.exception(e)
+                else:
+                    for room_id, commandtext in commands:
+                        cmdprocessor = self.rooms.get(room_id)
+                        if cmdprocessor:
+                            cmdprocessor(commandtext)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @classmethod
+    def fetch_commands(cls, room_ids: typing.List[typing.Any]) -> typing.List[typing.Tuple[typing.Any, str]]:
+        """Deletes the commands of room_ids from the database, returning their room ids and texts in order."""
+        commands = []
+        with db_session:
+            for start in range(0, len(room_ids), cls.batch_size):
+                batch = room_ids[start:start + cls.batch_size]
+                for command in select(command for command in Command if command.room.id in batch) \
+                        .order_by(Command.id):
+                    commands.append((command.room.id, command.commandtext))
+                    command.delete()
+            commit()
+        return commands
+
+
+def _get_names_of_ids(game_package: typing.Mapping[str, typing.Any]) \
+        -> typing.Tuple[typing.Mapping[int, str], typing.Mapping[int, str]]:
+    if isinstance(game_package, MappedGameData):
+        return game_package.item_id_to_name, game_package.location_id_to_name
+    return ({item_id: item_name for item_name, item_id in game_package["item_name_to_id"].items()},
+            {location_id: location_name for location_name, location_id in game_package["location_name_to_id"].items()})
+
+
 class WebHostContext(Context):
     room_id: int
 
@@ -74,6 +139,7 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        self.tracker_snapshot_data = b""
 
     def __del__(self):
         try:
@@ -89,24 +155,33 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    async def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            await self.main_loop.run_in_executor(None, self._process_db_commands, cmdprocessor)
-            try:
-                await asyncio.wait_for(self.exit_event.wait(), 5)
-            except asyncio.TimeoutError:
-                pass
-
-    def _process_db_commands(self, cmdprocessor):
-        with db_session:
-            commands = select(command for command in Command if command.room.id == self.room_id)
-            if commands:
-                for command in commands:
-                    self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                    command.delete()
-                commit()
+    def _init_game_data(self):
+        # names are looked up in the mapped data packages when they are used, instead of being copied for every room
+        archipelago_item_names, archipelago_location_names = _get_names_of_ids(self.gamespackage["Archipelago"])
+        for game_name, game_package in self.gamespackage.items():
+            if "checksum" in game_package:
+                self.checksums[game_name] = game_package["checksum"]
+            if game_name == "Archipelago":
+                self.item_names[game_name] = IdNameLookup(archipelago_item_names, {}, "item")
+                self.location_names[game_name] = IdNameLookup(archipelago_location_names, {}, "location")
+            else:
+                item_names, location_names = _get_names_of_ids(game_package)
+                self.item_names[game_name] = IdNameLookup(item_names, archipelago_item_names, "item")
+                self.location_names[game_name] = IdNameLookup(location_names, archipelago_location_names, "location")
+        self.all_item_and_group_names = GameNamesLookup(self.gamespackage, self._get_all_item_and_group_names)
+        self.all_location_and_group_names = GameNamesLookup(self.gamespackage, self._get_all_location_and_group_names)
+
+    def _get_all_item_and_group_names(self, game: str) -> typing.AbstractSet[str]:
+        game_package = self.gamespackage[game]
+        if isinstance(game_package, MappedGameData):
+            return game_package.all_item_and_group_names
+        return set(game_package["item_name_to_id"]) | set(self.item_name_groups[game])
+
+    def _get_all_location_and_group_names(self, game: str) -> typing.AbstractSet[str]:
+        game_package = self.gamespackage[game]
+        if isinstance(game_package, MappedGameData):
+            return game_package.all_location_and_group_names
+        return set(game_package["location_name_to_id"]) | set(self.location_name_groups.get(game, []))
 
     @db_session
     def load(self, room_id: int):
@@ -118,7 +193,7 @@ class WebHostContext(Context):
             self.port = get_random_port()
 
         multidata = self.decompress(room.seed.multidata)
-        game_data_packages = {}
+        custom_data_package = False
 
         static_gamespackage = self.gamespackage  # this is shared across all rooms
         static_item_name_groups = self.item_name_groups
@@ -136,9 +211,18 @@ class WebHostContext(Context):
                     # games package could be dropped from static data once all rooms embed data package
                     del multidata["datapackage"][game]
                 else:
-                    row = GameDataPackage.get(checksum=game_data["checksum"])
-                    if row:  # None if rolled on >= 0.3.9 but uploaded to <= 0.3.8. multidata should be complete
-                        game_data_packages[game] = restricted_loads(row.data)
+                    game_package = self.game_data_store.get(game_data["checksum"])
+                    if game_package is None:
+                        row = GameDataPackage.get(checksum=game_data["checksum"])
+                        if row:  # None if rolled on >= 0.3.9 but uploaded to <= 0.3.8. multidata should be complete
+                            # upload verified the checksum, so it can be shared with other rooms
+                            game_package = self.game_data_store.add(restricted_loads(row.data))
+                    if game_package is not None:
+                        del multidata["datapackage"][game]
+                        custom_data_package = True
+                        self.gamespackage[game] = game_package
+                        self.item_name_groups[game] = game_package.item_name_groups
+                        self.location_name_groups[game] = game_package.location_name_groups
                         continue
                     else:
                         self.logger.warning(f"Did not find game_data_package for {game}: {game_data['checksum']}")
@@ -148,31 +232,65 @@ class WebHostContext(Context):
             self.item_name_groups[game] = static_item_name_groups.get(game, {})
             self.location_name_groups[game] = static_location_name_groups.get(game, {})
 
-        if not game_data_packages and not missing_checksum:
+        if not custom_data_package and not missing_checksum:
             # all static -> use the static dicts directly
             self.gamespackage = static_gamespackage
             self.item_name_groups = static_item_name_groups
             self.location_name_groups = static_location_name_groups
-        return self._load(multidata, game_data_packages, True)
+        return self._load(multidata, {}, True)
 
     def init_save(self, enabled: bool = True):
         self.saving = enabled
         if self.saving:
             with db_session:
-                savegame_data = Room.get(id=self.room_id).multisave
+                room = Room.get(id=self.room_id)
+                savegame_data = room.load_multisave()
                 if savegame_data:
-                    self.set_save(restricted_loads(savegame_data))
+                    self.set_save(savegame_data)
+                if room.tracker_snapshot:
+                    # only publish a new version once the save changes from what was published before
+                    self.tracker_snapshot_data = room.tracker_snapshot.data
             self._start_async_saving(atexit_save=False)
-        asyncio.create_task(self.listen_to_db_commands())
 
-    @db_session
     def _save(self, exit_save: bool = False) -> bool:
-        room = Room.get(id=self.room_id)
-        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-        room.multisave = pickle.dumps(self.get_save())
-        # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
-        if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
-            room.last_activity = Utils.utcnow()
+        journal = self.save_journal
+        snapshot = exit_save or journal.needs_snapshot
+        stored_data_keys: typing.Set[str] = set()
+        try:
+            with db_session:
+                room = Room.get(id=self.room_id)
+                save = self.get_save()
+                stored_data_keys = journal.capture_stored_data(save, snapshot)
+                if snapshot:
+                    journal.start_snapshot(save)
+                    # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
+                    encoded_save = pickle.dumps(save)
+                    room.multisave = encoded_save
+                    room.save_journal.select().delete(bulk=True)
+                else:
+                    records = journal.diff(save, stored_data_keys)
+                    if records:
+                        entry = journal.encode_entry(journal.generation, records)
+                        SaveJournalEntry(room=room, data=entry)
+                        journal.journal_size += len(entry)
+                tracker_snapshot_data = TrackerSnapshot.dump(save, self.locations)
+                if tracker_snapshot_data != self.tracker_snapshot_data:
+                    if room.tracker_snapshot:
+                        room.tracker_snapshot.version += 1
+                        room.tracker_snapshot.data = tracker_snapshot_data
+                    else:
+                        TrackerSnapshot(room=room, version=1, data=tracker_snapshot_data)
+                # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
+                if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
+                    room.last_activity = Utils.utcnow()
+        except BaseException:
+            # the changes that were diffed may not have been committed
+            journal.invalidate()
+            journal.restore_stored_data(stored_data_keys)
+            raise
+        if snapshot:
+            journal.reset(save, len(encoded_save))
+        self.tracker_snapshot_data = tracker_snapshot_data
         return True
 
     def get_save(self) -> dict:
@@ -188,31 +306,44 @@ def get_random_port():
 @cache_argsless
 def get_static_server_data() -> dict:
     import worlds
+    # data packages are stored in files once, which each room server process maps, see load_static_server_data
+    game_data_store = get_game_data_store(Utils.cache_path("game_data"))
     data = {
         "non_hintable_names": {
             world_name: world.hint_blacklist
             for world_name, world in worlds.AutoWorldRegister.world_types.items()
         },
-        "gamespackage": {
-            world_name: {
-                key: value
-                for key, value in game_package.items()
-                if key not in ("item_name_groups", "location_name_groups")
-            }
+        "game_data_path": game_data_store.path,
+        "game_data_checksums": {
+            world_name: game_data_store.add(game_package)["checksum"]
             for world_name, game_package in worlds.network_data_package["games"].items()
         },
+    }
+
+    return data
+
+
+def load_static_server_data(static_server_data: dict) -> dict:
+    """Maps the data packages of get_static_server_data, to be shared by all rooms of a room server process."""
+    game_data_store = get_game_data_store(static_server_data["game_data_path"])
+    gamespackage = {
+        world_name: game_data_store.get(checksum)
+        for world_name, checksum in static_server_data["game_data_checksums"].items()
+    }
+    return {
+        "non_hintable_names": static_server_data["non_hintable_names"],
+        "game_data_store": game_data_store,
+        "gamespackage": gamespackage,
         "item_name_groups": {
-            world_name: world.item_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: game_package.item_name_groups
+            for world_name, game_package in gamespackage.items()
         },
         "location_name_groups": {
-            world_name: world.location_name_groups
-            for world_name, world in worlds.AutoWorldRegister.world_types.items()
+            world_name: game_package.location_name_groups
+            for world_name, game_package in gamespackage.items()
         },
     }
 
-    return data
-
 
 def set_up_logging(room_id) -> logging.Logger:
     import os
@@ -287,10 +418,12 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 load_date = today
             return ssl_context
 
+    static_server_data = load_static_server_data(static_server_data)
     del ponyconfig
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    db_command_poller = DBCommandPoller()
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
@@ -299,6 +432,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 ctx = WebHostContext(static_server_data, logger)
                 ctx.load(room_id)
                 ctx.init_save()
+                db_command_poller.add(ctx)
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -0,0 +1,330 @@
+"""
+Game data packages of room servers, stored once per checksum in read-only files that every room server process maps
+into memory. Names and ids are looked up in the mapped files as they are needed, so the operating system holds one copy
+of each data package in its page cache, instead of every process holding its own copy in dicts for every room.
+
+Only data packages that are known to match their checksum get stored, which are those of the installed worlds and
+those of GameDataPackage, as upload verifies them.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import typing
+from collections.abc import Mapping
+
+__all__ = ["GameDataStore", "MappedGameData", "IdNameLookup", "GameNamesLookup", "get_game_data_store"]
+
+_magic = b"APGDATA1"
+_prefix = struct.Struct("<8sQ")  # magic, length of the JSON header
+_alignment = 8
+_checksum_pattern = re.compile(r"[0-9a-f]{40}")
+
+
+class _Table:
+    """
+    The names and ids of items or locations of a data package, in the order of the data package.
+    by_id and by_name are the indices of the entries, sorted by id and by name, to look them up by bisection.
+    """
+    __slots__ = ("count", "ids", "offsets", "blob", "by_id", "by_name")
+
+    count: int
+    ids: memoryview
+    offsets: memoryview
+    blob: memoryview
+    by_id: memoryview
+    by_name: memoryview
+
+    def __init__(self, buffer: memoryview, header: typing.Dict[str, int]) -> None:
+        self.count = count = header["count"]
+        self.ids = buffer[header["ids"]:header["ids"] + count * 8].cast("q")
+        self.offsets = buffer[header["offsets"]:header["offsets"] + (count + 1) * 4].cast("I")
+        self.by_id = buffer[header["by_id"]:header["by_id"] + count * 4].cast("I")
+        self.by_name = buffer[header["by_name"]:header["by_name"] + count * 4].cast("I")
+        self.blob = buffer[header["blob"]:header["blob"] + self.offsets[count]]
+
+    def name(self, index: int) -> str:
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def index_of_id(self, code: int) -> int:
+        ids = self.ids
+        position = bisect.bisect_left(self.by_id, code, key=ids.__getitem__)
+        if position < self.count:
+            index = self.by_id[position]
+            if ids[index] == code:
+                return index
+        return -1
+
+    def index_of_name(self, name: str) -> int:
+        position = bisect.bisect_left(self.by_name, name, key=self.name)
+        if position < self.count:
+            index = self.by_name[position]
+            if self.name(index) == name:
+                return index
+        return -1
+
+    @staticmethod
+    def pack(name_to_id: typing.Mapping[str, int], out: bytearray) -> typing.Dict[str, int]:
+        names = [name.encode("utf-8") for name in name_to_id]
+        ids = list(name_to_id.values())
+        offsets = [0]
+        for name in names:
+            offsets.append(offsets[-1] + len(name))
+        header = {"count": len(names)}
+        for key, data in (
+            ("ids", struct.pack(f"<{len(ids)}q", *ids)),
+            ("offsets", struct.pack(f"<{len(offsets)}I", *offsets)),
+            ("by_id", struct.pack(f"<{len(ids)}I", *sorted(range(len(ids)), key=ids.__getitem__))),
+            ("by_name", struct.pack(f"<{len(ids)}I", *sorted(range(len(ids)), key=list(name_to_id).__getitem__))),
+            ("blob", b"".join(names)),
+        ):
+            out.extend(bytes(-len(out) % _alignment))
+            header[key] = len(out)
+            out.extend(data)
+        return header
+
+
+class _NameToId(Mapping):
+    """item_name_to_id or location_name_to_id of a mapped data package"""
+    __slots__ = ("_table",)
+
+    def __init__(self, table: _Table) -> None:
+        self._table = table
+
+    def __getitem__(self, name: str) -> int:
+        if isinstance(name, str):
+            index = self._table.index_of_name(name)
+            if index >= 0:
+                return self._table.ids[index]
+        raise KeyError(name)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return map(self._table.name, range(self._table.count))
+
+    def __len__(self) -> int:
+        return self._table.count
+
+
+class _IdToName(Mapping):
+    """The names of the ids of items or locations of a mapped data package"""
+    __slots__ = ("_table",)
+
+    def __init__(self, table: _Table) -> None:
+        self._table = table
+
+    def __getitem__(self, code: int) -> str:
+        if isinstance(code, int):
+            index = self._table.index_of_id(code)
+            if index >= 0:
+                return self._table.name(index)
+        raise KeyError(code)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._table.ids.tolist())
+
+    def __len__(self) -> int:
+        return self._table.count
+
+
+class MappedGameData(Mapping):
+    """
+    A data package without groups, like room servers send to clients, read from a memory mapped file.
+    The groups are decoded when they are first used, and kept for all rooms of the process.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, header_length = _prefix.unpack_from(buffer)
+        if magic != _magic:
+            raise ValueError(f"{path} is not a game data file")
+        header = json.loads(str(buffer[_prefix.size:_prefix.size + header_length], "utf-8"))
+        self._values: typing.Dict[str, typing.Any] = header["values"]
+        self._tables = {key: _Table(buffer, table_header) for key, table_header in header["tables"].items()}
+        self._groups = header["groups"]
+        self._buffer = buffer
+        self.item_name_to_id: typing.Mapping[str, int] = _NameToId(self._tables["item_name_to_id"])
+        self.location_name_to_id: typing.Mapping[str, int] = _NameToId(self._tables["location_name_to_id"])
+        self.item_id_to_name: typing.Mapping[int, str] = _IdToName(self._tables["item_name_to_id"])
+        self.location_id_to_name: typing.Mapping[int, str] = _IdToName(self._tables["location_name_to_id"])
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key == "item_name_to_id":
+            return self.item_name_to_id
+        if key == "location_name_to_id":
+            return self.location_name_to_id
+        return self._values[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @functools.cached_property
+    def _decoded_groups(self) -> typing.Dict[str, typing.Dict[str, typing.List[str]]]:
+        start, length = self._groups
+        return json.loads(str(self._buffer[start:start + length], "utf-8"))
+
+    @property
+    def item_name_groups(self) -> typing.Dict[str, typing.List[str]]:
+        return self._decoded_groups["item_name_groups"]
+
+    @property
+    def location_name_groups(self) -> typing.Dict[str, typing.List[str]]:
+        return self._decoded_groups["location_name_groups"]
+
+    @functools.cached_property
+    def all_item_and_group_names(self) -> typing.FrozenSet[str]:
+        return frozenset(self.item_name_to_id).union(self.item_name_groups)
+
+    @functools.cached_property
+    def all_location_and_group_names(self) -> typing.FrozenSet[str]:
+        return frozenset(self.location_name_to_id).union(self.location_name_groups)
+
+    @staticmethod
+    def pack(game_package: typing.Mapping[str, typing.Any]) -> bytes:
+        """Returns the file contents of a data package with groups, keeping the order of its keys and names."""
+        out = bytearray()
+        tables = {key: _Table.pack(game_package[key], out) for key in ("item_name_to_id", "location_name_to_id")}
+        groups = json.dumps({
+            "item_name_groups": game_package.get("item_name_groups", {}),
+            "location_name_groups": game_package.get("location_name_groups", {}),
+        }, default=sorted).encode("utf-8")
+        out.extend(bytes(-len(out) % _alignment))
+        groups_offset = len(out)
+        out.extend(groups)
+
+        def header_for(offset: int) -> bytes:
+            return json.dumps({
+                # None marks the position of tables in the data package
+                "values": {key: None if key in tables else value for key, value in game_package.items()
+                           if key not in ("item_name_groups", "location_name_groups")},
+                "tables": {key: {name: value + offset if name != "count" else value for name, value in table.items()}
+                           for key, table in tables.items()},
+                "groups": [groups_offset + offset, len(groups)],
+            }).encode("utf-8")
+
+        # offsets in the header are relative to the end of the header, which depends on the length of the offsets
+        length = len(header_for(0))
+        while True:
+            start = _prefix.size + length + (-(_prefix.size + length) % _alignment)
+            header = header_for(start)
+            if len(header) <= length:
+                break
+            length = len(header)
+        header = header.ljust(length)
+        return b"".join((_prefix.pack(_magic, length), header, bytes(start - _prefix.size - length), out))
+
+
+class GameDataStore:
+    """Directory of game data files, named after the checksums of their data packages."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.games: typing.Dict[str, MappedGameData] = {}
+
+    def get(self, checksum: str) -> typing.Optional[MappedGameData]:
+        """Returns the mapped data package of checksum, if it was stored before."""
+        game_data = self.games.get(checksum)
+        if game_data is None and _checksum_pattern.fullmatch(checksum):
+            try:
+                game_data = self.games[checksum] = MappedGameData(os.path.join(self.path, checksum))
+            except FileNotFoundError:
+                return None
+        return game_data
+
+    def add(self, game_package: typing.Mapping[str, typing.Any]) -> MappedGameData:
+        """Stores a data package with groups, that matches its checksum, if not stored yet, and returns it mapped."""
+        checksum = game_package["checksum"]
+        if not _checksum_pattern.fullmatch(checksum):
+            raise ValueError(f"Invalid data package checksum {checksum}")
+        game_data = self.get(checksum)
+        if game_data is None:
+            os.makedirs(self.path, exist_ok=True)
+            # write to a temporary file first, so other processes never map an incomplete file
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.path, prefix=f"{checksum}.")
+            try:
+                with os.fdopen(file_descriptor, "wb") as file:
+                    file.write(MappedGameData.pack(game_package))
+                os.replace(temp_path, os.path.join(self.path, checksum))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            game_data = self.get(checksum)
+            assert game_data is not None
+        return game_data
+
+
+@functools.lru_cache(maxsize=None)
+def get_game_data_store(path: str) -> GameDataStore:
+    """Returns the store of path, which is shared by all rooms of a process."""
+    return GameDataStore(path)
+
+
+class IdNameLookup(Mapping):
+    """
+    Names of the ids of a game, falling back to the names of Archipelago and to a placeholder for unknown ids,
+    like the KeyedDefaultDicts of Context. Only ids that have a name are contained.
+    """
+    __slots__ = ("names", "archipelago_names", "kind")
+
+    def __init__(self, names: typing.Mapping[int, str], archipelago_names: typing.Mapping[int, str], kind: str) -> None:
+        self.names = names
+        self.archipelago_names = archipelago_names
+        self.kind = kind
+
+    def __getitem__(self, code: int) -> str:
+        try:
+            return self.names[code]
+        except KeyError:
+            pass
+        try:
+            return self.archipelago_names[code]
+        except KeyError:
+            return f"Unknown {self.kind} (ID:{code})"
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.names or code in self.archipelago_names
+
+    def __iter__(self) -> typing.Iterator[int]:
+        yield from self.names
+        yield from (code for code in self.archipelago_names if code not in self.names)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class GameNamesLookup(Mapping):
+    """Names and group names of each game, gathered from the data packages when they are first used."""
+    __slots__ = ("gamespackage", "get_names", "names")
+
+    def __init__(self, gamespackage: typing.Mapping[str, typing.Mapping[str, typing.Any]],
+                 get_names: typing.Callable[[str], typing.AbstractSet[str]]) -> None:
+        self.gamespackage = gamespackage
+        self.get_names = get_names
+        self.names: typing.Dict[str, typing.AbstractSet[str]] = {}
+
+    def __getitem__(self, game: str) -> typing.AbstractSet[str]:
+        names = self.names.get(game)
+        if names is None:
+            if game not in self.gamespackage:
+                raise KeyError(game)
+            names = self.names[game] = self.get_names(game)
+        return names
+
+    def __contains__(self, game: object) -> bool:
+        return game in self.gamespackage
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.gamespackage)
+
+    def __len__(self) -> int:
+        return len(self.gamespackage)
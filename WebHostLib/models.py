@@ -1,4 +1,7 @@
+import pickle
+import zlib
 from datetime import datetime
+from typing import Any, Mapping
 from uuid import UUID, uuid4
 from pony.orm import Database, PrimaryKey, Required, Set, Optional, buffer, LongStr
 
@@ -28,12 +31,26 @@ class Room(db.Entity):
     commands = Set('Command')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
+    save_journal = Set('SaveJournalEntry')
+    tracker_snapshot = Optional('TrackerSnapshot', cascade_delete=True)
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
     timeout = Required(int, default=lambda: 2 * 60 * 60)  # seconds since last activity to shutdown
     tracker = Optional(UUID, index=True)
     # Port special value -1 means the server errored out. Another attempt can be made with a page refresh
     last_port = Optional(int, default=lambda: 0)
 
+    def load_multisave(self) -> dict:
+        """The save data of the room, with the journal of changes since its last snapshot replayed onto it."""
+        from MultiServer import SaveJournal
+        from Utils import restricted_loads
+
+        if not self.multisave:
+            return {}
+        save = restricted_loads(self.multisave)
+        SaveJournal.apply(save, (SaveJournal.decode_entry(entry.data)
+                                 for entry in self.save_journal.order_by(SaveJournalEntry.id)))
+        return save
+
 
 class Seed(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
@@ -52,6 +69,55 @@ class Command(db.Entity):
     commandtext = Required(str)
 
 
+class SaveJournalEntry(db.Entity):
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    data = Required(bytes)
+
+
+class TrackerSnapshot(db.Entity):
+    """The parts of the save data of a room that trackers show, published by the room server when they change."""
+    room = PrimaryKey(Room)
+    version = Required(int)
+    data = Required(bytes, lazy=True)
+
+    # keys of the save data that trackers use
+    save_keys = ("received_items", "hints", "location_checks", "name_aliases", "client_game_state",
+                 "client_activity_timers", "client_connection_timers", "video")
+
+    @staticmethod
+    def dump(save: dict, locations: Mapping[int, Mapping[int, Any]]) -> bytes:
+        """Encodes the tracker state of save data, storing the checked locations of each slot as a bitmap
+        over the sorted locations of the slot."""
+        state = {key: save[key] for key in TrackerSnapshot.save_keys if key in save}
+        state["received_items"] = {key: items for key, items in state.get("received_items", {}).items() if key[2]}
+        # sorted, so that the same hints encode the same regardless of the order of their set
+        state["hints"] = {key: sorted(hints) for key, hints in state.get("hints", {}).items()}
+        checks = {}
+        for (team, slot), checked in state.get("location_checks", {}).items():
+            bitmap = bytearray((len(locations[slot]) + 7) // 8)
+            for index, location in enumerate(sorted(locations[slot])):
+                if location in checked:
+                    bitmap[index >> 3] |= 1 << (index & 7)
+            checks[team, slot] = bytes(bitmap)
+        state["location_checks"] = checks
+        return zlib.compress(pickle.dumps(state))
+
+    @staticmethod
+    def load(data: bytes, locations: Mapping[int, Mapping[int, Any]]) -> dict:
+        """Decodes the tracker state, in the same format as the save data it was published from."""
+        from Utils import restricted_loads
+
+        state = restricted_loads(zlib.decompress(data))
+        state["hints"] = {key: set(hints) for key, hints in state["hints"].items()}
+        state["location_checks"] = {
+            (team, slot): {location for index, location in enumerate(sorted(locations[slot]))
+                           if bitmap[index >> 3] >> (index & 7) & 1}
+            for (team, slot), bitmap in state["location_checks"].items()
+        }
+        return state
+
+
 class Generation(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     owner = Required(UUID)
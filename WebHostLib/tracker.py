@@ -1,7 +1,8 @@
 import datetime
 import collections
+import functools
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -12,7 +13,7 @@ from MultiServer import Context, get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict, utcnow
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed, TrackerSnapshot
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
@@ -40,6 +41,46 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+@functools.lru_cache(maxsize=32)
+def _get_multidata(seed_id: UUID) -> Dict[str, Any]:
+    """Decompresses the multidata of a seed, which never changes, once for the trackers of all requests.
+    The result is shared and must not be modified."""
+    return Context.decompress(Seed.get(id=seed_id).multidata)
+
+
+class _GameData(NamedTuple):
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+
+
+@functools.lru_cache(maxsize=256)
+def _get_game_data(checksum: str) -> _GameData:
+    """Loads the lookup tables of a data package once for the trackers of all requests.
+    The result is shared and must not be modified."""
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    return _GameData(
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+        {id: name for name, id in game_package["item_name_to_id"].items()},
+        {id: name for name, id in game_package["location_name_to_id"].items()},
+    )
+
+
+class _IdToNameLookup(collections.ChainMap):
+    """Per-request view of a shared id to name lookup table, that names unknown ids like KeyedDefaultDict does,
+    but keeps them in the view instead of adding them to the shared table."""
+
+    def __init__(self, id_to_name: Mapping[int, str], default_factory: Callable[[int], str]) -> None:
+        super().__init__({}, id_to_name)
+        self.default_factory = default_factory
+
+    def __missing__(self, code: int) -> str:
+        self.maps[0][code] = name = self.default_factory(code)
+        return name
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -55,8 +96,12 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        self._multidata = _get_multidata(room.seed.id)
+        if room.tracker_snapshot:
+            # published by the room server, only contains what trackers use
+            self._multisave = TrackerSnapshot.load(room.tracker_snapshot.data, self._multidata["locations"])
+        else:
+            self._multisave = room.load_multisave()
         self._tracker_cache = {}
 
         self.item_name_to_id: Dict[str, Dict[str, int]] = {}
@@ -70,15 +115,15 @@ class TrackerData:
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
         for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+            game_data = _get_game_data(game_package["checksum"])
+            self.item_id_to_name[game] = _IdToNameLookup(game_data.item_id_to_name,
+                                                         lambda code: f"Unknown Item (ID: {code})")
+            self.location_id_to_name[game] = _IdToNameLookup(game_data.location_id_to_name,
+                                                             lambda code: f"Unknown Location (ID: {code})")
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = game_data.item_name_to_id
+            self.location_name_to_id[game] = game_data.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -488,6 +488,7 @@ function process_request (req)
 end
 
 -- Receive data from AP client and send message back
+-- Returns whether a message was received
 function send_receive ()
     local message, err = client_socket:receive()
 
@@ -497,15 +498,15 @@ function send_receive ()
             print("Connection to client closed")
         end
         current_state = STATE_NOT_CONNECTED
-        return
+        return false
     elseif err == "timeout" then
         unlock()
-        return
+        return false
     elseif err ~= nil then
         print(err)
         current_state = STATE_NOT_CONNECTED
         unlock()
-        return
+        return false
     end
 
     -- Reset timeout timer
@@ -544,6 +545,8 @@ function send_receive ()
 
         client_socket:send(json.encode(res).."\n")
     end
+
+    return true
 end
 
 function initialize_server ()
@@ -609,9 +612,12 @@ function main ()
                 end
             end
         else
+            -- The client may send messages before receiving the responses to earlier ones,
+            -- so handle every message that arrived instead of one per frame
+            local received
             repeat
-                send_receive()
-            until not locked
+                received = send_receive()
+            until current_state == STATE_NOT_CONNECTED or (not received and not locked)
 
             if timeout_timer <= 0 then
                 print("Client timed out")
@@ -1,13 +1,15 @@
 from collections import defaultdict
-from typing import ClassVar, cast
+from typing import ClassVar, TypeVar, cast
 
 from typing_extensions import override
 
-from BaseClasses import CollectionState, Item, MultiWorld, Region
+from BaseClasses import CollectionRule, CollectionState, Entrance, Item, Location, MultiWorld, Region
 from worlds.AutoWorld import LogicMixin, World
 
 from .rules import Rule
 
+_SpotT = TypeVar("_SpotT", Entrance, Location)
+
 
 class CachedRuleBuilderWorld(World):
     """A World subclass that provides helpers for interacting with the rule builder"""
@@ -32,12 +34,51 @@ class CachedRuleBuilderWorld(World):
     rule_caching_enabled: ClassVar[bool] = True
     """Flag to inform rules that the caching system for this world is enabled. It should not be overridden."""
 
+    entrance_dependencies: dict[Entrance, tuple[CollectionRule, tuple[frozenset[str], frozenset[str]] | None]]
+    """A mapping of entrance to its access rule and the item and region names that rule depends on"""
+
+    location_dependencies: dict[Location, tuple[CollectionRule, tuple[frozenset[str], frozenset[str]] | None]]
+    """A mapping of location to its access rule and the item and region names that rule depends on"""
+
     def __init__(self, multiworld: MultiWorld, player: int) -> None:
         super().__init__(multiworld, player)
         self.rule_item_dependencies = defaultdict(set)
         self.rule_region_dependencies = defaultdict(set)
         self.rule_location_dependencies = defaultdict(set)
         self.rule_entrance_dependencies = defaultdict(set)
+        self.entrance_dependencies = {}
+        self.location_dependencies = {}
+
+    def get_entrance_dependencies(self, entrance: Entrance) -> tuple[frozenset[str], frozenset[str]] | None:
+        """Returns the item and region names the access rule of an entrance depends on,
+        or None if its result can change without any of those changing.
+        Used by CollectionState to only recheck blocked entrances that could have been unblocked."""
+        return self._get_rule_dependencies(self.entrance_dependencies, entrance, Entrance.access_rule)
+
+    def get_location_dependencies(self, location: Location) -> tuple[frozenset[str], frozenset[str]] | None:
+        """Returns the item and region names the access rule of a location depends on,
+        or None if its result can change without any of those changing.
+        Used by CollectionState to only recheck unreached locations during a sweep that could have become reachable."""
+        return self._get_rule_dependencies(self.location_dependencies, location, Location.access_rule)
+
+    @staticmethod
+    def _get_rule_dependencies(cache: dict[_SpotT, tuple[CollectionRule, tuple[frozenset[str], frozenset[str]] | None]],
+                               spot: _SpotT, default_rule: CollectionRule,
+                               ) -> tuple[frozenset[str], frozenset[str]] | None:
+        rule = spot.access_rule
+        cached = cache.get(spot)
+        if cached is not None and cached[0] is rule:
+            return cached[1]
+
+        dependencies: tuple[frozenset[str], frozenset[str]] | None = None
+        if isinstance(rule, Rule.Resolved):
+            if not rule.force_recalculate and not rule.location_dependencies() and not rule.entrance_dependencies():
+                dependencies = frozenset(rule.item_dependencies()), frozenset(rule.region_dependencies())
+        elif rule is default_rule:
+            # the default rule is always True
+            dependencies = frozenset(), frozenset()
+        cache[spot] = rule, dependencies
+        return dependencies
 
     @override
     def register_rule_dependencies(self, resolved_rule: Rule.Resolved) -> None:
@@ -776,6 +776,7 @@ class HasAll(Rule[TWorld], game="Archipelago"):
             return Has(self.item_names[0]).resolve(world)
         return self.Resolved(
             self.item_names,
+            world.get_item_mask(self.item_names) if world.indexed_prog_items else 0,
             player=world.player,
             caching_enabled=getattr(world, "rule_caching_enabled", False),
         )
@@ -796,9 +797,13 @@ class HasAll(Rule[TWorld], game="Archipelago"):
 
     class Resolved(Rule.Resolved):
         item_names: tuple[str, ...]
+        item_mask: int = 0
+        """mask of item_names if the world uses indexed_prog_items"""
 
         @override
         def _evaluate(self, state: CollectionState) -> bool:
+            if self.item_mask:
+                return state.has_mask(self.item_mask, self.player)
             # implementation based on state.has_all
             player_prog_items = state.prog_items[self.player]
             for item in self.item_names:
@@ -894,6 +899,7 @@ class HasAny(Rule[TWorld], game="Archipelago"):
             return Has(self.item_names[0]).resolve(world)
         return self.Resolved(
             self.item_names,
+            world.get_item_mask(self.item_names) if world.indexed_prog_items else 0,
             player=world.player,
             caching_enabled=getattr(world, "rule_caching_enabled", False),
         )
@@ -914,9 +920,13 @@ class HasAny(Rule[TWorld], game="Archipelago"):
 
     class Resolved(Rule.Resolved):
         item_names: tuple[str, ...]
+        item_mask: int = 0
+        """mask of item_names if the world uses indexed_prog_items"""
 
         @override
         def _evaluate(self, state: CollectionState) -> bool:
+            if self.item_mask:
+                return state.has_any_mask(self.item_mask, self.player)
             # implementation based on state.has_any
             player_prog_items = state.prog_items[self.player]
             for item in self.item_names:
@@ -0,0 +1,61 @@
+"""Benchmark of BizHawk client ticks against a stand-in for the connector script, with requests sent one after another
+like before pipelining, and concurrently, against a script answering one message per frame and all messages per frame"""
+
+import asyncio
+import os
+import sys
+import time
+
+
+async def tick(ctx, concurrent: bool) -> None:
+    """A tick of the game watcher with a handler reading a few separate ranges, as handlers commonly do"""
+    from worlds._bizhawk import get_hash, ping, read
+
+    requests = [
+        ping(ctx),
+        get_hash(ctx),
+        read(ctx, [(0x100, 2, "WRAM"), (0x102, 2, "WRAM"), (0x200, 16, "WRAM")]),
+        read(ctx, [(0x300, 1, "WRAM")]),
+        read(ctx, [(0x10, 4, "SRAM")]),
+    ]
+    if concurrent:
+        await asyncio.gather(*requests)
+    else:
+        for request in requests:
+            await request
+
+
+async def run(concurrent: bool, one_message_per_frame: bool, ticks: int) -> float:
+    """:return: Time taken per tick in milliseconds"""
+    from test.programs.test_bizhawk import StandInConnector
+    from worlds._bizhawk import BizHawkContext, ConnectionStatus, disconnect
+
+    connector = StandInConnector({"WRAM": bytearray(0x8000), "SRAM": bytearray(0x2000)},
+                                 one_message_per_frame=one_message_per_frame)
+    ctx = BizHawkContext()
+    ctx.streams = await connector.start()
+    ctx.connection_status = ConnectionStatus.TENTATIVE
+    try:
+        start = time.perf_counter()
+        for _ in range(ticks):
+            await tick(ctx, concurrent)
+        return (time.perf_counter() - start) / ticks * 1000
+    finally:
+        disconnect(ctx)
+        await connector.stop()
+
+
+def main() -> None:
+    for one_message_per_frame in (True, False):
+        for concurrent in (False, True):
+            per_tick = asyncio.run(run(concurrent, one_message_per_frame, 30))
+            print(f"{'one message' if one_message_per_frame else 'all messages'} per frame, "
+                  f"{'concurrent' if concurrent else 'sequential'} requests: {per_tick:.1f} ms per tick "
+                  f"({per_tick / (1000 / 60):.1f} frames)")
+
+
+if __name__ == "__main__":
+    import path_change
+    path_change.change_home()
+    sys.path.insert(0, os.getcwd())  # import the stand-in of the tests instead of the test package of the stdlib
+    main()
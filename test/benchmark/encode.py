@@ -0,0 +1,84 @@
+"""Micro benchmark comparing NetUtils.encode with scanning for TypedTuples before encoding with JSONEncoder,
+and the throughput of JSON in text frames with MessagePack in binary frames, if msgpack is installed"""
+
+import typing
+from random import Random
+from timeit import timeit
+
+
+def make_received_items(count: int) -> typing.List[typing.Dict[str, typing.Any]]:
+    from NetUtils import NetworkItem
+
+    r = Random(0)
+    return [{
+        "cmd": "ReceivedItems",
+        "index": 0,
+        "items": [NetworkItem(r.randint(1000, 1999), r.randint(1000, 1999), r.randint(1, 50),
+                              r.choice((0, 0, 0, 1, 2, 4))) for _ in range(count)],
+    }]
+
+
+def make_connected(slots: int) -> typing.List[typing.Dict[str, typing.Any]]:
+    from NetUtils import Hint, HintStatus, NetworkPlayer, NetworkSlot, SlotType
+
+    r = Random(0)
+    return [{
+        "cmd": "Connected",
+        "team": 0,
+        "slot": 1,
+        "players": [NetworkPlayer(0, slot, f"Player{slot}", f"Player{slot}") for slot in range(1, slots + 1)],
+        "missing_locations": [r.randint(1000, 1999) for _ in range(300)],
+        "checked_locations": [r.randint(1000, 1999) for _ in range(300)],
+        "slot_info": {slot: NetworkSlot(f"Player{slot}", "Game Ä", SlotType.player) for slot in range(1, slots + 1)},
+        "hint_points": 20,
+        "slot_data": {"goal": 1, "options": {"shuffle": True, "names": ["a", "b"]}, "ratio": 0.5},
+    }, {
+        "cmd": "PrintJSON",
+        "type": "Hint",
+        "data": [{"text": f"hint {i}"} for i in range(50)],
+        "hints": [Hint(r.randint(1, slots), 1, i, i, False, status=HintStatus.HINT_PRIORITY) for i in range(100)],
+    }]
+
+
+def timeit_best_of_5(stmt: str, number: int, **data: typing.Any) -> float:
+    """
+    Benchmark encoding or decoding data with NetUtils, returning the best of 5 runs.
+    :return: Time taken per run of stmt in milliseconds
+    """
+    import NetUtils
+    namespace = {**vars(NetUtils), **data}
+    return min(timeit(stmt, number=number, globals=namespace) for _ in range(5)) / number * 1000
+
+
+def main() -> None:
+    from NetUtils import _encode, _scan_for_TypedTuples, binary_framing_available, encode, encode_binary
+
+    for name, data, number in (
+        ("ReceivedItems x100", make_received_items(100), 1000),
+        ("ReceivedItems x5000", make_received_items(5000), 20),
+        ("Connected x50", make_connected(50), 200),
+        ("Connected x1000", make_connected(1000), 20),
+    ):
+        assert encode(data) == _encode(_scan_for_TypedTuples(data))
+        scanned = timeit_best_of_5("_encode(_scan_for_TypedTuples(data))", number, data=data)
+        single_pass = timeit_best_of_5("encode(data)", number, data=data)
+        print(f"{name}: scan then encode {scanned:.3f} ms, single pass {single_pass:.3f} ms "
+              f"({scanned / single_pass:.2f}x)")
+        if binary_framing_available:
+            text = encode(data)
+            binary = encode_binary(data)
+            text_decode = timeit_best_of_5("decode(text)", number, text=text)
+            binary_encode = timeit_best_of_5("encode_binary(data)", number, data=data)
+            binary_decode = timeit_best_of_5("decode_binary(binary)", number, binary=binary)
+            text_size = len(text.encode("utf-8"))
+            print(f"{name}: JSON {text_size / 1024:.1f} KiB, {single_pass:.3f} ms encode, {text_decode:.3f} ms decode; "
+                  f"MessagePack {len(binary) / 1024:.1f} KiB, {binary_encode:.3f} ms encode, "
+                  f"{binary_decode:.3f} ms decode; "
+                  f"{text_size / 2 ** 20 / (single_pass + text_decode) * 1000:.1f} MiB/s JSON, "
+                  f"{text_size / 2 ** 20 / (binary_encode + binary_decode) * 1000:.1f} MiB/s of JSON as MessagePack")
+
+
+if __name__ == "__main__":
+    import path_change
+    path_change.change_home()
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark of the generation engine phases on fixed-seed multiworlds of increasing size.
+
+Every game and slot count runs in a fresh process, so that its peak RSS is its own. The results are written as JSON,
+and can be compared against the results of another commit with --compare.
+"""
+import typing
+
+default_games: typing.Tuple[str, ...] = ("APQuest", "A Link to the Past")
+default_sizes: typing.Tuple[int, ...] = (1, 50, 250, 1000)
+copy_iterations: int = 100
+gen_steps: typing.Tuple[str, ...] = (
+    "generate_early",
+    "create_regions",
+    "create_items",
+    "set_rules",
+    "connect_entrances",
+    "generate_basic",
+    "pre_fill",
+)
+
+
+def peak_rss() -> typing.Optional[int]:
+    """Peak resident set size of this process in bytes, if it can be determined on this platform."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        # peak_wset is only available on Windows, which is also the only platform without resource
+        return getattr(psutil.Process().memory_info(), "peak_wset", None)
+    import sys
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def run_case(game: str, slots: int, seed: int) -> typing.Dict[str, typing.Any]:
+    """Generates a multiworld of slots players of game, timing each engine phase separately."""
+    import argparse
+    import collections
+    import contextlib
+    import gc
+    import logging
+    import time
+    import zlib
+
+    # load the worlds before Fill, which they import
+    from worlds.AutoWorld import AutoWorldRegister, call_all
+    import Profiler
+    from BaseClasses import CollectionState, MultiWorld
+    from Fill import balance_multiworld_progression, distribute_items_restrictive
+    from Utils import restricted_dumps
+
+    logging.getLogger().setLevel(logging.WARNING)
+    timings: typing.Dict[str, float] = {}
+    rss_before = peak_rss()
+
+    @contextlib.contextmanager
+    def timed(name: str) -> typing.Iterator[None]:
+        gc.collect()
+        start = time.perf_counter()
+        yield
+        timings[name] = time.perf_counter() - start
+
+    with timed("setup"):
+        multiworld = MultiWorld(slots)
+        multiworld.game = {player: game for player in multiworld.player_ids}
+        multiworld.player_name = {player: f"Tester{player}" for player in multiworld.player_ids}
+        multiworld.set_seed(seed)
+        args = argparse.Namespace()
+        for name, option in AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+            setattr(args, name, {player: option.from_any(option.default) for player in multiworld.player_ids})
+        multiworld.set_options(args)
+        multiworld.state = CollectionState(multiworld)
+        for step in gen_steps:
+            call_all(multiworld, step)
+
+    # the profiler attributes the time of fill_restrictive within the full fill, without rules being instrumented
+    with Profiler.GenerationProfiler() as profiler:
+        with timed("distribute_items_restrictive"):
+            distribute_items_restrictive(multiworld)
+    timings["fill_restrictive"] = profiler.sections.get("fill_restrictive", [0, 0.0])[1]
+    call_all(multiworld, "post_fill")
+
+    with timed("balance_multiworld_progression"):
+        balance_multiworld_progression(multiworld)
+
+    with timed("sweep_for_advancements"):
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements()
+
+    with timed("copy"):
+        for _ in range(copy_iterations):
+            state.copy()
+    with timed("copy_on_write"):
+        for _ in range(copy_iterations):
+            state.copy(copy_on_write=True)
+
+    # reach every region from scratch, with all the items already collected
+    region_state = CollectionState(multiworld)
+    for location in multiworld.get_filled_locations():
+        if location.item.advancement:
+            region_state.collect(location.item, True, location)
+    with timed("update_reachable_regions"):
+        for player in multiworld.player_ids:
+            region_state.update_reachable_regions(player)
+
+    with timed("get_spheres"):
+        sphere_count = sum(1 for _ in multiworld.get_spheres())
+
+    with timed("multidata"):
+        locations_data: typing.Dict[int, typing.Dict[int, typing.Tuple[int, int, int]]] = \
+            {player: {} for player in multiworld.player_ids}
+        for location in multiworld.get_filled_locations():
+            if type(location.address) == int:
+                locations_data[location.player][location.address] = \
+                    location.item.code, location.item.player, location.item.flags
+        spheres: typing.List[typing.Dict[int, typing.Set[int]]] = []
+        for sphere in multiworld.get_sendable_spheres():
+            current_sphere: typing.Dict[int, typing.Set[int]] = collections.defaultdict(set)
+            for sphere_location in sphere:
+                current_sphere[sphere_location.player].add(sphere_location.address)
+            if current_sphere:
+                spheres.append(dict(current_sphere))
+        multidata = {
+            "slot_data": {player: multiworld.worlds[player].fill_slot_data() for player in multiworld.player_ids},
+            "locations": locations_data,
+            "spheres": spheres,
+        }
+        multidata_size = len(zlib.compress(restricted_dumps(multidata), 9))
+
+    return {
+        "game": game,
+        "slots": slots,
+        "seed": seed,
+        "locations": len(multiworld.get_locations()),
+        "spheres": sphere_count,
+        "multidata_bytes": multidata_size,
+        "copy_iterations": copy_iterations,
+        "timings": timings,
+        "rss_before": rss_before,
+        "peak_rss": peak_rss(),
+    }
+
+
+def compare(old: typing.Dict[str, typing.Any], new: typing.Dict[str, typing.Any]) -> typing.List[str]:
+    """Lines describing the relative change of every timing and the peak RSS from old to new results."""
+    old_cases = {(case["game"], case["slots"]): case for case in old["results"]}
+    lines = []
+    for case in new["results"]:
+        old_case = old_cases.get((case["game"], case["slots"]))
+        if not old_case:
+            continue
+        values = [(name, old_case["timings"].get(name), taken) for name, taken in case["timings"].items()]
+        values.append(("peak_rss", old_case["peak_rss"], case["peak_rss"]))
+        for name, old_value, new_value in values:
+            if old_value and new_value is not None:
+                lines.append(f"{case['game']} x{case['slots']} {name}: {old_value:.4g} -> {new_value:.4g} "
+                             f"({100 * (new_value / old_value - 1):+.1f}%)")
+    return lines
+
+
+def run_generation_benchmark(games: typing.Sequence[str] = default_games,
+                             sizes: typing.Sequence[int] = default_sizes, seed: int = 0,
+                             output: typing.Optional[str] = None, compare_to: typing.Optional[str] = None) -> None:
+    """
+    Run the generation benchmark for each game at each size, each in its own process.
+
+    :param output: Path of the JSON results, defaulting to generation_benchmark.json in the output folder.
+    :param compare_to: Path of JSON results of an earlier run, to log the relative change of each measurement.
+    """
+    import json
+    import logging
+    import multiprocessing
+    import platform
+    import subprocess
+    import sys
+
+    from Utils import __version__, init_logging, output_path
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    try:
+        commit: typing.Optional[str] = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                                      check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    results: typing.Dict[str, typing.Any] = {
+        "version": __version__,
+        "commit": commit,
+        "python": sys.version,
+        "platform": platform.platform(),
+        "results": [],
+    }
+    # a fresh process for each case, so that peak RSS and caches don't carry over
+    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for game in games:
+            for slots in sizes:
+                try:
+                    case = pool.apply(run_case, (game, slots, seed))
+                except Exception as e:
+                    logger.exception(e)
+                    continue
+                results["results"].append(case)
+                logger.info(f"{game} x{slots}: " + ", ".join(f"{name} {taken:.4f}s"
+                                                             for name, taken in case["timings"].items()) +
+                            (f", peak RSS {case['peak_rss'] / 2 ** 20:.1f} MiB." if case["peak_rss"] else "."))
+
+    if not output:
+        output = output_path("generation_benchmark.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {output}.")
+
+    if compare_to:
+        with open(compare_to, encoding="utf-8") as f:
+            old = json.load(f)
+        logger.info(f"Compared to {compare_to} ({old.get('commit')}):\n" + "\n".join(compare(old, results)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from path_change import change_home
+    change_home()
+
+    parser = argparse.ArgumentParser(description="Benchmark the generation engine phases.")
+    parser.add_argument("--games", nargs="+", default=default_games)
+    parser.add_argument("--sizes", nargs="+", type=int, default=default_sizes)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON results.")
+    parser.add_argument("--compare", help="Path of JSON results of an earlier run to compare against.")
+    args = parser.parse_args()
+    run_generation_benchmark(args.games, args.sizes, args.seed, args.output, args.compare)
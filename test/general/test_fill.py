@@ -5,7 +5,7 @@ from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
     distribute_early_items, distribute_items_restrictive
-from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
+from BaseClasses import CollectionState, Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
 
@@ -448,6 +448,43 @@ class TestFillRestrictive(unittest.TestCase):
         self.assertTrue(multiworld.state.prog_items[item.player][item.name], "Sweep did not collect - Test flawed")
         self.assertEqual(multiworld.state.prog_items[item.player][item.name], 1, "Sweep collected multiple times")
 
+    def test_long_chained_fill(self):
+        """Tests `fill_restrictive` keeps the state it sweeps from correct over many placement steps"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 30, 30)
+        player2 = generate_player_data(multiworld, 2, 30, 30)
+        for player in (player1, player2):
+            for previous_item, location in zip(player.prog_items, player.locations[1:]):
+                set_rule(location, lambda state, name=previous_item.name, player_id=player.id:
+                         state.has(name, player_id))
+            multiworld.completion_condition[player.id] = lambda state, player=player: state.has_all(
+                names(player.prog_items), player.id)
+
+        fill_restrictive(multiworld, multiworld.state, player1.locations + player2.locations,
+                         player1.prog_items + player2.prog_items)
+
+        state = CollectionState(multiworld)
+        state.sweep_for_advancements()
+        self.assertTrue(multiworld.has_beaten_game(state))
+
+    def test_local_items_fill(self):
+        """Tests `fill_restrictive` only places local items on locations of their own world"""
+        multiworld = generate_test_multiworld(2)
+        player1 = generate_player_data(multiworld, 1, 7, 5)
+        player2 = generate_player_data(multiworld, 2, 3, 5)
+        multiworld.worlds[player1.id].options.local_items.value = set(names(player1.prog_items))
+        multiworld.worlds[player2.id].options.non_local_items.value = set(names(player2.prog_items[:2]))
+        locality_rules(multiworld)
+
+        fill_restrictive(multiworld, multiworld.state, player2.locations + player1.locations,
+                         player1.prog_items + player2.prog_items)
+
+        for item in multiworld.get_items():
+            if item.name in multiworld.worlds[player2.id].options.non_local_items.value:
+                self.assertEqual(item.location.player, player1.id)
+            elif item.player == player1.id:
+                self.assertEqual(item.location.player, player1.id)
+
     def test_correct_item_instance_removed_from_pool(self):
         """Test that a placed item gets removed from the submitted pool"""
         multiworld = generate_test_multiworld()
@@ -0,0 +1,65 @@
+import unittest
+from typing import List, Type
+
+from BaseClasses import Item, ItemClassification, MultiWorld, Region
+from worlds.AutoWorld import call_all
+from . import TestWorld, setup_multiworld
+
+
+class ParallelWorld(TestWorld):
+    parallel_stages = frozenset({"create_regions", "create_items"})
+
+    def create_regions(self) -> None:
+        self.multiworld.regions.append(Region("Menu", self.player, self.multiworld))
+
+    def create_items(self) -> None:
+        self.multiworld.itempool += [self.create_item(f"Item {i}") for i in range(10)]
+
+    def create_item(self, name: str) -> Item:
+        return Item(name, ItemClassification.filler, None, self.player)
+
+
+class SerialWorld(TestWorld):
+    def create_items(self) -> None:
+        self.multiworld.itempool.append(Item("Serial Item", ItemClassification.filler, None, self.player))
+
+
+class TestParallelStages(unittest.TestCase):
+    worlds = [ParallelWorld, SerialWorld, ParallelWorld, ParallelWorld, SerialWorld, ParallelWorld]
+
+    @staticmethod
+    def setup(world_types: List[Type[TestWorld]], stage_workers: int) -> MultiWorld:
+        multiworld = setup_multiworld(world_types, ())
+        for world_type, world in zip(world_types, multiworld.worlds.values()):
+            # the test worlds share the registered game of TestWorld, so swap in the actual implementation
+            world.__class__ = world_type
+        multiworld.stage_workers = stage_workers
+        call_all(multiworld, "generate_early")
+        return multiworld
+
+    def run_steps(self, stage_workers: int) -> MultiWorld:
+        multiworld = self.setup(self.worlds, stage_workers)
+        for step in ("create_regions", "create_items", "set_rules"):
+            call_all(multiworld, step)
+        return multiworld
+
+    def test_itempool_order(self) -> None:
+        """Tests that running worlds on worker threads gives the same itempool as running them one by one."""
+        serial = self.run_steps(1)
+        expected = [(item.player, item.name) for item in serial.itempool]
+        for stage_workers in (2, 4, 8):
+            with self.subTest(stage_workers=stage_workers):
+                multiworld = self.run_steps(stage_workers)
+                self.assertEqual([(item.player, item.name) for item in multiworld.itempool], expected)
+                for player, world_type in enumerate(self.worlds, 1):
+                    if world_type is ParallelWorld:
+                        self.assertEqual(len(multiworld.get_regions(player)), 1)
+
+    def test_foreign_item(self) -> None:
+        """Tests that a parallel world adding an item of another player is caught."""
+        multiworld = self.setup([ParallelWorld, ParallelWorld, SerialWorld], 2)
+        foreign_item = multiworld.worlds[1].create_item("Item 1")
+        foreign_item.player = 3
+        multiworld.worlds[1].create_items = lambda: multiworld.itempool.append(foreign_item)
+        with self.assertRaises(AssertionError):
+            call_all(multiworld, "create_items")
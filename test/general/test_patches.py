@@ -1,6 +1,11 @@
-﻿import unittest
+﻿import os
+import typing
+import unittest
+from random import Random
+from tempfile import TemporaryDirectory
+
 from worlds.AutoWorld import AutoWorldRegister
-from worlds.Files import AutoPatchRegister
+from worlds.Files import APPatchExtension, APProcedurePatch, APTokenMixin, APTokenTypes, AutoPatchRegister
 
 
 class TestPatches(unittest.TestCase):
@@ -9,3 +14,161 @@ class TestPatches(unittest.TestCase):
             with self.subTest(game=game_name):
                 self.assertIn(game_name, AutoWorldRegister.world_types.keys(),
                               f"Patch '{game_name}' does not match the name of any world.")
+
+
+class TokenPatch(APProcedurePatch, APTokenMixin):
+    hash = "0" * 32
+    procedure = [("apply_tokens", ["token_data.bin"]), ("calc_snes_crc", [])]
+    result_file_ending = ".sfc"
+
+    @classmethod
+    def get_source_data(cls) -> bytes:
+        return bytes(range(256)) * 0x80
+
+
+class TestProcedurePatch(unittest.TestCase):
+    def test_tokens(self) -> None:
+        """Tests applying tokens and the SNES CRC, with the patch files read when they are retrieved."""
+        with TemporaryDirectory() as temp_dir:
+            patch = TokenPatch(os.path.join(temp_dir, "test.aptest"), player=1, player_name="Player")
+            patch.write_token(APTokenTypes.WRITE, 0x10, b"abc")
+            patch.write_token(APTokenTypes.AND_8, 0x20, 0x0F)
+            patch.write_token(APTokenTypes.OR_8, 0x21, 0xF0)
+            patch.write_token(APTokenTypes.XOR_8, 0x22, 0xFF)
+            patch.write_token(APTokenTypes.COPY, 0x30, (4, 0x10))
+            patch.write_token(APTokenTypes.RLE, 0x40, (5, 0xEE))
+            patch.write_file("token_data.bin", patch.get_token_binary())
+            patch.write()
+
+            expected = bytearray(TokenPatch.get_source_data())
+            expected[0x10:0x13] = b"abc"
+            expected[0x20] &= 0x0F
+            expected[0x21] |= 0xF0
+            expected[0x22] ^= 0xFF
+            expected[0x30:0x34] = expected[0x10:0x14]
+            expected[0x40:0x45] = b"\xEE" * 5
+            crc = (sum(expected[:0x7FDC]) + sum(expected[0x7FE0:]) + 0x01FE) & 0xFFFF
+            expected[0x7FDC:0x7FE0] = ((crc ^ 0xFFFF) | crc << 16).to_bytes(4, "little")
+
+            read_patch = TokenPatch(patch.path)
+            target = os.path.join(temp_dir, "test.sfc")
+            read_patch.patch(target)
+            self.assertEqual(read_patch.files, {})
+            self.assertIn("token_data.bin", read_patch.unread_files)
+            with open(target, "rb") as file:
+                self.assertEqual(file.read(), expected)
+            self.assertEqual(TokenPatch.source_data, TokenPatch.get_source_data(), "source data was changed")
+
+            # writing the patch again keeps its files
+            read_patch.write()
+            self.assertEqual(TokenPatch(patch.path).get_file("token_data.bin"), patch.get_token_binary())
+
+
+def reference_token_binary(tokens: typing.Sequence[typing.Tuple[APTokenTypes, int, typing.Any]]) -> bytes:
+    """The token binary of tokens, without merging, as written before merging writes"""
+    data = bytearray()
+    data.extend(len(tokens).to_bytes(4, "little"))
+    for token_type, offset, args in tokens:
+        data.append(token_type)
+        data.extend(offset.to_bytes(4, "little"))
+        if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
+            data.extend(int.to_bytes(1, 4, "little"))
+            data.append(args)
+        elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
+            data.extend(int.to_bytes(8, 4, "little"))
+            data.extend(args[0].to_bytes(4, "little"))
+            data.extend(args[1].to_bytes(4, "little"))
+        else:
+            data.extend(len(args).to_bytes(4, "little"))
+            data.extend(args)
+    return bytes(data)
+
+
+def reference_apply_tokens(rom: bytes, token_data: bytes) -> bytes:
+    """Applies a token binary like apply_tokens did before applying runs of tokens"""
+    rom_data = bytearray(rom)
+    token_count = int.from_bytes(token_data[0:4], "little")
+    bpr = 4
+    for _ in range(token_count):
+        token_type = token_data[bpr:bpr + 1][0]
+        offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
+        size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
+        data = token_data[bpr + 9:bpr + 9 + size]
+        if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
+            arg = data[0]
+            if token_type == APTokenTypes.AND_8:
+                rom_data[offset] = rom_data[offset] & arg
+            elif token_type == APTokenTypes.OR_8:
+                rom_data[offset] = rom_data[offset] | arg
+            else:
+                rom_data[offset] = rom_data[offset] ^ arg
+        elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
+            length = int.from_bytes(data[:4], "little")
+            value = int.from_bytes(data[4:], "little")
+            if token_type == APTokenTypes.COPY:
+                rom_data[offset: offset + length] = rom_data[value: value + length]
+            else:
+                rom_data[offset: offset + length] = bytes([value] * length)
+        else:
+            rom_data[offset:offset + len(data)] = data
+        bpr += 9 + size
+    return bytes(rom_data)
+
+
+class TokenFile:
+    """Stands in for the patch that apply_tokens retrieves the token file from"""
+    def __init__(self, token_data: bytes) -> None:
+        self.token_data = token_data
+
+    def get_file(self, file: str) -> bytes:
+        return self.token_data
+
+
+class TestTokens(unittest.TestCase):
+    size = 0x1000
+
+    def make_tokens(self, random: Random, count: int) -> APTokenMixin:
+        tokens = APTokenMixin()
+        for _ in range(count):
+            token_type = random.choice([APTokenTypes.WRITE] * 6 + list(APTokenTypes))
+            offset = random.randrange(0x100) if random.random() < 0.5 else random.randrange(self.size - 0x40)
+            if token_type == APTokenTypes.WRITE:
+                tokens.write_token(token_type, offset, random.randbytes(random.randrange(0x20)))
+            elif token_type in (APTokenTypes.COPY, APTokenTypes.RLE):
+                value = random.randrange(self.size - 0x40) if token_type == APTokenTypes.COPY else random.randrange(256)
+                tokens.write_token(token_type, offset, (random.randrange(0x40), value))
+            else:
+                tokens.write_token(token_type, offset, random.randrange(256))
+        return tokens
+
+    def test_differential(self) -> None:
+        """Tests that applying tokens gives the same data as before, with and without merged writes."""
+        random = Random(0)
+        for count in (0, 1, 2, 10, 100, 1000):
+            for _ in range(10):
+                with self.subTest(count=count):
+                    rom = random.randbytes(self.size)
+                    tokens = self.make_tokens(random, count)
+                    unmerged = reference_token_binary(tokens._tokens)
+                    merged = tokens.get_token_binary()
+                    expected = reference_apply_tokens(rom, unmerged)
+                    for token_data in (unmerged, merged):
+                        caller = typing.cast(APProcedurePatch, TokenFile(token_data))
+                        self.assertEqual(APPatchExtension.apply_tokens(caller, rom, "token_data.bin"), expected)
+                    self.assertLessEqual(len(merged), len(unmerged))
+
+    def test_merged_writes(self) -> None:
+        """Tests that consecutive writes are merged where they overlap or are adjacent, keeping the later write."""
+        tokens = APTokenMixin()
+        tokens.write_token(APTokenTypes.WRITE, 4, b"efgh")
+        tokens.write_token(APTokenTypes.WRITE, 0, b"abcd")
+        tokens.write_token(APTokenTypes.WRITE, 6, b"XY")
+        tokens.write_token(APTokenTypes.WRITE, 20, b"z")
+        tokens.write_token(APTokenTypes.XOR_8, 20, 1)
+        tokens.write_token(APTokenTypes.WRITE, 21, b"!")
+        self.assertEqual(tokens.get_token_binary(), reference_token_binary([
+            (APTokenTypes.WRITE, 0, b"abcdefXY"),
+            (APTokenTypes.WRITE, 20, b"z"),
+            (APTokenTypes.XOR_8, 20, 1),
+            (APTokenTypes.WRITE, 21, b"!"),
+        ]))
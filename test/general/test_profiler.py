@@ -0,0 +1,52 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import Profiler
+from Fill import distribute_items_restrictive
+from worlds.AutoWorld import AutoWorldRegister
+from . import setup_multiworld
+
+
+class TestGenerationProfiler(unittest.TestCase):
+    def test_profile(self) -> None:
+        """Tests that a profiled fill reports its sections and rules, and leaves the rules as they were."""
+        world_type = AutoWorldRegister.world_types["APQuest"]
+        with Profiler.GenerationProfiler() as profiler:
+            multiworld = setup_multiworld([world_type, world_type], seed=0)
+            original_rules = {location: location.access_rule for location in multiworld.get_locations()}
+            Profiler.instrument_rules(multiworld)
+            self.assertTrue(all(isinstance(location.access_rule, Profiler.ProfiledRule)
+                                for location in multiworld.get_locations()))
+            distribute_items_restrictive(multiworld)
+        self.assertIsNone(Profiler.get_active_profiler())
+        self.assertEqual({location: location.access_rule for location in multiworld.get_locations()},
+                         original_rules)
+
+        report = profiler.report()
+        for name in ("generation", "create_regions", "distribute_items_restrictive", "fill_restrictive",
+                     "sweep_for_advancements"):
+            self.assertIn(name, report["sections"])
+        self.assertEqual(report["sections"]["generation"]["time"], profiler.total_time)
+        for player in multiworld.player_ids:
+            world = report["worlds"][str(player)]
+            self.assertEqual(world["game"], "APQuest")
+            self.assertEqual(world["stages"]["create_regions"]["calls"], 1)
+            self.assertGreater(world["location_rules"]["calls"], 0)
+        self.assertTrue(report["locations"])
+
+        for line in profiler.collapsed_stacks():
+            stack, weight = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("generation"))
+            self.assertGreater(int(weight), 0)
+
+        with TemporaryDirectory() as temp_dir:
+            paths = profiler.write(os.path.join(temp_dir, "profile"))
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_inactive(self) -> None:
+        """Tests that the hooks do nothing without an active profiler."""
+        multiworld = setup_multiworld([AutoWorldRegister.world_types["APQuest"]], seed=0)
+        Profiler.instrument_rules(multiworld)
+        self.assertFalse(any(isinstance(location.access_rule, Profiler.ProfiledRule)
+                             for location in multiworld.get_locations()))
@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock
 from dataclasses import dataclass, fields
 from typing import Any, ClassVar, cast
 
@@ -492,6 +493,109 @@ class TestCaching(CachedRuleBuilderTestCase):
         self.assertTrue(entrance.can_reach(self.state))
 
 
+class TestEntranceDependencies(CachedRuleBuilderTestCase):
+    multiworld: MultiWorld  # pyright: ignore[reportUninitializedInstanceVariable]
+    world: CachedRuleBuilderWorld  # pyright: ignore[reportUninitializedInstanceVariable]
+    player: int = 1
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.multiworld = setup_solo_multiworld(self.world_cls, seed=0)
+        world = cast(CachedRuleBuilderWorld, self.multiworld.worlds[1])
+        world.explicit_indirect_conditions = False
+        self.world = world
+
+        regions = [Region(f"Region {i}", self.player, self.multiworld) for i in range(1, 5)]
+        self.multiworld.regions.extend(regions)
+        world.create_entrance(regions[0], regions[1], Has("Item 1"))
+        world.create_entrance(regions[0], regions[2], CanReachRegion("Region 2") & Has("Item 2"))
+        regions[0].connect(regions[3], rule=lambda state: state.has("Item 3", self.player))
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(self.world.get_entrance_dependencies(self.world.get_entrance("Region 1 -> Region 2")),
+                         (frozenset({"Item 1"}), frozenset()))
+        self.assertEqual(self.world.get_entrance_dependencies(self.world.get_entrance("Region 1 -> Region 3")),
+                         (frozenset({"Item 2"}), frozenset({"Region 2"})))
+        self.assertIsNone(self.world.get_entrance_dependencies(self.world.get_entrance("Region 1 -> Region 4")))
+
+    def test_recheck_only_changed(self) -> None:
+        state = CollectionState(self.multiworld)
+        self.assertFalse(state.can_reach_region("Region 2", self.player))
+        blocked = state.blocked_connections[self.player]
+        self.assertEqual(len(blocked), 3)
+
+        state.collect(self.world.create_item("Item 2"))
+        get_connections_to_recheck = state._get_connections_to_recheck  # pyright: ignore[reportPrivateUsage]
+        rechecked = {entrance.name for entrance in get_connections_to_recheck(self.player, blocked, frozenset())}
+        self.assertEqual(rechecked, {"Region 1 -> Region 3", "Region 1 -> Region 4"})
+
+        state.collect(self.world.create_item("Item 1"))
+        self.assertTrue(state.can_reach_region("Region 2", self.player))
+        self.assertTrue(state.can_reach_region("Region 3", self.player))
+        self.assertFalse(state.can_reach_region("Region 4", self.player))
+        state.collect(self.world.create_item("Item 3"))
+        self.assertTrue(state.can_reach_region("Region 4", self.player))
+
+
+class TestSweepDependencies(CachedRuleBuilderTestCase):
+    multiworld: MultiWorld  # pyright: ignore[reportUninitializedInstanceVariable]
+    world: CachedRuleBuilderWorld  # pyright: ignore[reportUninitializedInstanceVariable]
+    player: int = 1
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.multiworld = setup_solo_multiworld(self.world_cls, seed=0)
+        world = cast(CachedRuleBuilderWorld, self.multiworld.worlds[1])
+        self.world = world
+
+        region1 = Region("Region 1", self.player, self.multiworld)
+        region2 = Region("Region 2", self.player, self.multiworld)
+        self.multiworld.regions.extend([region1, region2])
+        region1.add_locations({f"Location {i}": i for i in (1, 2, 3, 4, 6)}, RuleBuilderLocation)
+        region2.add_locations({"Location 5": 5}, RuleBuilderLocation)
+        world.create_entrance(region1, region2, Has("Item 3"))
+        for i in range(2, 5):
+            world.set_rule(world.get_location(f"Location {i}"), Has(f"Item {i - 1}"))
+        world.get_location("Location 6").access_rule = lambda state: state.has("Item 5", self.player)
+        for i in range(1, 7):
+            world.get_location(f"Location {i}").place_locked_item(world.create_item(f"Item {i}"))
+
+    def test_dependencies(self) -> None:
+        self.assertEqual(self.world.get_location_dependencies(self.world.get_location("Location 1")),
+                         (frozenset(), frozenset()))
+        self.assertEqual(self.world.get_location_dependencies(self.world.get_location("Location 2")),
+                         (frozenset({"Item 1"}), frozenset()))
+        self.assertIsNone(self.world.get_location_dependencies(self.world.get_location("Location 6")))
+
+    def test_sweep_wakes_dependents(self) -> None:
+        from BaseClasses import _SweepWaitList  # pyright: ignore[reportPrivateUsage]
+
+        woken: list[set[str]] = []
+        wake = _SweepWaitList.wake
+
+        def recording_wake(wait_list: _SweepWaitList, state: CollectionState) -> list[Location]:
+            locations = wake(wait_list, state)
+            woken.append({location.name for location in locations})
+            return locations
+
+        state = CollectionState(self.multiworld)
+        with unittest.mock.patch.object(_SweepWaitList, "wake", recording_wake):
+            state.sweep_for_advancements()
+
+        self.assertEqual(state.advancements, set(self.multiworld.get_locations()))
+        self.assertEqual(woken, [
+            {f"Location {i}" for i in range(1, 7)},
+            {"Location 2", "Location 6"},
+            {"Location 3", "Location 6"},
+            {"Location 4", "Location 5", "Location 6"},
+            {"Location 6"},
+        ])
+
+
 class TestCacheDisabled(RuleBuilderTestCase):
     multiworld: MultiWorld  # pyright: ignore[reportUninitializedInstanceVariable]
     world: World  # pyright: ignore[reportUninitializedInstanceVariable]
@@ -750,6 +854,20 @@ class TestRules(RuleBuilderTestCase):
         self.assertEqual(self.multiworld.can_beat_game(self.state), True)
 
 
+class TestIndexedRules(TestRules):
+    """Runs the rule tests again with the world's progression items interned to indices"""
+
+    @override
+    def _create_world_class(self) -> None:
+        super()._create_world_class()
+        self.world_cls.indexed_prog_items = True
+
+    def test_has_all_uses_mask(self) -> None:
+        resolved_rule = HasAll("Item 1", "Item 2").resolve(self.world)
+        assert isinstance(resolved_rule, HasAll.Resolved)
+        self.assertEqual(resolved_rule.item_mask, self.world.get_item_mask(("Item 1", "Item 2")))
+
+
 class TestSerialization(RuleBuilderTestCase):
     maxDiff: int | None = None
 
@@ -1,7 +1,9 @@
 import unittest
+from unittest import mock
 
+from BaseClasses import CollectionState, IndexedCounter, Location
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from . import generate_items, generate_locations, generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +29,139 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    def test_copy_on_write_is_independent(self):
+        """Ensure copy-on-write copies of a state don't see changes made to each other or to their source."""
+        multiworld = generate_test_multiworld(2)
+        item_1, item_2 = generate_items(1, 1, True)[0], generate_items(1, 2, True)[0]
+        state = multiworld.state.copy()
+        state.collect(item_1, True)
+
+        copied = state.copy(copy_on_write=True)
+        self.assertEqual(copied.count(item_1.name, 1), 1)
+        copied.collect(item_2, True)
+        self.assertFalse(state.has(item_2.name, 2))
+        self.assertTrue(copied.has(item_2.name, 2))
+
+        state.remove(item_1)
+        self.assertFalse(state.has(item_1.name, 1))
+        self.assertTrue(copied.has(item_1.name, 1))
+        self.assertEqual(state.prog_items.keys(), copied.prog_items.keys())
+
+    def test_copy_on_write_chain(self):
+        """Ensure copies of copy-on-write copies are still independent of each other."""
+        multiworld = generate_test_multiworld(2)
+        items = generate_items(3, 1, True)
+        state = multiworld.state.copy(copy_on_write=True)
+        copies = []
+        for item in items:
+            state.collect(item, True)
+            copies.append(state.copy(copy_on_write=True))
+        for count, copied in enumerate(copies, 1):
+            self.assertEqual(sum(copied.prog_items[1].values()), count)
+            self.assertEqual(len(copied.prog_items), 2)
+
+
+class TestSphereAnalysis(unittest.TestCase):
+    def setUp(self) -> None:
+        """Set up two players with a chain of progression across both of them and some filler on the side."""
+        self.multiworld = generate_test_multiworld(2)
+        self.chain = []
+        for player in (1, 2):
+            menu = self.multiworld.get_region("Menu", player)
+            locations = generate_locations(4, player, menu)
+            items = generate_items(3, player, True) + generate_items(1, player)
+            self.chain += zip(locations[:3], items[:3])
+            locations[3].place_locked_item(items[3])
+        previous = None
+        for location, item in self.chain:
+            location.place_locked_item(item)
+            if previous:
+                location.access_rule = lambda state, item=previous: state.has(item.name, item.player)
+            previous = item
+        for player in (1, 2):
+            self.multiworld.completion_condition[player] = \
+                lambda state: state.has(previous.name, previous.player)
+
+    def test_matches_sweeps(self) -> None:
+        """Ensure everything reading the analysis gets the same result as sweeping on its own."""
+        expected_spheres = list(self.multiworld.get_spheres())
+        expected_sendable = list(self.multiworld.get_sendable_spheres())
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.multiworld.spoiler.create_playthrough(create_paths=False)
+        expected_playthrough = self.multiworld.spoiler.playthrough
+
+        analysis = self.multiworld.analyze_spheres()
+        self.assertEqual(len(analysis.spheres), len(self.chain))
+        for index, (location, _) in enumerate(self.chain):
+            self.assertEqual(analysis.sphere_index[location], index)
+        self.assertEqual(list(self.multiworld.get_spheres()), expected_spheres)
+        self.assertEqual(list(self.multiworld.get_sendable_spheres()), expected_sendable)
+        self.assertTrue(self.multiworld.fulfills_accessibility())
+        self.multiworld.spoiler.create_playthrough(create_paths=False)
+        self.assertEqual(self.multiworld.spoiler.playthrough, expected_playthrough)
+
+    def test_accessibility_reuses_analysis(self) -> None:
+        """Ensure the accessibility check reads the analysis instead of sweeping again, unless given a state."""
+        self.multiworld.analyze_spheres()
+        with mock.patch.object(Location, "can_reach", autospec=True, side_effect=Location.can_reach) as can_reach:
+            self.assertTrue(self.multiworld.fulfills_accessibility())
+            self.assertEqual(can_reach.call_count, 0)
+            self.assertTrue(self.multiworld.fulfills_accessibility(CollectionState(self.multiworld)))
+            self.assertGreater(can_reach.call_count, 0)
+        self.assertEqual(self.multiworld.sphere_analysis.final_state.locations_checked,
+                         set(self.multiworld.get_filled_locations()))
+
+    def test_unreachable(self) -> None:
+        """Ensure unreachable locations are reported after an empty sphere, the same as get_spheres without it."""
+        location, item = self.chain[-1]
+        location.access_rule = lambda state: False
+        expected_spheres = list(self.multiworld.get_spheres())
+        self.assertEqual(expected_spheres[-2:], [set(), {location}])
+
+        analysis = self.multiworld.analyze_spheres()
+        self.assertEqual(analysis.unreachable, {location})
+        self.assertFalse(analysis.final_state.has(item.name, item.player))
+        self.assertEqual(list(self.multiworld.get_spheres()), expected_spheres)
+
+
+class TestIndexedProgItems(unittest.TestCase):
+    def test_masks_follow_counts(self) -> None:
+        """Ensure the interned counts and masks stay in sync with the item name based counts."""
+        multiworld = generate_test_multiworld(2)
+        world = multiworld.worlds[1]
+        world.indexed_prog_items = True
+        item_1, item_2, item_3 = generate_items(3, 1, True)
+        mask = world.get_item_mask((item_1.name, item_2.name))
+        index = world.get_item_index(item_3.name)
+
+        state = CollectionState(multiworld)
+        self.assertIsInstance(state.prog_items[1], IndexedCounter)
+        self.assertNotIsInstance(state.prog_items[2], IndexedCounter)
+        state.collect(item_1, True)
+        self.assertFalse(state.has_mask(mask, 1))
+        self.assertTrue(state.has_any_mask(mask, 1))
+        state.collect(item_2, True)
+        state.collect(item_3, True)
+        state.collect(item_3, True)
+        self.assertTrue(state.has_mask(mask, 1))
+        self.assertEqual(state.count_index(index, 1), 2)
+        self.assertEqual(state.count(item_3.name, 1), 2)
+
+        copied = state.copy()
+        state.remove(item_1)
+        self.assertFalse(state.has_mask(mask, 1))
+        self.assertTrue(copied.has_mask(mask, 1))
+        state.remove(item_2)
+        self.assertFalse(state.has_any_mask(mask, 1))
+
+        # names interned after the state was created are still tracked
+        late_item = generate_items(1, 1, True)[0]
+        late_item.name = "late"
+        late_index = world.get_item_index(late_item.name)
+        self.assertEqual(state.count_index(late_index, 1), 0)
+        state.collect(late_item, True)
+        self.assertEqual(state.count_index(late_index, 1), 1)
+        self.assertTrue(state.has_mask(world.get_item_mask((late_item.name, item_3.name)), 1))
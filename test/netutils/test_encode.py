@@ -0,0 +1,98 @@
+# Tests for NetUtils.encode against scanning for TypedTuples before encoding with JSONEncoder, and for encode_binary
+import collections
+import enum
+import json
+import typing
+import unittest
+
+from NetUtils import (ClientStatus, Hint, HintStatus, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, _encode,
+                      _scan_for_binary, _scan_for_TypedTuples, binary_framing_available, decode, decode_binary, decode_frame, encode,
+                      encode_binary)
+
+
+class Percent(typing.NamedTuple):
+    value: int
+    name: str = "100%"
+
+
+class Color(str, enum.Enum):
+    red = "red"
+
+
+samples: typing.List[typing.Any] = [
+    [],
+    {},
+    (),
+    None,
+    1,
+    "text with \"quotes\", \\, \n and ünïcödé",
+    [{"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(1, 2, 3, 4), NetworkItem(5, -6, 7)]}],
+    [NetworkItem(1, 2, 3, True), NetworkItem(1, 2, 3, 1)],
+    [NetworkItem(1, 2, 3), Hint(1, 2, 3, 4, False, "entrance", 1, HintStatus.HINT_PRIORITY), 5, "text"],
+    {1: NetworkSlot("Player", "Game", SlotType.group, (1, 2)), 2: NetworkSlot("Other", "Game", SlotType.player)},
+    {"players": [NetworkPlayer(0, 1, "Alias", "Name")], "nested": {"list": [[1, 2], (3,), {4}]}},
+    {1: "int key", True: "bool key", None: "none key", 1.5: "float key", Color.red: "enum key"},
+    {"status": ClientStatus.CLIENT_GOAL, "flags": SlotType.group, "color": Color.red, "float": 0.1},
+    {"set": {NetworkItem(1, 2, 3)}, "frozenset": frozenset((1, 2))},
+    collections.defaultdict(list, {"default": [NetworkItem(1, 2, 3)]}),
+    collections.OrderedDict(b=[1], a=[Percent(1)]),
+    [Percent(1), Percent(2, "%d %s")],
+    NetworkItem(1, 2, 3),
+    [[NetworkItem(1, 2, 3)], ({"in": NetworkItem(4, 5, 6)},)],
+]
+
+
+class TestEncode(unittest.TestCase):
+    def test_identical(self) -> None:
+        """Tests that encode gives the same JSON as scanning for TypedTuples and then encoding."""
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(encode(sample), _encode(_scan_for_TypedTuples(sample)))
+
+    def test_unsupported(self) -> None:
+        """Tests that encode raises for what JSONEncoder can't encode, like before."""
+        for sample in ({(1, 2): "tuple key"}, [object()], {"value": {"key": object()}}):
+            with self.subTest(sample=sample):
+                with self.assertRaises(TypeError):
+                    _encode(_scan_for_TypedTuples(sample))
+                with self.assertRaises(TypeError):
+                    encode(sample)
+
+
+def as_packed(obj: typing.Any) -> typing.Any:
+    """Returns obj like MessagePack unpacks it without an object hook, with arrays as lists."""
+    if isinstance(obj, (list, tuple)):
+        return list(map(as_packed, obj))
+    if isinstance(obj, dict):
+        return {key: as_packed(value) for key, value in obj.items()}
+    return obj
+
+
+class TestScanForBinary(unittest.TestCase):
+    def test_same_as_json(self) -> None:
+        """Tests that the data packed for binary is the same as the JSON of the same messages, without msgpack."""
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(as_packed(_scan_for_binary(sample)), json.loads(encode(sample)))
+
+    def test_unsupported_keys(self) -> None:
+        """Tests that keys encode raises for are also rejected for binary."""
+        with self.assertRaises(TypeError):
+            _scan_for_binary({"value": {(1, 2): "tuple key"}})
+
+
+@unittest.skipUnless(binary_framing_available, "msgpack is not installed")
+class TestEncodeBinary(unittest.TestCase):
+    def test_same_as_json(self) -> None:
+        """Tests that decoding binary gives the same data as decoding JSON of the same messages."""
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(decode_binary(encode_binary(sample)), decode(encode(sample)))
+                self.assertEqual(decode_frame(encode_binary(sample)), decode_frame(encode(sample)))
+
+    def test_unsupported(self) -> None:
+        """Tests that encode_binary raises for what encode raises for."""
+        for sample in ({(1, 2): "tuple key"}, [object()], {"value": {"key": object()}}):
+            with self.subTest(sample=sample):
+                with self.assertRaises(TypeError):
+                    encode_binary(sample)
@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import json
+import typing
+import unittest
+
+from worlds._bizhawk import (BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, disconnect,
+                             get_hash, get_memory_size, get_system, guarded_read, guarded_write, ping, read, write)
+
+
+class StandInConnector:
+    """
+    Stands in for the connector script in BizHawk, answering the messages that arrived by the end of each emulated frame
+    in order, or only the first of them if one_message_per_frame, like versions of the script before pipelining.
+    """
+    rom_hash = "0123456789ABCDEF"
+    system = "GBA"
+
+    def __init__(self, memory: typing.Dict[str, bytearray], frame_time: float = 1 / 60,
+                 one_message_per_frame: bool = False) -> None:
+        self.memory = memory
+        self.frame_time = frame_time
+        self.one_message_per_frame = one_message_per_frame
+        self.messages: typing.List[str] = []
+        self.server: typing.Optional[asyncio.Server] = None
+        self.connections: typing.Set[asyncio.Task] = set()
+
+    async def start(self) -> typing.Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Starts listening, and returns the streams of a connection to it."""
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return await asyncio.open_connection("127.0.0.1", self.server.sockets[0].getsockname()[1])
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for connection in self.connections:
+            connection.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        received: asyncio.Queue[bytes] = asyncio.Queue()
+
+        async def receive() -> None:
+            while line := await reader.readline():
+                received.put_nowait(line)
+            received.put_nowait(b"")
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while True:
+                await asyncio.sleep(self.frame_time)
+                while not received.empty():
+                    line = received.get_nowait()
+                    if not line:
+                        return
+                    writer.write(self._respond(line.decode("utf-8").rstrip("\n")).encode("utf-8") + b"\n")
+                    if self.one_message_per_frame:
+                        break
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            receiver.cancel()
+            writer.close()
+            self.connections.discard(connection)
+
+    def _respond(self, message: str) -> str:
+        self.messages.append(message)
+        if message == "VERSION":
+            return "1"
+
+        responses: typing.List[typing.Dict[str, typing.Any]] = []
+        for request in json.loads(message):
+            if responses and responses[-1]["type"] == "GUARD_RESPONSE" and not responses[-1]["value"]:
+                responses.append(responses[-1])
+            elif request["type"] == "PING":
+                responses.append({"type": "PONG"})
+            elif request["type"] == "HASH":
+                responses.append({"type": "HASH_RESPONSE", "value": self.rom_hash})
+            elif request["type"] == "SYSTEM":
+                responses.append({"type": "SYSTEM_RESPONSE", "value": self.system})
+            elif request["type"] == "MEMORY_SIZE":
+                responses.append({"type": "MEMORY_SIZE_RESPONSE", "value": len(self.memory[request["domain"]])})
+            elif request["type"] == "GUARD":
+                memory = self.memory[request["domain"]]
+                expected = base64.b64decode(request["expected_data"])
+                value = memory[request["address"]:request["address"] + len(expected)] == expected
+                responses.append({"type": "GUARD_RESPONSE", "value": value, "address": request["address"]})
+            elif request["type"] == "READ":
+                data = self.memory[request["domain"]][request["address"]:request["address"] + request["size"]]
+                responses.append({"type": "READ_RESPONSE", "value": base64.b64encode(data).decode("ascii")})
+            elif request["type"] == "WRITE":
+                data = base64.b64decode(request["value"])
+                self.memory[request["domain"]][request["address"]:request["address"] + len(data)] = data
+                responses.append({"type": "WRITE_RESPONSE"})
+            else:
+                responses.append({"type": "ERROR", "err": f"Unknown command: {request['type']}"})
+        return json.dumps(responses)
+
+
+class TestBizHawkContext(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.memory = {"ROM": bytearray(range(256)), "WRAM": bytearray(64)}
+        self.connector = StandInConnector(self.memory, frame_time=0.001)
+        self.ctx = BizHawkContext()
+        self.ctx.streams = await self.connector.start()
+        self.ctx.connection_status = ConnectionStatus.TENTATIVE
+
+    async def asyncTearDown(self) -> None:
+        disconnect(self.ctx)
+        await self.connector.stop()
+
+    async def test_pipelined(self) -> None:
+        """Tests that concurrent requests are sent without waiting for earlier responses, and get their own response."""
+        addresses = list(range(0, 256, 16))
+        results = await asyncio.gather(*(read(self.ctx, [(address, 4, "ROM")]) for address in addresses))
+        self.assertEqual(results, [[bytes(range(address, address + 4))] for address in addresses])
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.CONNECTED)
+
+        self.connector.one_message_per_frame = True
+        results = await asyncio.gather(ping(self.ctx), read(self.ctx, [(5, 1, "ROM")]), ping(self.ctx))
+        self.assertEqual(results, [None, [b"\x05"], None])
+
+    async def test_coalesced_reads(self) -> None:
+        """Tests that overlapping and adjacent reads are requested as one read, and returned as requested."""
+        read_list = [(20, 4, "ROM"), (0, 8, "ROM"), (8, 8, "ROM"), (4, 2, "ROM"), (0, 2, "WRAM"), (30, 0, "ROM")]
+        self.memory["WRAM"][:2] = b"\xff\xfe"
+        self.assertEqual(await read(self.ctx, read_list), [
+            bytes(range(20, 24)), bytes(range(8)), bytes(range(8, 16)), bytes(range(4, 6)), b"\xff\xfe", b""
+        ])
+        reads = json.loads(self.connector.messages[-1])
+        self.assertEqual(reads, [
+            {"type": "READ", "address": 0, "size": 16, "domain": "ROM"},
+            {"type": "READ", "address": 20, "size": 4, "domain": "ROM"},
+            {"type": "READ", "address": 30, "size": 0, "domain": "ROM"},
+            {"type": "READ", "address": 0, "size": 2, "domain": "WRAM"},
+        ])
+
+        self.assertIsNone(await guarded_read(self.ctx, [(0, 4, "ROM")], [(0, b"\x01", "ROM")]))
+        self.assertEqual(await guarded_read(self.ctx, [(0, 4, "ROM"), (2, 4, "ROM")], [(0, b"\x00", "ROM")]),
+                         [b"\x00\x01\x02\x03", b"\x02\x03\x04\x05"])
+
+    async def test_cached(self) -> None:
+        """Tests that the hash, system and memory sizes are requested once per connection."""
+        for _ in range(2):
+            self.assertEqual(await get_hash(self.ctx), StandInConnector.rom_hash)
+            self.assertEqual(await get_system(self.ctx), StandInConnector.system)
+            self.assertEqual(await get_memory_size(self.ctx, "WRAM"), 64)
+        self.assertEqual(len(self.connector.messages), 3)
+
+        disconnect(self.ctx)
+        self.ctx.streams = await self.connector.start()
+        self.assertEqual(await get_hash(self.ctx), StandInConnector.rom_hash)
+        self.assertEqual(len(self.connector.messages), 4)
+
+    async def test_writes(self) -> None:
+        self.assertTrue(await guarded_write(self.ctx, [(0, b"\x01\x02", "WRAM")], [(0, b"\x00", "WRAM")]))
+        self.assertFalse(await guarded_write(self.ctx, [(0, b"\x03", "WRAM")], [(0, b"\x00", "WRAM")]))
+        await write(self.ctx, [(2, b"\x04", "WRAM")])
+        self.assertEqual(self.memory["WRAM"][:4], b"\x01\x02\x04\x00")
+
+    async def test_connection_closed(self) -> None:
+        """Tests that all requests awaiting a response fail when the connection closes."""
+        self.connector.frame_time = 10
+        requests = [asyncio.create_task(ping(self.ctx)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await self.connector.stop()
+        for request in requests:
+            with self.assertRaises(RequestFailedError):
+                await request
+        self.assertEqual(self.ctx.connection_status, ConnectionStatus.NOT_CONNECTED)
+        self.assertIsNone(self.ctx.streams)
+
+        with self.assertRaises(NotConnectedError):
+            await ping(self.ctx)
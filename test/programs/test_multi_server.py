@@ -1,5 +1,14 @@
+import asyncio
+import copy
+import os
+import typing
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+import unittest.mock
+from tempfile import TemporaryDirectory
+
+from MultiServer import Client, Context, SaveJournal, ServerCommandProcessor, encode_data_package, \
+    encoded_game_packages, send_items_to, send_new_items
+from NetUtils import Hint, HintStatus, NetworkItem, binary_framing_available, decode, decode_binary, encode
 
 
 class TestResolvePlayerName(unittest.TestCase):
@@ -38,3 +47,169 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestSaveJournal(unittest.TestCase):
+    @staticmethod
+    def make_save() -> dict[str, typing.Any]:
+        return {
+            "version": 3,
+            "received_items": {(0, 1, True): [NetworkItem(1, 2, 1, 0)]},
+            "location_checks": {(0, 1): {2}},
+            "hints": {(0, 1): {Hint(1, 1, 2, 3, False)}},
+            "hints_used": {(0, 1): 0},
+            "name_aliases": {},
+            "client_activity_timers": (((0, 1), 1.0),),
+            "stored_data": {"key": [1]},
+        }
+
+    @staticmethod
+    def diff(journal: SaveJournal, save: dict[str, typing.Any]) -> list[tuple[str, str, typing.Any, typing.Any]]:
+        """Diffs save like a save does, capturing its stored_data from a shallow copy to keep save itself live."""
+        captured = dict(save)
+        return journal.diff(captured, journal.capture_stored_data(captured, False))
+
+    def test_replay(self) -> None:
+        """Tests that replaying the journal onto the snapshot gives the current save data."""
+        journal = SaveJournal()
+        save = self.make_save()
+        journal.start_snapshot(save)
+        snapshot = copy.deepcopy(save)
+        journal.reset(save, 0)
+
+        entries: list[tuple[int, list[typing.Any]]] = []
+        save["received_items"][0, 1, True].append(NetworkItem(3, 4, 2, 0))
+        save["received_items"][0, 2, True] = [NetworkItem(5, 6, 1, 0)]
+        save["location_checks"][0, 1].add(4)
+        save["hints_used"][0, 1] = 1
+        save["name_aliases"][0, 1] = "Alias"
+        save["client_activity_timers"] = (((0, 1), 2.0), ((0, 2), 3.0))
+        save["stored_data"]["key"].append(2)
+        journal.dirty_stored_data.add("key")
+        entries.append((journal.generation, self.diff(journal, save)))
+        self.assertEqual(self.diff(journal, save), [])
+
+        del save["name_aliases"][0, 1]
+        save["version"] = 4
+        entries.append((journal.generation, self.diff(journal, save)))
+        # an entry of another snapshot is skipped
+        entries.append((journal.generation + 1, [("replace", "version", None, 5)]))
+
+        self.assertEqual(SaveJournal.apply(snapshot, entries), 2)
+        self.assertEqual(snapshot, save)
+
+    def test_stored_data_set_while_saving(self) -> None:
+        """Tests that stored_data set while a save is encoded stays dirty for the next save, and that a failed save
+        marks its captured keys dirty again."""
+        journal = SaveJournal()
+        save = self.make_save()
+        stored_data = save["stored_data"]
+        journal.dirty_stored_data.add("key")
+        keys = journal.capture_stored_data(save, True)
+        self.assertEqual(keys, {"key"})
+        self.assertIsNot(save["stored_data"], stored_data)
+        # set on the event loop after the snapshot captured stored_data, but before it was persisted
+        stored_data["key"].append(2)
+        journal.dirty_stored_data.add("key")
+        journal.start_snapshot(save)
+        journal.reset(save, 0)
+        self.assertEqual(self.diff(journal, {"stored_data": stored_data}), [("set", "stored_data", "key", [1, 2])])
+
+        stored_data["other"] = 3
+        journal.dirty_stored_data.add("other")
+        captured = {"stored_data": stored_data}
+        keys = journal.capture_stored_data(captured, False)
+        self.assertEqual(captured["stored_data"], {"other": 3})
+        self.assertFalse(journal.dirty_stored_data)
+        journal.restore_stored_data(keys)
+        self.assertEqual(journal.dirty_stored_data, {"other"})
+
+    def test_file(self) -> None:
+        """Tests that a partially written last entry of a journal file is ignored."""
+        with TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "test.apsave.journal")
+            self.assertEqual(SaveJournal.read_file(path), [])
+            first = SaveJournal.encode_entry(1, [("replace", "version", None, 1)])
+            second = SaveJournal.encode_entry(1, [("replace", "version", None, 2)])
+            SaveJournal.append_file(path, first)
+            SaveJournal.append_file(path, second)
+            with open(path, "r+b") as f:
+                f.truncate(len(first) + 4 + len(second) // 2)
+            self.assertEqual(SaveJournal.read_file(path), [(1, [("replace", "version", None, 1)])])
+
+
+class TestSendNewItems(unittest.TestCase):
+    def test_coalesce(self) -> None:
+        """Tests that items sent within one event loop iteration reach each client as one ReceivedItems,
+        and that only clients of slots which received items are visited."""
+        # loading the game data a second time in the same process fails, and isn't needed here
+        with unittest.mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+        clients = {slot: Client(unittest.mock.Mock(), ctx) for slot in (1, 2)}
+        ctx.clients = {0: {slot: [client] for slot, client in clients.items()}}
+        for slot, client in clients.items():
+            client.team, client.slot, client.remote_items = 0, slot, True
+        sent: list[tuple[Client, list[dict[str, typing.Any]]]] = []
+
+        async def send_msgs(endpoint: Client, msgs: list[dict[str, typing.Any]]) -> bool:
+            sent.append((endpoint, msgs))
+            return True
+
+        async def run() -> None:
+            send_items_to(ctx, 0, 1, NetworkItem(1, 1, 2, 0))
+            send_new_items(ctx)
+            send_items_to(ctx, 0, 1, NetworkItem(2, 2, 2, 0))
+            send_new_items(ctx)
+            self.assertFalse(sent)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        with unittest.mock.patch.object(ctx, "send_msgs", send_msgs):
+            asyncio.run(run())
+        self.assertEqual(sent, [(clients[1], [{"cmd": "ReceivedItems", "index": 0,
+                                               "items": [NetworkItem(1, 1, 2, 0), NetworkItem(2, 2, 2, 0)]}])])
+        self.assertEqual(clients[1].send_index, 2)
+        self.assertFalse(ctx.pending_item_slots)
+
+
+class TestHintIndex(unittest.TestCase):
+    def test_recheck_location_hints(self) -> None:
+        """Tests that checking a location updates its hint for every slot it concerns, and leaves the others alone."""
+        with unittest.mock.patch.object(Context, "_load_game_data"):
+            ctx = Context("", 0, "", "", 0, 0, False)
+        checked = Hint(2, 1, 10, 100, False, status=HintStatus.HINT_PRIORITY)
+        unchecked = Hint(1, 1, 11, 101, False, status=HintStatus.HINT_PRIORITY)
+        ctx.hints[0, 1] = {checked, unchecked}
+        ctx.hints[0, 2] = {checked}
+        ctx.index_hints(0, ctx.hints[0, 1])
+        self.assertEqual(ctx.get_hint(0, 1, 10), checked)
+        self.assertIsNone(ctx.get_hint(0, 2, 10))
+
+        ctx.location_checks[0, 1].add(10)
+        changed: typing.Set[typing.Tuple[int, int]] = set()
+        ctx.recheck_location_hints(0, 1, [10], changed)
+        found = checked._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual(changed, {(0, 1), (0, 2)})
+        self.assertEqual(ctx.hints[0, 1], {found, unchecked})
+        self.assertEqual(ctx.hints[0, 2], {found})
+        self.assertEqual(ctx.get_hint(0, 1, 10), found)
+
+
+class TestEncodeDataPackage(unittest.TestCase):
+    def test_identical(self) -> None:
+        """Tests that the DataPackage joined from cached game data packages is the same as encoding it whole."""
+        games = {
+            "Game": {"item_name_to_id": {"Item": 1}, "location_name_to_id": {"Ä Location": 2}, "checksum": "abc"},
+            "Other Game": {"item_name_to_id": {}, "location_name_to_id": {"Location": [3]}},
+        }
+        expected = encode([{"cmd": "DataPackage", "data": {"games": games}}])
+        self.assertEqual(encode_data_package(games.items()), expected)
+        self.assertIn(("abc", False), encoded_game_packages)
+        # cached by checksum, so that it is also used for the same game data package of another room
+        self.assertEqual(encode_data_package(copy.deepcopy(games).items()), expected)
+        self.assertEqual(encode_data_package(()), encode([{"cmd": "DataPackage", "data": {"games": {}}}]))
+
+        if binary_framing_available:
+            encoded = encode_data_package(games.items(), True)
+            assert isinstance(encoded, bytes)
+            self.assertEqual(decode_binary(encoded), decode(expected))
@@ -0,0 +1,68 @@
+import json
+import typing
+import unittest
+
+from SNIClient import SNESState, SNIContext, snes_read, snes_read_ranges
+
+
+class FakeSNISocket:
+    """Answers GetAddress requests from memory, splitting the data into binary messages of at most message_size"""
+    open = True
+    closed = False
+
+    def __init__(self, ctx: SNIContext, memory: bytearray, message_size: int = 100) -> None:
+        self.ctx = ctx
+        self.memory = memory
+        self.message_size = message_size
+        self.requests: typing.List[typing.Dict[str, typing.Any]] = []
+
+    async def send(self, message: str) -> None:
+        request = json.loads(message)
+        self.requests.append(request)
+        assert request["Opcode"] == "GetAddress", request
+        operands = [int(operand, 16) for operand in request["Operands"]]
+        data = b"".join(self.memory[address:address + size] for address, size in zip(operands[::2], operands[1::2]))
+        for start in range(0, len(data), self.message_size):
+            self.ctx.snes_recv_queue.put_nowait(data[start:start + self.message_size])
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestSNESRead(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.ctx = SNIContext("", "", "")
+        self.ctx.snes_state = SNESState.SNES_ATTACHED
+        self.memory = bytearray(i & 0xFF for i in range(0x4000))
+        self.socket = FakeSNISocket(self.ctx, self.memory)
+        self.ctx.snes_socket = self.socket  # type: ignore[assignment]
+
+    async def test_read_ranges(self) -> None:
+        """Tests that overlapping and adjacent ranges are read once, and returned in the order of the ranges."""
+        ranges = [(0x20, 2), (0x10, 4), (0x12, 4), (0x14, 1), (0x16, 2), (0x30, 0)]
+        data = await snes_read_ranges(self.ctx, ranges)
+        assert data is not None
+        self.assertEqual([view.tobytes() for view in data],
+                         [self.memory[address:address + size] for address, size in ranges])
+        self.assertTrue(all(view.readonly for view in data))
+        self.assertEqual([request["Operands"] for request in self.socket.requests], [["10", "8", "20", "2"]])
+
+    async def test_big_reads(self) -> None:
+        """Tests that big ranges are read in chunks, and many ranges over several requests."""
+        ranges = [(0x100, 5000), *((address, 1) for address in range(0x3000, 0x3020, 2))]
+        data = await snes_read_ranges(self.ctx, ranges)
+        assert data is not None
+        self.assertEqual([view.tobytes() for view in data],
+                         [self.memory[address:address + size] for address, size in ranges])
+        operands = [operand for request in self.socket.requests for operand in request["Operands"]]
+        self.assertEqual(operands[:6], ["100", "800", "900", "800", "1100", "388"])
+        self.assertEqual(len(operands), 2 * (3 + 16))
+        self.assertTrue(all(len(request["Operands"]) <= 16 for request in self.socket.requests))
+
+    async def test_read(self) -> None:
+        self.socket.message_size = 3
+        self.assertEqual(await snes_read(self.ctx, 0x1234, 10), self.memory[0x1234:0x1234 + 10])
+
+        self.ctx.snes_state = SNESState.SNES_CONNECTED
+        self.assertIsNone(await snes_read(self.ctx, 0x1234, 10))
+        self.assertIsNone(await snes_read_ranges(self.ctx, [(0x1234, 10)]))
@@ -0,0 +1,74 @@
+# Tests for the data package cache in Utils.py
+
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+import Utils
+from Utils import (load_data_package_for_checksum, load_data_package_groups, store_data_package_for_checksum,
+                   store_data_package_groups)
+
+
+class TestDataPackageCache(unittest.TestCase):
+    game_package = {
+        "item_name_to_id": {"Sword": 1, "Ä Shield": 2},
+        "location_name_to_id": {"Chest": 10},
+        "checksum": "0123456789abcdef0123456789abcdef01234567",
+    }
+
+    def setUp(self) -> None:
+        self.temp_dir = TemporaryDirectory()
+        self.cached_path = getattr(Utils.cache_path, "cached_path", None)
+        Utils.cache_path.cached_path = self.temp_dir.name
+
+    def tearDown(self) -> None:
+        cached = getattr(Utils._get_data_package_cache, "cached", None)
+        if cached:
+            cached[1].close()
+            del Utils._get_data_package_cache.cached
+        if self.cached_path is None:
+            del Utils.cache_path.cached_path
+        else:
+            Utils.cache_path.cached_path = self.cached_path
+        self.temp_dir.cleanup()
+
+    def test_data_package(self) -> None:
+        """Tests that data packages are loaded by game and checksum."""
+        checksum = self.game_package["checksum"]
+        self.assertEqual(load_data_package_for_checksum("Game", checksum), {})
+        store_data_package_for_checksum("Game", self.game_package)
+        store_data_package_for_checksum("Other Game", {**self.game_package, "checksum": "f" * 40})
+        self.assertEqual(load_data_package_for_checksum("Game", checksum), self.game_package)
+        self.assertEqual(load_data_package_for_checksum("Other Game", checksum), {})
+        self.assertEqual(load_data_package_for_checksum("Game", None), {})
+        with self.assertRaises(ValueError):
+            load_data_package_for_checksum("Game", "../checksum")
+        # the cache is opened once, not for every game
+        self.assertIs(Utils._get_data_package_cache(), Utils._get_data_package_cache())
+
+    def test_json_data_package(self) -> None:
+        """Tests that data packages cached as a JSON file by older versions are still loaded, and moved."""
+        checksum = self.game_package["checksum"]
+        folder = Utils.cache_path("datapackage", "Game")
+        os.makedirs(folder)
+        with open(os.path.join(folder, f"{checksum}.json"), "w", encoding="utf-8-sig") as f:
+            json.dump(self.game_package, f)
+        self.assertEqual(load_data_package_for_checksum("Game", checksum), self.game_package)
+        self.assertFalse(os.path.exists(folder))
+        self.assertEqual(load_data_package_for_checksum("Game", checksum), self.game_package)
+
+    def test_groups(self) -> None:
+        """Tests that item and location groups are stored separately by game and checksum."""
+        checksum = self.game_package["checksum"]
+        self.assertEqual(load_data_package_groups("Game", checksum), {})
+        store_data_package_groups("Game", checksum, "item_name_groups", {"Weapons": ["Sword"]})
+        store_data_package_groups("Game", checksum, "location_name_groups", {"Everywhere": ["Chest"]})
+        store_data_package_groups("Game", checksum, "item_name_groups", {"Everything": ["Sword", "Ä Shield"]})
+        store_data_package_groups("Game", None, "item_name_groups", {"Custom": []})
+        self.assertEqual(load_data_package_groups("Game", checksum), {
+            "item_name_groups": {"Everything": ["Sword", "Ä Shield"]},
+            "location_name_groups": {"Everywhere": ["Chest"]},
+        })
+        self.assertEqual(load_data_package_groups("Game", None), {"item_name_groups": {"Custom": []}})
+        self.assertEqual(load_data_package_groups("Other Game", checksum), {})
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+
+from MultiServer import encode_game_package, encoded_game_packages
+from NetUtils import encode
+from WebHostLib.gamedata import GameDataStore, IdNameLookup, MappedGameData
+
+
+class TestGameDataStore(unittest.TestCase):
+    game_package = {
+        "item_name_groups": {"Everything": ["Sword", "Ä Shield"], "Weapons": ["Sword"]},
+        "item_name_to_id": {"Sword": 3, "Ä Shield": 1, "Bow": 2},
+        "location_name_groups": {"Everywhere": ["Chest"]},
+        "location_name_to_id": {"Chest": 10, "Boss": -10},
+        "version": 0,
+        "checksum": "0123456789abcdef0123456789abcdef01234567",
+    }
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)  # mapped files are in use on Windows
+        self.store = GameDataStore(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        del self.store
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self) -> None:
+        """Tests that a stored data package reads back without groups, in the same order, and the groups separately."""
+        self.assertIs(self.store.add(self.game_package), self.store.add(self.game_package))
+        game_data = GameDataStore(self.temp_dir.name).get(self.game_package["checksum"])
+        self.assertIsInstance(game_data, MappedGameData)
+        stripped = {key: value for key, value in self.game_package.items() if not key.endswith("_groups")}
+        self.assertEqual(list(game_data), list(stripped))
+        self.assertEqual(list(game_data["item_name_to_id"].items()), list(stripped["item_name_to_id"].items()))
+        self.assertEqual(dict(game_data), stripped)
+        self.assertEqual(game_data.item_name_groups, self.game_package["item_name_groups"])
+        self.assertEqual(game_data.location_name_groups, self.game_package["location_name_groups"])
+        self.assertEqual(game_data.all_item_and_group_names, {"Sword", "Ä Shield", "Bow", "Everything", "Weapons"})
+        try:
+            self.assertEqual(encode_game_package(game_data), encode(stripped))
+        finally:
+            encoded_game_packages.clear()
+
+    def test_lookup(self) -> None:
+        """Tests looking up names and ids in both directions, and names that aren't there."""
+        game_data = self.store.add(self.game_package)
+        for name, code in self.game_package["item_name_to_id"].items():
+            self.assertEqual(game_data.item_name_to_id[name], code)
+            self.assertEqual(game_data.item_id_to_name[code], name)
+        self.assertEqual(game_data.location_id_to_name[-10], "Boss")
+        for missing in ("Shield", "", 0, 4, None):
+            self.assertNotIn(missing, game_data.item_name_to_id)
+            self.assertNotIn(missing, game_data.item_id_to_name)
+
+        names = IdNameLookup(game_data.item_id_to_name, {-1: "Nothing"}, "item")
+        self.assertEqual(names[2], "Bow")
+        self.assertEqual(names[-1], "Nothing")
+        self.assertEqual(names[5], "Unknown item (ID:5)")
+        self.assertIn(-1, names)
+        self.assertNotIn(5, names)
+        self.assertEqual(list(names), [3, 1, 2, -1])
+
+    def test_invalid_checksum(self) -> None:
+        """Tests that checksums are only used as file names if they look like a checksum."""
+        with self.assertRaises(ValueError):
+            self.store.add({**self.game_package, "checksum": "../game"})
+        self.assertIsNone(self.store.get("../game"))
+        self.assertIsNone(self.store.get("f" * 40))
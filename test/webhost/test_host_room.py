@@ -226,3 +226,35 @@ class TestHostFakeRoom(TestBase):
         for handler in handlers:
             if isinstance(handler, logging.FileHandler):
                 self.assertTrue(handler.stream is None or handler.stream.closed)
+
+    def test_fetch_commands(self) -> None:
+        """Verify that the command poller fetches and deletes the commands of only the given rooms, in order."""
+        from unittest.mock import patch
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import DBCommandPoller
+        from WebHostLib.models import Command, Room
+
+        with db_session:
+            room: Room = Room.get(id=self.room_id)
+            other_room = Room(seed=room.seed, owner=room.owner, tracker=uuid4())
+            other_room_id = other_room.id
+            unrelated_room = Room(seed=room.seed, owner=room.owner, tracker=uuid4())
+            unrelated_room_id = unrelated_room.id
+            for commandtext, command_room in (("/help", room), ("/exit", other_room), ("/players", room),
+                                              ("/unrelated", unrelated_room)):
+                Command(room=command_room, commandtext=commandtext)
+
+        with patch.object(DBCommandPoller, "batch_size", 1):
+            commands = DBCommandPoller.fetch_commands([self.room_id, other_room_id])
+        self.assertEqual(sorted(commands), sorted([(self.room_id, "/help"), (self.room_id, "/players"),
+                                                   (other_room_id, "/exit")]))
+        self.assertLess(commands.index((self.room_id, "/help")), commands.index((self.room_id, "/players")))
+        self.assertEqual(DBCommandPoller.fetch_commands([self.room_id, other_room_id]), [])
+
+        with db_session:
+            commands = select(command for command in Command if command.room.id == unrelated_room_id)[:]
+            self.assertEqual([command.commandtext for command in commands], ["/unrelated"])
+            for command in commands:
+                command.delete()
+            Room.get(id=other_room_id).delete()
+            Room.get(id=unrelated_room_id).delete()
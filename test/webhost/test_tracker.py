@@ -103,3 +103,96 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_shared_static_data(self) -> None:
+        """Verify that trackers of following requests reuse the decoded multidata and data package lookup tables."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first, second = TrackerData(room), TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertGreater(len(first.item_id_to_name), 0)
+            for game in first.item_id_to_name:
+                self.assertIs(first.item_id_to_name[game].maps[-1], second.item_id_to_name[game].maps[-1])
+                self.assertIs(first.location_name_to_id[game], second.location_name_to_id[game])
+            self.assertIsNot(first._multisave, second._multisave)
+
+            # unknown ids are named for the request, without growing the shared lookup table
+            game = next(iter(first.item_id_to_name))
+            shared = first.item_id_to_name[game].maps[-1]
+            size = len(shared)
+            self.assertEqual(first.item_id_to_name[game][987654321], "Unknown Item (ID: 987654321)")
+            self.assertNotIn(987654321, second.item_id_to_name[game])
+            self.assertEqual(len(shared), size)
+
+    def _publish_snapshot(self, alias: str) -> dict:
+        """Publishes a tracker snapshot like the room server does."""
+        from pony.orm import db_session
+        from NetUtils import ClientStatus, NetworkItem
+        from WebHostLib.models import Room, TrackerSnapshot
+
+        save = {
+            "received_items": {(0, 1, True): [NetworkItem(1, 2, 1)], (0, 1, False): []},
+            "hints": {},
+            "location_checks": {(0, 1): set()},
+            "name_aliases": {(0, 1): alias},
+            "client_game_state": {(0, 1): ClientStatus.CLIENT_PLAYING},
+            "client_activity_timers": (((0, 1), 0.0),),
+            "client_connection_timers": (),
+            "video": [],
+            "stored_data": {"not": "for trackers"},
+        }
+        with db_session:
+            room = Room.get(id=self.room_id)
+            data = TrackerSnapshot.dump(save, {1: {}})
+            if room.tracker_snapshot:
+                room.tracker_snapshot.version += 1
+                room.tracker_snapshot.data = data
+            else:
+                TrackerSnapshot(room=room, version=1, data=data)
+        return save
+
+    def test_tracker_snapshot(self) -> None:
+        """Verify that trackers read a published snapshot the same as the save data it was published from."""
+        from pony.orm import db_session
+        from NetUtils import Hint
+        from WebHostLib.models import Room, TrackerSnapshot
+        from WebHostLib.tracker import TrackerData
+
+        save = self._publish_snapshot("Alias")
+        with db_session:
+            tracker_data = TrackerData(Room.get(id=self.room_id))
+            self.assertEqual(tracker_data.get_player_received_items(0, 1), save["received_items"][0, 1, True])
+            self.assertEqual(tracker_data.get_player_alias(0, 1), "Alias")
+            self.assertNotIn("stored_data", tracker_data._multisave)
+
+        locations = {1: {location: (1, 1, 0) for location in (12, 3, 7, 20, 1, 5, 8, 9, 11)}, 2: {4: (1, 1, 0)}}
+        location_checks = {(0, 1): {3, 11, 20}, (0, 2): set(), (1, 2): {4}}
+        data = TrackerSnapshot.dump({"location_checks": location_checks}, locations)
+        self.assertEqual(TrackerSnapshot.load(data, locations)["location_checks"],
+                         location_checks)
+
+        # the same hints publish the same snapshot, so that restarting the room doesn't change its version
+        hints = [Hint(1, 1, location, 2, False, "entrance") for location in range(20)]
+        data = TrackerSnapshot.dump({"hints": {(0, 1): set(hints)}}, locations)
+        self.assertEqual(TrackerSnapshot.dump({"hints": {(0, 1): set(reversed(hints))}}, locations), data)
+        self.assertEqual(TrackerSnapshot.load(data, locations)["hints"], {(0, 1): set(hints)})
+
+    def test_tracker_api_not_modified(self) -> None:
+        """Verify that the tracker api replies with Not Modified for the ETag of the current snapshot only."""
+        self._publish_snapshot("First")
+        with self.app.test_request_context():
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid)) as response:
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers["ETag"]
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid),
+                                  headers={"If-None-Match": etag}) as response:
+                self.assertEqual(response.status_code, 304)
+            self._publish_snapshot("Second")
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid),
+                                  headers={"If-None-Match": etag}) as response:
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.headers["ETag"], etag)
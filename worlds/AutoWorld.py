@@ -4,14 +4,18 @@ import hashlib
 import logging
 import pathlib
 import sys
+import threading
 import time
 from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from random import Random
 from typing import (Any, ClassVar, Dict, FrozenSet, List, Optional, Self, Set, TextIO, Tuple,
                     TYPE_CHECKING, Type, Union)
 
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
-from BaseClasses import CollectionState, Entrance
+from BaseClasses import CollectionState, Entrance, IndexedCounter
+import Profiler
 from rule_builder.rules import CustomRuleRegister, Rule
 from Utils import Version
 
@@ -163,17 +167,28 @@ class WebWorldRegister(type):
         return super().__new__(mcs, name, bases, dct)
 
 
+parallel_stage_names: FrozenSet[str] = frozenset(("generate_early", "create_regions", "create_items", "set_rules"))
+"""steps that worlds can opt into running on worker threads through World.parallel_stages"""
+
+
 def _timed_call(method: Callable[..., Any], *args: Any,
                 multiworld: Optional["MultiWorld"] = None, player: Optional[int] = None) -> Any:
+    profiler = Profiler.get_active_profiler()
     start = time.perf_counter()
-    ret = method(*args)
+    if profiler:
+        with profiler.world_call(method, multiworld, player):
+            ret = method(*args)
+    else:
+        ret = method(*args)
     taken = time.perf_counter() - start
     if taken > 1.0:
+        worker = threading.current_thread()
+        on_worker = "" if worker is threading.main_thread() else f" on {worker.name}"
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
-                             f"named {multiworld.player_name[player]}.")
+                             f"named {multiworld.player_name[player]}{on_worker}.")
         else:
-            perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__}.")
+            perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__}{on_worker}.")
     return ret
 
 
@@ -197,21 +212,95 @@ def call_single(multiworld: "MultiWorld", method_name: str, player: int, *args:
         return ret
 
 
+def _check_new_items(multiworld: "MultiWorld", player: int, new_items: List["Item"]) -> None:
+    for i, item in enumerate(new_items):
+        for other in new_items[i+1:]:
+            assert item is not other, (
+                f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
+                f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
+
+
+def _call_parallel(multiworld: "MultiWorld", method_name: str, players: List[int],
+                   *args: Any) -> Dict[int, List["Item"]]:
+    """
+    Runs method_name for players on a thread pool of multiworld.stage_workers threads.
+    Returns the items each player added to the itempool, which get taken back out of it so that call_all can reinsert
+    them in player order, the same order a serial run produces.
+    """
+    prev_item_count = len(multiworld.itempool)
+    busy: Dict[str, float] = {}
+
+    def run(player: int) -> None:
+        start = time.perf_counter()
+        try:
+            call_single(multiworld, method_name, player, *args)
+        finally:
+            worker = threading.current_thread().name
+            busy[worker] = busy.get(worker, 0) + time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(multiworld.stage_workers, len(players)),
+                            thread_name_prefix=method_name) as pool:
+        futures = [pool.submit(run, player) for player in players]
+    # re-raise in player order, so the reported exception doesn't depend on thread timing
+    for future in futures:
+        future.result()
+    taken = time.perf_counter() - start
+    if taken > 1.0:
+        perf_logger.info(f"Took {taken:.4f} seconds in {method_name} for {len(players)} players on "
+                         f"{len(busy)} workers, busy for " +
+                         ", ".join(f"{busy[worker]:.4f} seconds on {worker}" for worker in sorted(busy)) + ".")
+
+    new_items: Dict[int, List["Item"]] = {player: [] for player in players}
+    for item in multiworld.itempool[prev_item_count:]:
+        assert item.player in new_items, \
+            f"{method_name} of a parallel world added item \"{item.name}\" of another player {item.player}."
+        new_items[item.player].append(item)
+    del multiworld.itempool[prev_item_count:]
+    return new_items
+
+
 def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
-    world_types: Set[AutoWorldRegister] = set()
-    for player in multiworld.player_ids:
-        prev_item_count = len(multiworld.itempool)
-        world_types.add(multiworld.worlds[player].__class__)
-        call_single(multiworld, method_name, player, *args)
-        if __debug__:
-            new_items = multiworld.itempool[prev_item_count:]
-            for i, item in enumerate(new_items):
-                for other in new_items[i+1:]:
-                    assert item is not other, (
-                        f"Duplicate item reference of \"{item.name}\" in \"{multiworld.worlds[player].game}\" "
-                        f"of player \"{multiworld.player_name[player]}\". Please make a copy instead.")
-
-    call_stage(multiworld, method_name, *args)
+    with Profiler.section(method_name):
+        parallel_items: Dict[int, List["Item"]] = {}
+        if multiworld.stage_workers > 1 and method_name in parallel_stage_names:
+            parallel_players = [player for player in multiworld.player_ids
+                                if method_name in multiworld.worlds[player].parallel_stages]
+            if len(parallel_players) > 1:
+                parallel_items = _call_parallel(multiworld, method_name, parallel_players, *args)
+
+        for player in multiworld.player_ids:
+            prev_item_count = len(multiworld.itempool)
+            if player in parallel_items:
+                multiworld.itempool += parallel_items[player]
+            else:
+                call_single(multiworld, method_name, player, *args)
+            if __debug__:
+                _check_new_items(multiworld, player, multiworld.itempool[prev_item_count:])
+
+        call_stage(multiworld, method_name, *args)
+        if method_name == "create_items":
+            _index_prog_items(multiworld)
+
+
+def _index_prog_items(multiworld: "MultiWorld") -> None:
+    """Interns the progression item names of worlds with World.indexed_prog_items, once their items exist."""
+    names: Dict[int, Set[str]] = {player: set() for player in multiworld.player_ids
+                                  if multiworld.worlds[player].indexed_prog_items}
+    if not names:
+        return
+    for item in chain(multiworld.itempool, *multiworld.precollected_items.values(),
+                      (location.item for location in multiworld.get_filled_locations())):
+        if item.advancement and item.player in names:
+            names[item.player].add(item.name)
+    for player, player_names in names.items():
+        indices = multiworld.prog_item_indices.setdefault(player, {})
+        for item_name in sorted(player_names - indices.keys()):
+            indices[item_name] = len(indices)
+        # multiworld.state already has the precollected items
+        state_items = multiworld.state.prog_items
+        if not isinstance(state_items[player], IndexedCounter):
+            state_items[player] = IndexedCounter(indices, state_items[player])
 
 
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
@@ -313,6 +402,20 @@ class World(metaclass=AutoWorldRegister):
     hidden: ClassVar[bool] = False
     """Hide World Type from various views. Does not remove functionality."""
 
+    indexed_prog_items: ClassVar[bool] = False
+    """
+    intern the names of this world's progression items to small indices once create_items is done, so rules can check
+    them with CollectionState.has_mask, has_any_mask and count_index, using get_item_mask and get_item_index.
+    The item name based CollectionState methods keep working as before.
+    """
+
+    parallel_stages: ClassVar[FrozenSet[str]] = frozenset()
+    """
+    names of the steps out of generate_early, create_regions, create_items and set_rules that may run on a worker
+    thread, concurrently with the same step of other worlds. Only list a step if this world does not use
+    multiworld.random in it and only adds regions, items and rules of its own player.
+    """
+
     web: ClassVar[WebWorld] = WebWorld()
     """see WebWorld for options"""
 
@@ -581,6 +684,31 @@ class World(metaclass=AutoWorldRegister):
         return self.create_item(self.get_filler_item_name())
 
     # convenience methods
+    def get_item_index(self, item_name: str) -> int:
+        """
+        Returns the interned index of item_name for CollectionState.count_index, interning it if it's new.
+        Only for worlds with indexed_prog_items. Intern names before states other than multiworld.state collect them,
+        usually from set_rules.
+        """
+        assert self.indexed_prog_items, f"{self.game} does not use indexed_prog_items"
+        indices = self.multiworld.prog_item_indices.setdefault(self.player, {})
+        index = indices.get(item_name)
+        if index is None:
+            index = indices[item_name] = len(indices)
+            state = getattr(self.multiworld, "state", None)
+            if state:
+                counter = state.prog_items[self.player]
+                if isinstance(counter, IndexedCounter) and item_name in counter:
+                    counter[item_name] = counter[item_name]
+        return index
+
+    def get_item_mask(self, item_names: Iterable[str]) -> int:
+        """Returns the mask of item_names for CollectionState.has_mask and has_any_mask, see get_item_index."""
+        mask = 0
+        for item_name in item_names:
+            mask |= 1 << self.get_item_index(item_name)
+        return mask
+
     def get_location(self, location_name: str) -> "Location":
         return self.multiworld.get_location(location_name, self.player)
 
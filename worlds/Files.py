@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import abc
 import json
+import struct
 import zipfile
 from enum import IntEnum
 import os
@@ -289,6 +290,7 @@ class APProcedurePatch(APAutoPatchInterface):
     hash: Optional[str]  # base checksum of source file
     source_data: bytes
     files: Dict[str, bytes]
+    unread_files: Dict[str, None]  # files of the patch container that are read from it when retrieved
 
     @classmethod
     def get_source_data(cls) -> bytes:
@@ -304,6 +306,7 @@ class APProcedurePatch(APAutoPatchInterface):
     def __init__(self, *args: Any, **kwargs: Any):
         super(APProcedurePatch, self).__init__(*args, **kwargs)
         self.files = {}
+        self.unread_files = {}
 
     def get_manifest(self) -> Dict[str, Any]:
         manifest = super(APProcedurePatch, self).get_manifest()
@@ -321,11 +324,25 @@ class APProcedurePatch(APAutoPatchInterface):
             self.procedure = [("apply_bsdiff4", ["delta.bsdiff4"])]
         else:
             self.procedure = manifest["procedure"]
+        # files are only read when they are retrieved if the patch container can be opened again
+        read_later = isinstance(self.path, str) and os.path.isfile(self.path)
         for file in opened_zipfile.namelist():
             if file not in ["archipelago.json"]:
-                self.files[file] = opened_zipfile.read(file)
+                if read_later:
+                    self.files.pop(file, None)
+                    self.unread_files[file] = None
+                else:
+                    self.files[file] = opened_zipfile.read(file)
+                    self.unread_files.pop(file, None)
         return manifest
 
+    def write(self, file: Optional[Union[str, BinaryIO]] = None) -> None:
+        # read all files first, as the patch container may be the one that is written
+        for unread_file in list(self.unread_files):
+            self.files[unread_file] = self.get_file(unread_file)
+            del self.unread_files[unread_file]
+        super(APProcedurePatch, self).write(file)
+
     def write_contents(self, opened_zipfile: zipfile.ZipFile) -> None:
         super(APProcedurePatch, self).write_contents(opened_zipfile)
         for file in self.files:
@@ -334,17 +351,23 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def get_file(self, file: str) -> bytes:
         """ Retrieves a file from the patch container."""
-        if file not in self.files:
+        if file not in self.files and file not in self.unread_files:
             self.read()
+        if file in self.unread_files:
+            assert self.path is not None
+            with zipfile.ZipFile(self.path, "r") as zf:
+                return zf.read(file)
         return self.files[file]
 
     def write_file(self, file_name: str, file: bytes) -> None:
         """ Writes a file to the patch container, to be retrieved upon patching. """
         self.files[file_name] = file
+        self.unread_files.pop(file_name, None)
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
+        # steps may change a bytearray in place, so cached source data stays bytes until a step copies it
+        base_data: Union[bytes, bytearray] = self.get_source_data_with_cache()
         patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
@@ -388,6 +411,80 @@ class APTokenTypes(IntEnum):
     XOR_8 = 5
 
 
+_token_count = struct.Struct("<I")
+_token_header = struct.Struct("<BII")  # type, offset, size of the data
+_token_range = struct.Struct("<II")  # data of COPY and RLE: length, source offset or value
+
+
+def _merge_write_tokens(tokens: Sequence[Tuple[APTokenTypes, int, Any]]) -> List[Tuple[APTokenTypes, int, Any]]:
+    """
+    Merges each run of consecutive WRITE tokens into WRITE tokens of the same result, in order of their offset,
+    with overlapping and adjacent writes in one token. Later writes take precedence where writes overlap.
+    This assumes writes start within the data they are applied to, or right at its end.
+    """
+    merged: List[Tuple[APTokenTypes, int, Any]] = []
+    run: List[Tuple[int, bytes]] = []
+    for token in (*tokens, None):
+        if token is not None and token[0] == APTokenTypes.WRITE and isinstance(token[2], bytes):
+            run.append((token[1], token[2]))
+            continue
+        if len(run) == 1:
+            merged.append((APTokenTypes.WRITE, *run[0]))
+        elif run:
+            # find ranges of overlapping or adjacent writes, keeping the indices of their writes
+            ranges: List[List[Any]] = []  # start, end, indices of writes
+            for index in sorted(range(len(run)), key=lambda i: run[i][0]):
+                offset, data = run[index]
+                if not data:
+                    continue
+                if ranges and offset <= ranges[-1][1]:
+                    ranges[-1][1] = max(ranges[-1][1], offset + len(data))
+                    ranges[-1][2].append(index)
+                else:
+                    ranges.append([offset, offset + len(data), [index]])
+            for start, end, indices in ranges:
+                if len(indices) == 1:
+                    merged.append((APTokenTypes.WRITE, start, run[indices[0]][1]))
+                else:
+                    buffer = bytearray(end - start)
+                    for index in sorted(indices):
+                        offset, data = run[index]
+                        buffer[offset - start:offset - start + len(data)] = data
+                    merged.append((APTokenTypes.WRITE, start, bytes(buffer)))
+        run = []
+        if token is not None:
+            merged.append(token)
+    return merged
+
+
+def _read_token_runs(token_data: memoryview) -> List[Tuple[int, List[Tuple[int, int, int]]]]:
+    """
+    Reads a token binary in one pass into runs of tokens of the same type,
+    as (token type, [(offset, position of the token data, size of the token data), ...]).
+    Unknown token types are read as WRITE, as they are applied as such.
+    """
+    runs: List[Tuple[int, List[Tuple[int, int, int]]]] = []
+    run: List[Tuple[int, int, int]] = []
+    run_type = -1
+    token_count, = _token_count.unpack_from(token_data)
+    position = _token_count.size
+    unpack_header = _token_header.unpack_from
+    header_size = _token_header.size
+    for _ in range(token_count):
+        token_type, offset, size = unpack_header(token_data, position)
+        position += header_size
+        if token_type != run_type:
+            if token_type > APTokenTypes.XOR_8:
+                token_type = APTokenTypes.WRITE
+            if token_type != run_type:
+                run = []
+                run_type = token_type
+                runs.append((run_type, run))
+        run.append((offset, position, size))
+        position += size
+    return runs
+
+
 class APTokenMixin:
     """
     A class that defines functions for generating a token binary, for use in patches.
@@ -402,26 +499,24 @@ class APTokenMixin:
     def get_token_binary(self) -> bytes:
         """
         Returns the token binary created from stored tokens.
+        Consecutive WRITE tokens to overlapping or adjacent ranges are merged into one WRITE token.
         :return: A bytes object representing the token data.
         """
-        data = bytearray()
-        data.extend(len(self._tokens).to_bytes(4, "little"))
-        for token_type, offset, args in self._tokens:
-            data.append(token_type)
-            data.extend(offset.to_bytes(4, "little"))
+        tokens = _merge_write_tokens(self._tokens)
+        data = bytearray(_token_count.pack(len(tokens)))
+        for token_type, offset, args in tokens:
             if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
                 assert isinstance(args, int), f"Arguments to AND/OR/XOR must be of type int, not {type(args)}"
-                data.extend(int.to_bytes(1, 4, "little"))
+                data += _token_header.pack(token_type, offset, 1)
                 data.append(args)
             elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
                 assert isinstance(args, tuple), f"Arguments to COPY/RLE must be of type tuple, not {type(args)}"
-                data.extend(int.to_bytes(8, 4, "little"))
-                data.extend(args[0].to_bytes(4, "little"))
-                data.extend(args[1].to_bytes(4, "little"))
+                data += _token_header.pack(token_type, offset, _token_range.size)
+                data += _token_range.pack(*args)
             elif token_type == APTokenTypes.WRITE:
                 assert isinstance(args, bytes), f"Arguments to WRITE must be of type bytes, not {type(args)}"
-                data.extend(len(args).to_bytes(4, "little"))
-                data.extend(args)
+                data += _token_header.pack(token_type, offset, len(args))
+                data += args
             else:
                 raise ValueError(f"Unknown token type {token_type}")
         return bytes(data)
@@ -463,11 +558,11 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
 
     caller: APProcedurePatch (used to retrieve files from the patch container)
 
-    rom: bytes (the data to patch)
+    rom: bytes or bytearray (the data to patch, a bytearray may be changed in place)
 
     Further arguments are passed in from the procedure as defined.
 
-    Patch extension functions must return the changed bytes.
+    Patch extension functions must return the changed bytes, or the changed bytearray.
     """
     game: str
     required_extensions: ClassVar[Tuple[str, ...]] = ()
@@ -475,47 +570,45 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     @staticmethod
     def apply_bsdiff4(caller: APProcedurePatch, rom: bytes, patch: str) -> bytes:
         """Applies the given bsdiff4 from the patch onto the current file."""
-        return bsdiff4.patch(rom, caller.get_file(patch))
+        return bsdiff4.patch(bytes(rom) if isinstance(rom, bytearray) else rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
+    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytearray:
         """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
-        token_count = int.from_bytes(token_data[0:4], "little")
-        bpr = 4
-        for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
-            offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
-            size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
-            data = token_data[bpr + 9:bpr + 9 + size]
-            if token_type in [APTokenTypes.AND_8, APTokenTypes.OR_8, APTokenTypes.XOR_8]:
-                arg = data[0]
-                if token_type == APTokenTypes.AND_8:
-                    rom_data[offset] = rom_data[offset] & arg
-                elif token_type == APTokenTypes.OR_8:
-                    rom_data[offset] = rom_data[offset] | arg
-                else:
-                    rom_data[offset] = rom_data[offset] ^ arg
-            elif token_type in [APTokenTypes.COPY, APTokenTypes.RLE]:
-                length = int.from_bytes(data[:4], "little")
-                value = int.from_bytes(data[4:], "little")
-                if token_type == APTokenTypes.COPY:
-                    rom_data[offset: offset + length] = rom_data[value: value + length]
-                else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
+        token_data = memoryview(caller.get_file(token_file))
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
+        # tokens of a run have the same type, so each run is applied in one loop
+        for token_type, tokens in _read_token_runs(token_data):
+            if token_type == APTokenTypes.WRITE:
+                for offset, position, size in tokens:
+                    rom_data[offset:offset + size] = token_data[position:position + size]
+            elif token_type == APTokenTypes.AND_8:
+                for offset, position, _ in tokens:
+                    rom_data[offset] &= token_data[position]
+            elif token_type == APTokenTypes.OR_8:
+                for offset, position, _ in tokens:
+                    rom_data[offset] |= token_data[position]
+            elif token_type == APTokenTypes.XOR_8:
+                for offset, position, _ in tokens:
+                    rom_data[offset] ^= token_data[position]
+            elif token_type == APTokenTypes.COPY:
+                for offset, position, _ in tokens:
+                    length, source = _token_range.unpack_from(token_data, position)
+                    rom_data[offset:offset + length] = rom_data[source:source + length]
             else:
-                rom_data[offset:offset + len(data)] = data
-            bpr += 9 + size
-        return bytes(rom_data)
+                for offset, position, _ in tokens:
+                    length, value = _token_range.unpack_from(token_data, position)
+                    rom_data[offset:offset + length] = bytes((value,)) * length
+        return rom_data
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
+    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytearray:
         """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        with memoryview(rom_data) as view:
+            crc = (sum(view[:0x7FDC]) + sum(view[0x7FE0:]) + 0x01FE) & 0xFFFF
         inv = crc ^ 0xFFFF
         rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        return rom_data
@@ -7,6 +7,7 @@ naively passed to BizHawk without validation or modification.
 
 import asyncio
 import base64
+import collections
 import enum
 import json
 import sys
@@ -46,47 +47,96 @@ class SyncError(Exception):
 class BizHawkContext:
     streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     connection_status: ConnectionStatus
-    _lock: asyncio.Lock
     _port: int | None
+    _pending: collections.deque[asyncio.Future[bytes]]
+    """Messages that were sent and await their response, in the order they were sent"""
+    _reader_task: asyncio.Task | None
+    _cache: dict[Any, Any]
+    """Responses that can't change while connected to the same connector script, like the ROM hash"""
 
     def __init__(self) -> None:
         self.streams = None
         self.connection_status = ConnectionStatus.NOT_CONNECTED
-        self._lock = asyncio.Lock()
         self._port = None
+        self._pending = collections.deque()
+        self._reader_task = None
+        self._cache = {}
 
     async def _send_message(self, message: str):
-        async with self._lock:
-            if self.streams is None:
-                raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+        """Sends a message and returns the response to it.
 
-            try:
-                reader, writer = self.streams
-                writer.write(message.encode("utf-8") + b"\n")
-                await asyncio.wait_for(writer.drain(), timeout=5)
-
-                res = await asyncio.wait_for(reader.readline(), timeout=5)
-
-                if res == b"":
-                    writer.close()
-                    self.streams = None
-                    self.connection_status = ConnectionStatus.NOT_CONNECTED
-                    raise RequestFailedError("Connection closed")
+        Messages can be sent while earlier messages still await their response, as the connector script responds to
+        messages in the order it receives them."""
+        if self.streams is None:
+            raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
 
-                if self.connection_status == ConnectionStatus.TENTATIVE:
-                    self.connection_status = ConnectionStatus.CONNECTED
+        reader, writer = self.streams
+        response: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+        writer.write(message.encode("utf-8") + b"\n")
+        self._pending.append(response)
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._read_responses(reader), name="BizHawkReader")
 
-                return res.decode("utf-8")
+        try:
+            await asyncio.wait_for(writer.drain(), timeout=5)
+        except asyncio.TimeoutError as exc:
+            self._close("Connection timed out", exc)
+        except ConnectionResetError as exc:
+            self._close("Connection reset", exc)
+        except OSError as exc:
+            self._close("Connection lost", exc)
+        except asyncio.CancelledError:
+            response.cancel()
+            raise
+
+        return (await response).decode("utf-8")
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        """Reads responses for as long as there are messages awaiting them."""
+        while self._pending and self.streams is not None and self.streams[0] is reader:
+            try:
+                res = await asyncio.wait_for(reader.readline(), timeout=5)
             except asyncio.TimeoutError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection timed out") from exc
+                self._close("Connection timed out", exc, reader)
+                return
             except ConnectionResetError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
-                raise RequestFailedError("Connection reset") from exc
+                self._close("Connection reset", exc, reader)
+                return
+            except OSError as exc:
+                self._close("Connection lost", exc, reader)
+                return
+
+            if res == b"":
+                self._close("Connection closed", None, reader)
+                return
+
+            if self.connection_status == ConnectionStatus.TENTATIVE:
+                self.connection_status = ConnectionStatus.CONNECTED
+
+            response = self._pending.popleft()
+            if not response.done():  # the request may have been cancelled
+                response.set_result(res)
+
+    def _close(self, reason: str = "Connection closed", cause: BaseException | None = None,
+               reader: asyncio.StreamReader | None = None) -> None:
+        """Closes the connection and fails all messages awaiting their response with a RequestFailedError.
+
+        If `reader` is given, only closes the connection if it is still the connection of that reader."""
+        if reader is not None and (self.streams is None or self.streams[0] is not reader):
+            return
+
+        if self.streams is not None:
+            self.streams[1].close()
+            self.streams = None
+        self.connection_status = ConnectionStatus.NOT_CONNECTED
+        self._cache.clear()
+
+        while self._pending:
+            response = self._pending.popleft()
+            if not response.done():
+                error = RequestFailedError(reason)
+                error.__cause__ = cause
+                response.set_exception(error)
 
 
 async def connect(ctx: BizHawkContext) -> bool:
@@ -98,6 +148,7 @@ async def connect(ctx: BizHawkContext) -> bool:
     for port in ports:
         try:
             ctx.streams = await asyncio.open_connection("127.0.0.1", port)
+            ctx._cache.clear()
             ctx.connection_status = ConnectionStatus.TENTATIVE
             ctx._port = port
             return True
@@ -112,10 +163,7 @@ async def connect(ctx: BizHawkContext) -> bool:
 
 def disconnect(ctx: BizHawkContext) -> None:
     """Closes the connection to the connector script."""
-    if ctx.streams is not None:
-        ctx.streams[1].close()
-        ctx.streams = None
-    ctx.connection_status = ConnectionStatus.NOT_CONNECTED
+    ctx._close()
 
 
 async def get_script_version(ctx: BizHawkContext) -> int:
@@ -150,34 +198,36 @@ async def ping(ctx: BizHawkContext) -> None:
         raise SyncError(f"Expected response of type PONG but got {res['type']}")
 
 
-async def get_hash(ctx: BizHawkContext) -> str:
-    """Gets the hash value of the currently loaded ROM"""
-    res = (await send_requests(ctx, [{"type": "HASH"}]))[0]
+async def _get_cached(ctx: BizHawkContext, request: dict[str, Any], response_type: str) -> Any:
+    """Returns the value of a response that can only change when a different ROM is loaded. The connector script
+    restarts when that happens, so the value is kept until the connection is closed."""
+    key = tuple(request.values())
+    if key not in ctx._cache:
+        res = (await send_requests(ctx, [request]))[0]
 
-    if res["type"] != "HASH_RESPONSE":
-        raise SyncError(f"Expected response of type HASH_RESPONSE but got {res['type']}")
+        if res["type"] != response_type:
+            raise SyncError(f"Expected response of type {response_type} but got {res['type']}")
 
-    return res["value"]
+        if ctx.streams is not None:
+            ctx._cache[key] = res["value"]
+        return res["value"]
 
+    return ctx._cache[key]
 
-async def get_memory_size(ctx: BizHawkContext, domain: str) -> int:
-    """Gets the size in bytes of the specified memory domain"""
-    res = (await send_requests(ctx, [{"type": "MEMORY_SIZE", "domain": domain}]))[0]
 
-    if res["type"] != "MEMORY_SIZE_RESPONSE":
-        raise SyncError(f"Expected response of type MEMORY_SIZE_RESPONSE but got {res['type']}")
+async def get_hash(ctx: BizHawkContext) -> str:
+    """Gets the hash value of the currently loaded ROM"""
+    return await _get_cached(ctx, {"type": "HASH"}, "HASH_RESPONSE")
 
-    return res["value"]
+
+async def get_memory_size(ctx: BizHawkContext, domain: str) -> int:
+    """Gets the size in bytes of the specified memory domain"""
+    return await _get_cached(ctx, {"type": "MEMORY_SIZE", "domain": domain}, "MEMORY_SIZE_RESPONSE")
 
 
 async def get_system(ctx: BizHawkContext) -> str:
     """Gets the system name for the currently loaded ROM"""
-    res = (await send_requests(ctx, [{"type": "SYSTEM"}]))[0]
-
-    if res["type"] != "SYSTEM_RESPONSE":
-        raise SyncError(f"Expected response of type SYSTEM_RESPONSE but got {res['type']}")
-
-    return res["value"]
+    return await _get_cached(ctx, {"type": "SYSTEM"}, "SYSTEM_RESPONSE")
 
 
 async def get_cores(ctx: BizHawkContext) -> dict[str, str]:
@@ -249,7 +299,10 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
     - `domain` is the name of the region of memory the address corresponds to
 
     Returns None if any item in guard_list failed to validate. Otherwise returns a list of bytes in the order they
-    were requested."""
+    were requested.
+
+    Reads of overlapping or adjacent ranges in the same domain are requested as one read."""
+    ranges, parts = _coalesce_reads(read_list)
     res = await send_requests(ctx, [{
         "type": "GUARD",
         "address": address,
@@ -260,9 +313,9 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
         "address": address,
         "size": size,
         "domain": domain
-    } for address, size, domain in read_list])
+    } for address, size, domain in ranges])
 
-    ret: list[bytes] = []
+    data: list[bytes] = []
     for item in res:
         if item["type"] == "GUARD_RESPONSE":
             if not item["value"]:
@@ -271,9 +324,28 @@ async def guarded_read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int,
             if item["type"] != "READ_RESPONSE":
                 raise SyncError(f"Expected response of type READ_RESPONSE or GUARD_RESPONSE but got {item['type']}")
 
-            ret.append(base64.b64decode(item["value"]))
+            data.append(base64.b64decode(item["value"]))
+
+    return [data[index][offset:offset + size] for index, offset, size in parts]
+
+
+def _coalesce_reads(read_list: Sequence[tuple[int, int, str]]) \
+        -> tuple[list[tuple[int, int, str]], list[tuple[int, int, int]]]:
+    """Merges reads of overlapping or adjacent ranges in the same domain.
+
+    Returns the merged reads, and for each read of `read_list` the index of its merged read, and the offset and size
+    of its data within the data of the merged read."""
+    ranges: list[list[Any]] = []
+    parts: list[tuple[int, int, int]] = [(0, 0, 0)] * len(read_list)
+    for index in sorted(range(len(read_list)), key=lambda i: (read_list[i][2], read_list[i][0])):
+        address, size, domain = read_list[index]
+        if ranges and ranges[-1][2] == domain and address <= ranges[-1][0] + ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], address + size - ranges[-1][0])
+        else:
+            ranges.append([address, size, domain])
+        parts[index] = (len(ranges) - 1, address - ranges[-1][0], size)
 
-    return ret
+    return [(address, size, domain) for address, size, domain in ranges], parts
 
 
 async def read(ctx: BizHawkContext, read_list: Sequence[tuple[int, int, str]]) -> list[bytes]:
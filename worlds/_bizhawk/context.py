@@ -119,6 +119,7 @@ class BizHawkClientCommandProcessor(ClientCommandProcessor):
 
 class BizHawkClientContext(CommonContext):
     command_processor = BizHawkClientCommandProcessor
+    want_binary_framing = True
     text_passthrough_categories: set[str]
     server_seed_name: str | None = None
     auth_status: AuthStatus
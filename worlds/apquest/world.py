@@ -50,6 +50,12 @@ class APQuestWorld(World):
     # This defaults to "Menu", but you can change it by overriding origin_region_name.
     origin_region_name = "Overworld"
 
+    # Some steps may be run on worker threads, at the same time as the same step of other worlds.
+    # This is only safe for steps that don't use multiworld.random and only touch things belonging to our own player.
+    # Our create_regions and set_rules only create our own regions and rules, so we can opt in to this.
+    # Our create_items is left out, because pushing precollected items modifies the shared multiworld state.
+    parallel_stages = frozenset({"create_regions", "set_rules"})
+
     # Our world class must have certain functions ("steps") that get called during generation.
     # The main ones are: create_regions, set_rules, create_items.
     # For better structure and readability, we put each of these in their own file.
@@ -25,6 +25,14 @@ def locality_needed(multiworld: MultiWorld) -> bool:
             return True
 
 
+def get_locality_blockers(item_rule: ItemRule) -> typing.Optional[typing.Mapping[int, typing.AbstractSet[str]]]:
+    """
+    Returns the item names per receiving player that an item rule created by `locality_rules` always rejects,
+    or None if the rule was not created by `locality_rules`.
+    """
+    return getattr(item_rule, "locality_blockers", None)
+
+
 def locality_rules(multiworld: MultiWorld):
     if locality_needed(multiworld):
 
@@ -68,12 +76,14 @@ def locality_rules(multiworld: MultiWorld):
                     lambda i, sending_blockers = forbid_data[location.player], \
                                             old_rule = location.item_rule: \
                     i.name not in sending_blockers[i.player]
+                location.item_rule.locality_blockers = forbid_data[location.player]
             # special rule, needs to also be fulfilled.
             else:
                 func_cache[location.player, location.item_rule] = location.item_rule = \
                     lambda i, sending_blockers = forbid_data[location.player], \
                                             old_rule = location.item_rule: \
                     i.name not in sending_blockers[i.player] and old_rule(i)
+                location.item_rule.locality_blockers = forbid_data[location.player]
 
 
 def exclusion_rules(multiworld: MultiWorld, player: int, exclude_locations: typing.Set[str]) -> None:
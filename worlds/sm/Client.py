@@ -88,31 +88,37 @@ class SMSNIClient(SNIClient):
 
 
     async def game_watcher(self, ctx):
-        from SNIClient import snes_buffered_write, snes_flush_writes, snes_read
+        from SNIClient import snes_buffered_write, snes_flush_writes, snes_read_ranges
         if ctx.server is None or ctx.slot is None:
             # not successfully connected to a multiworld server, cannot process the game sending items
             return
 
-        gamemode = await snes_read(ctx, WRAM_START + 0x0998, 1)
+        reads = await snes_read_ranges(ctx, [(WRAM_START + 0x0998, 1), (SM_SEND_QUEUE_RCOUNT, 4),
+                                             (SM_RECV_QUEUE_WCOUNT, 2)])
+        if reads is None:
+            return
+        gamemode, data, recv_queue_wcount = reads
         if "DeathLink" in ctx.tags and gamemode and ctx.last_death_link + 1 < time.time():
             currently_dead = gamemode[0] in SM_DEATH_MODES
             await ctx.handle_deathlink_state(currently_dead)
-        if gamemode is not None and gamemode[0] in SM_ENDGAME_MODES:
+        if gamemode[0] in SM_ENDGAME_MODES:
             if not ctx.finished_game:
                 await ctx.send_msgs([{"cmd": "StatusUpdate", "status": ClientStatus.CLIENT_GOAL}])
                 ctx.finished_game = True
             return
 
-        data = await snes_read(ctx, SM_SEND_QUEUE_RCOUNT, 4)
-        if data is None:
-            return
-
         recv_index = data[0] | (data[1] << 8)
         recv_item = data[2] | (data[3] << 8) # this is actually SM_SEND_QUEUE_WCOUNT
 
-        while (recv_index < recv_item):
-            item_address = recv_index * 8
-            message = await snes_read(ctx, SM_SEND_QUEUE_START + item_address, 8)
+        if recv_index < recv_item:
+            messages = await snes_read_ranges(ctx, [(SM_SEND_QUEUE_START + index * 8, 8)
+                                                    for index in range(recv_index, recv_item)])
+            if messages is None:
+                return
+        else:
+            messages = []
+
+        for message in messages:
             item_index = (message[4] | (message[5] << 8)) >> 3
 
             recv_index += 1
@@ -128,11 +134,7 @@ class SMSNIClient(SNIClient):
                 f'New Check: {location} ({len(ctx.locations_checked)}/{len(ctx.missing_locations) + len(ctx.checked_locations)})')
             await ctx.send_msgs([{"cmd": 'LocationChecks', "locations": [location_id]}])
 
-        data = await snes_read(ctx, SM_RECV_QUEUE_WCOUNT, 2)
-        if data is None:
-            return
-
-        item_out_ptr = data[0] | (data[1] << 8)
+        item_out_ptr = recv_queue_wcount[0] | (recv_queue_wcount[1] << 8)
 
         from . import items_start_id
         from . import locations_start_id